@@ -3,147 +3,195 @@
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.db_models import CardData, Deck, db
+from api.catalog_cache import cached_catalog_response, catalog_card_count
+from models.db_models import CardData, Deck, db, load_json_column
 from models.game_models import Card, CharacterCard
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Optional, Tuple
+import math
 
 cards_bp = Blueprint('cards', __name__)
 
+# 每页卡牌数的默认值（与 paginate 的默认值一致）和键集分页每页的上限
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+
+def _paginate_cards(query, card_type: Optional[str] = None, element: Optional[str] = None) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    按请求参数分页查询卡牌，返回当前页的卡牌和分页信息
+    - 默认按页码分页（page / per_page），返回 total / pages / current_page；per_page 没有上限
+    - 带 cursor 参数时按卡牌ID排序做键集分页：第一页传空的 cursor，之后传上一页返回的 next_cursor，
+      只查询 id 大于 cursor 的下一页，不使用 OFFSET，每页的代价与页数无关；最后一页的 next_cursor 为 null，
+      per_page 最多为 MAX_PER_PAGE
+    per_page 小于1时按 DEFAULT_PER_PAGE 处理（与 paginate(error_out=False) 一致）
+    总数从缓存的卡牌目录统计中获取（card_type / element 与查询的过滤条件一致），不再每次执行 COUNT
+    """
+    per_page = request.args.get('per_page', DEFAULT_PER_PAGE, type=int)
+    if per_page < 1:
+        per_page = DEFAULT_PER_PAGE
+    total = catalog_card_count(card_type, element)
+    
+    if 'cursor' in request.args:
+        per_page = min(per_page, MAX_PER_PAGE)
+        cursor = request.args.get('cursor')
+        query = query.order_by(CardData.id)
+        if cursor:
+            query = query.filter(CardData.id > cursor)
+        # 多取一张判断是否还有下一页
+        items = query.limit(per_page + 1).all()
+        next_cursor = items[per_page - 1].id if len(items) > per_page else None
+        return items[:per_page], {
+            'total': total,
+            'per_page': per_page,
+            'next_cursor': next_cursor
+        }
+    
+    page = request.args.get('page', 1, type=int)
+    cards = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    return cards.items, {
+        'total': total,
+        'pages': math.ceil(total / per_page),
+        'current_page': page
+    }
+
 @cards_bp.route('/cards', methods=['GET'])
 @jwt_required()
 def get_all_cards():
     """
     获取所有卡牌数据
+    响应按卡牌目录版本缓存，支持 ETag / If-None-Match 条件请求
     """
     try:
-        # 获取查询参数
-        card_type = request.args.get('type')
-        element = request.args.get('element')
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        # 构建查询
-        query = CardData.query
-        
-        if card_type:
-            query = query.filter(CardData.card_type == card_type)
-        if element:
-            query = query.filter(CardData.element_type == element)
-        
-        # 分页
-        cards = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        result = []
-        for card in cards.items:
-            result.append({
-                'id': card.id,
-                'name': card.name,
-                'card_type': card.card_type,
-                'element_type': card.element_type,
-                'rarity': card.rarity,
-                'cost': json.loads(card.cost) if card.cost else [],
-                'description': card.description,
-                'character_subtype': card.character_subtype,
-                'image_url': card.image_url
-            })
-        
-        return jsonify({
-            'cards': result,
-            'total': cards.total,
-            'pages': cards.pages,
-            'current_page': page
-        }), 200
+        return cached_catalog_response(_build_all_cards)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _build_all_cards() -> Dict[str, Any]:
+    """查询一页卡牌数据"""
+    # 获取查询参数
+    card_type = request.args.get('type')
+    element = request.args.get('element')
+    
+    # 构建查询
+    query = CardData.query
+    
+    if card_type:
+        query = query.filter(CardData.card_type == card_type)
+    if element:
+        query = query.filter(CardData.element_type == element)
+    
+    # 分页
+    cards, pagination = _paginate_cards(query, card_type, element)
+    
+    result = []
+    for card in cards:
+        result.append({
+            'id': card.id,
+            'name': card.name,
+            'card_type': card.card_type,
+            'element_type': card.element_type,
+            'rarity': card.rarity,
+            'cost': load_json_column(card.cost),
+            'description': card.description,
+            'character_subtype': card.character_subtype,
+            'image_url': card.image_url
+        })
+    
+    return {
+        'cards': result,
+        **pagination
+    }
+
+
 @cards_bp.route('/cards/characters', methods=['GET'])
 @jwt_required()
 def get_character_cards():
     """
     获取所有角色卡牌数据
+    响应按卡牌目录版本缓存，支持 ETag / If-None-Match 条件请求
     """
     try:
-        # 获取查询参数
-        element = request.args.get('element')
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        # 查询角色卡牌
-        query = CardData.query.filter(CardData.card_type == '角色牌')
-        
-        if element:
-            query = query.filter(CardData.element_type == element)
-        
-        cards = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        result = []
-        for card in cards.items:
-            result.append({
-                'id': card.id,
-                'name': card.name,
-                'card_type': card.card_type,
-                'element_type': card.element_type,
-                'rarity': card.rarity,
-                'cost': json.loads(card.cost) if card.cost else [],
-                'description': card.description,
-                'character_subtype': card.character_subtype,
-                'image_url': card.image_url,
-                # 角色卡的特殊属性
-                'health': card.health,
-                'energy': card.energy,
-                'weapon_type': card.weapon_type,
-                'skills': json.loads(card.skills) if card.skills else []
-            })
-        
-        return jsonify({
-            'cards': result,
-            'total': cards.total,
-            'pages': cards.pages,
-            'current_page': page
-        }), 200
+        return cached_catalog_response(_build_character_cards)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _build_character_cards() -> Dict[str, Any]:
+    """查询一页角色卡牌数据"""
+    # 获取查询参数
+    element = request.args.get('element')
+    
+    # 查询角色卡牌
+    query = CardData.query.filter(CardData.card_type == '角色牌')
+    
+    if element:
+        query = query.filter(CardData.element_type == element)
+    
+    cards, pagination = _paginate_cards(query, '角色牌', element)
+    
+    result = []
+    for card in cards:
+        result.append({
+            'id': card.id,
+            'name': card.name,
+            'card_type': card.card_type,
+            'element_type': card.element_type,
+            'rarity': card.rarity,
+            'cost': load_json_column(card.cost),
+            'description': card.description,
+            'character_subtype': card.character_subtype,
+            'image_url': card.image_url,
+            # 角色卡的特殊属性
+            'health': card.health,
+            'energy': card.energy,
+            'weapon_type': card.weapon_type,
+            'skills': load_json_column(card.skills)
+        })
+    
+    return {
+        'cards': result,
+        **pagination
+    }
+
+
 @cards_bp.route('/cards/events', methods=['GET'])
 @jwt_required()
 def get_event_cards():
     """
     获取所有事件卡牌数据
+    响应按卡牌目录版本缓存，支持 ETag / If-None-Match 条件请求
     """
     try:
-        # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        # 查询事件卡牌
-        query = CardData.query.filter(CardData.card_type == '事件牌')
-        cards = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        result = []
-        for card in cards.items:
-            result.append({
-                'id': card.id,
-                'name': card.name,
-                'card_type': card.card_type,
-                'rarity': card.rarity,
-                'cost': json.loads(card.cost) if card.cost else [],
-                'description': card.description,
-                'image_url': card.image_url
-            })
-        
-        return jsonify({
-            'cards': result,
-            'total': cards.total,
-            'pages': cards.pages,
-            'current_page': page
-        }), 200
+        return cached_catalog_response(_build_event_cards)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _build_event_cards() -> Dict[str, Any]:
+    """查询一页事件卡牌数据"""
+    # 查询事件卡牌
+    query = CardData.query.filter(CardData.card_type == '事件牌')
+    cards, pagination = _paginate_cards(query, '事件牌')
+    
+    result = []
+    for card in cards:
+        result.append({
+            'id': card.id,
+            'name': card.name,
+            'card_type': card.card_type,
+            'rarity': card.rarity,
+            'cost': load_json_column(card.cost),
+            'description': card.description,
+            'image_url': card.image_url
+        })
+    
+    return {
+        'cards': result,
+        **pagination
+    }
+
+
 @cards_bp.route('/decks', methods=['GET'])
 @jwt_required()
 def get_user_decks():
@@ -161,7 +209,7 @@ def get_user_decks():
                 'id': deck.id,
                 'name': deck.name,
                 'description': deck.description,
-                'cards': json.loads(deck.cards) if deck.cards else [],
+                'cards': load_json_column(deck.cards),
                 'created_at': deck.created_at.isoformat(),
                 'updated_at': deck.updated_at.isoformat()
             })
@@ -188,27 +236,8 @@ def create_deck():
         if not name:
             return jsonify({'error': '卡组名称不能为空'}), 400
         
-        # 使用新的验证系统验证卡组
-        # 首先，通过card_ids获取完整卡牌信息
-        cards_from_db = CardData.query.filter(CardData.id.in_(card_list)).all()
-        
-        # 将数据库中的卡牌数据转换为卡片对象用于验证
-        from utils.deck_validator import validate_deck_api
-        # 将数据库中的卡片转换为API验证函数需要的格式
-        card_data_for_validation = []
-        for card in cards_from_db:
-            card_data = {
-                'id': card.id,
-                'name': card.name,
-                'card_type': card.card_type,
-                'cost': json.loads(card.cost) if card.cost else [],
-                'description': card.description,
-                'character_subtype': card.character_subtype
-            }
-            card_data_for_validation.append(card_data)
-        
-        # 进行详细验证
-        validation_result = validate_deck_api(card_data_for_validation)
+        # 使用新的验证系统验证卡组（重复的卡牌ID按出现次数计数，与批量验证一致）
+        validation_result = validate_card_id_lists([card_list])[0]
         if not validation_result['is_valid']:
             return jsonify({'error': '卡组验证失败', 'details': validation_result['errors']}), 400
         
@@ -217,7 +246,7 @@ def create_deck():
             user_id=current_user_id,
             name=name,
             description=description,
-            cards=json.dumps(card_list)
+            cards=card_list
         )
         
         db.session.add(deck)
@@ -254,36 +283,17 @@ def update_deck(deck_id):
         
         name = data.get('name', deck.name)
         description = data.get('description', deck.description)
-        card_list = data.get('cards', json.loads(deck.cards) if deck.cards else [])
-        
-        # 使用新的验证系统验证卡组
-        # 首先，通过card_ids获取完整卡牌信息
-        cards_from_db = CardData.query.filter(CardData.id.in_(card_list)).all()
-        
-        # 将数据库中的卡牌数据转换为卡片对象用于验证
-        from utils.deck_validator import validate_deck_api
-        # 将数据库中的卡片转换为API验证函数需要的格式
-        card_data_for_validation = []
-        for card in cards_from_db:
-            card_data = {
-                'id': card.id,
-                'name': card.name,
-                'card_type': card.card_type,
-                'cost': json.loads(card.cost) if card.cost else [],
-                'description': card.description,
-                'character_subtype': card.character_subtype
-            }
-            card_data_for_validation.append(card_data)
+        card_list = data.get('cards', load_json_column(deck.cards))
         
-        # 进行详细验证
-        validation_result = validate_deck_api(card_data_for_validation)
+        # 使用新的验证系统验证卡组（重复的卡牌ID按出现次数计数，与批量验证一致）
+        validation_result = validate_card_id_lists([card_list])[0]
         if not validation_result['is_valid']:
             return jsonify({'error': '卡组验证失败', 'details': validation_result['errors']}), 400
         
         # 更新卡组
         deck.name = name
         deck.description = description
-        deck.cards = json.dumps(card_list)
+        deck.cards = card_list
         
         db.session.commit()
         
@@ -338,7 +348,7 @@ def get_deck(deck_id):
             return jsonify({'error': '卡组不存在或无权限访问'}), 404
         
         # 获取卡组中的卡牌详情
-        card_list = json.loads(deck.cards) if deck.cards else []
+        card_list = load_json_column(deck.cards)
         
         # 根据卡ID获取完整的卡牌信息
         cards = CardData.query.filter(CardData.id.in_(card_list)).all()
@@ -350,7 +360,7 @@ def get_deck(deck_id):
                 'card_type': card.card_type,
                 'element_type': card.element_type,
                 'rarity': card.rarity,
-                'cost': json.loads(card.cost) if card.cost else [],
+                'cost': load_json_column(card.cost),
                 'description': card.description,
                 'character_subtype': card.character_subtype,
                 'image_url': card.image_url
@@ -380,27 +390,82 @@ def validate_deck():
         data = request.get_json()
         card_list = data.get('cards', [])
         
-        # 通过card_ids获取完整卡牌信息
-        cards_from_db = CardData.query.filter(CardData.id.in_(card_list)).all()
+        # 进行详细验证（重复的卡牌ID按出现次数计数，与批量验证一致）
+        validation_result = validate_card_id_lists([card_list])[0]
         
-        # 将数据库中的卡牌数据转换为卡片对象用于验证
-        from utils.deck_validator import validate_deck_api
-        # 将数据库中的卡片转换为API验证函数需要的格式
-        card_data_for_validation = []
-        for card in cards_from_db:
-            card_data = {
+        return jsonify(validation_result), 200
+    except Exception as e:
+        return jsonify({'error': str(e), 'is_valid': False, 'errors': ['验证过程中发生错误']}), 500
+
+# 批量验证一次最多提交的卡组数
+MAX_VALIDATE_BATCH_SIZE = 1000
+
+# 按ID查询卡牌时每条 IN 查询的ID数（SQLite 限制单条语句的参数个数）
+CARD_ID_QUERY_CHUNK = 500
+
+
+def validate_card_id_lists(card_lists: List[List[str]]) -> List[Dict[str, Any]]:
+    """
+    按卡牌ID列表验证卡组，单个卡组和批量验证共用
+    
+    所有卡组用到的卡牌只查询一次；卡组按ID列表的顺序展开，同一ID出现几次就计几张，未知的卡牌ID被忽略
+    """
+    from utils.deck_validator import validate_deck_batch_api
+    
+    unique_ids = list({card_id for card_list in card_lists for card_id in card_list})
+    cards_by_id = {}
+    for start in range(0, len(unique_ids), CARD_ID_QUERY_CHUNK):
+        chunk = unique_ids[start:start + CARD_ID_QUERY_CHUNK]
+        for card in CardData.query.filter(CardData.id.in_(chunk)).all():
+            cards_by_id[card.id] = {
                 'id': card.id,
                 'name': card.name,
                 'card_type': card.card_type,
-                'cost': json.loads(card.cost) if card.cost else [],
+                'cost': load_json_column(card.cost),
                 'description': card.description,
                 'character_subtype': card.character_subtype
             }
-            card_data_for_validation.append(card_data)
-        
-        # 进行详细验证
-        validation_result = validate_deck_api(card_data_for_validation)
-        
-        return jsonify(validation_result), 200
+    return validate_deck_batch_api(cards_by_id, card_lists)
+
+
+@cards_bp.route('/decks/validate-batch', methods=['POST'])
+@jwt_required()
+def validate_deck_batch():
+    """
+    批量验证卡组（用于比赛导入卡组、批量审核卡组）
+    
+    请求体: {"decks": [{"id": "可选的卡组标识", "cards": [卡牌ID...]}, ...]}，卡组也可以直接是卡牌ID列表
+    所有卡组用到的卡牌只查询一次，每张卡牌只转换一次，验证总耗时与卡牌总数成线性关系
+    """
+    try:
+        data = request.get_json() or {}
+        decks = data.get('decks')
+        if not isinstance(decks, list):
+            return jsonify({'error': 'decks必须是卡组列表'}), 400
+        if len(decks) > MAX_VALIDATE_BATCH_SIZE:
+            return jsonify({'error': f'一次最多验证{MAX_VALIDATE_BATCH_SIZE}个卡组'}), 400
+        
+        deck_ids = []
+        deck_card_lists = []
+        for index, deck in enumerate(decks):
+            if isinstance(deck, dict):
+                deck_ids.append(deck.get('id', index))
+                card_list = deck.get('cards', [])
+            else:
+                deck_ids.append(index)
+                card_list = deck
+            if not isinstance(card_list, list):
+                return jsonify({'error': f'第{index + 1}个卡组的cards必须是卡牌ID列表'}), 400
+            deck_card_lists.append(card_list)
+        
+        # 所有卡组用到的卡牌只查询一次
+        results = validate_card_id_lists(deck_card_lists)
+        
+        valid_count = sum(1 for result in results if result['is_valid'])
+        return jsonify({
+            'results': [{'id': deck_id, **result} for deck_id, result in zip(deck_ids, results)],
+            'valid_count': valid_count,
+            'invalid_count': len(results) - valid_count
+        }), 200
     except Exception as e:
-        return jsonify({'error': str(e), 'is_valid': False, 'errors': ['验证过程中发生错误']}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,242 @@
+"""
+卡牌列表响应缓存
+
+卡牌数据只在导入时变化。import_card_data.py 导入后递增数据库中的卡牌目录版本（CatalogVersion），
+卡牌列表接口按 (版本, 路径, 查询参数) 缓存序列化后的响应体，并返回 ETag 和 Last-Modified：
+- 客户端带 If-None-Match / If-Modified-Since 重复请求时直接返回 304，不查询数据库
+- 其他客户端请求同一页时直接返回缓存的响应体，不再分页查询和解析JSON
+
+每个进程最多每 VERSION_CHECK_INTERVAL 秒读取一次版本，导入后最迟在这个间隔后返回新数据。
+卡牌列表的总数从按版本缓存的卡牌目录统计（按类型和元素分组的数量）中获取，不再每次执行 COUNT。
+卡组验证使用的卡牌对象（validation_cards）同样按版本缓存，验证卡组时不再查询数据库。
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app, request
+from sqlalchemy.exc import SQLAlchemyError
+
+# 两次读取卡牌目录版本的最小间隔（秒）
+VERSION_CHECK_INTERVAL = float(os.environ.get('CATALOG_VERSION_CHECK_INTERVAL', 1.0))
+
+# 缓存的响应页数上限
+DEFAULT_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', 512))
+
+logger = logging.getLogger(__name__)
+
+
+def _load_catalog_version() -> Tuple[int, Optional[datetime]]:
+    from models.db_models import CatalogVersion, db
+
+    row = db.session.get(CatalogVersion, 1)
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
+
+
+def bump_catalog_version() -> int:
+    """
+    递增卡牌目录版本（导入或修改卡牌数据后调用），需要在应用上下文中执行
+    """
+    from models.db_models import CatalogVersion, db
+
+    row = db.session.get(CatalogVersion, 1)
+    if row is None:
+        row = CatalogVersion(id=1, version=0)
+        db.session.add(row)
+    row.version += 1
+    row.updated_at = datetime.utcnow()
+    db.session.commit()
+    catalog_version.invalidate()
+    catalog_summary.invalidate()
+    validation_cards.invalidate()
+    return row.version
+
+
+class _VersionHolder:
+    """
+    缓存当前进程读到的卡牌目录版本
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value: Optional[Tuple[int, Optional[datetime]]] = None
+        self._last_check = 0.0
+
+    def get(self) -> Tuple[int, Optional[datetime]]:
+        now = time.monotonic()
+        value = self._value
+        if value is not None and now - self._last_check < VERSION_CHECK_INTERVAL:
+            return value
+
+        with self._lock:
+            if self._value is not None and now - self._last_check < VERSION_CHECK_INTERVAL:
+                return self._value
+            try:
+                self._value = _load_catalog_version()
+            except SQLAlchemyError as e:
+                # 旧数据库没有 catalog_version 表（未执行 create_all），按版本0处理
+                logger.warning(f"Could not read catalog version: {e}")
+                self._value = (0, None)
+            self._last_check = now
+            return self._value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+
+
+catalog_version = _VersionHolder()
+
+
+class _SummaryHolder:
+    """
+    按卡牌目录版本缓存的卡牌数量统计：(卡牌类型, 元素类型) -> 数量
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._summary: Optional[Tuple[int, Dict[Tuple[str, Optional[str]], int]]] = None
+
+    def get(self) -> Dict[Tuple[str, Optional[str]], int]:
+        version = catalog_version.get()[0]
+        summary = self._summary
+        if summary is not None and summary[0] == version:
+            return summary[1]
+
+        from models.db_models import CardData, db
+
+        with self._lock:
+            if self._summary is None or self._summary[0] != version:
+                rows = db.session.query(
+                    CardData.card_type, CardData.element_type, db.func.count()
+                ).group_by(CardData.card_type, CardData.element_type).all()
+                self._summary = (version, {(card_type, element): count for card_type, element, count in rows})
+            return self._summary[1]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._summary = None
+
+
+catalog_summary = _SummaryHolder()
+
+
+class _ValidationCardHolder:
+    """
+    按卡牌目录版本缓存的卡组验证用卡牌对象：卡牌ID和卡牌名称 -> Card
+
+    卡组编辑器使用卡牌名称作为卡牌ID（见 api/deck_builder/card_catalog.py 的 format_card），
+    因此同时按数据库ID和名称索引（卡牌名称唯一，数据库ID是UUID，两者不会冲突）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cards: Optional[Tuple[int, Dict[str, Any]]] = None
+
+    def get(self) -> Dict[str, Any]:
+        version = catalog_version.get()[0]
+        cards = self._cards
+        if cards is not None and cards[0] == version:
+            return cards[1]
+
+        from models.db_models import CardData
+        from utils.deck_validator import card_from_dict
+
+        with self._lock:
+            if self._cards is None or self._cards[0] != version:
+                by_key = {}
+                for row in CardData.query.all():
+                    card = card_from_dict(row.to_dict())
+                    by_key[row.id] = card
+                    by_key.setdefault(row.name, card)
+                self._cards = (version, by_key)
+            return self._cards[1]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._cards = None
+
+
+validation_cards = _ValidationCardHolder()
+
+
+def catalog_card_count(card_type: Optional[str] = None, element: Optional[str] = None) -> int:
+    """
+    满足类型、元素过滤条件的卡牌数量（与卡牌列表的过滤条件一致，未指定的条件不过滤）
+    """
+    return sum(
+        count for (row_type, row_element), count in catalog_summary.get().items()
+        if (not card_type or row_type == card_type) and (not element or row_element == element)
+    )
+
+
+class ResponseCache:
+    """
+    按键缓存序列化后的响应体的LRU缓存
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: Any, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache()
+
+
+def _make_etag(version: int, key: Tuple[Any, ...]) -> str:
+    # 不同进程对同一版本的同一页生成相同的ETag
+    return hashlib.sha1(repr((version, key)).encode('utf-8')).hexdigest()
+
+
+def cached_catalog_response(build: Callable[[], Dict[str, Any]]):
+    """
+    返回卡牌列表接口的响应：命中条件请求时返回304，命中缓存时返回缓存的响应体，
+    否则调用 build 生成响应数据并缓存
+    """
+    version, last_modified = catalog_version.get()
+    key = (request.path, tuple(sorted(request.args.items(multi=True))))
+    etag = _make_etag(version, key)
+
+    cache_key = (version,) + key
+    body = response_cache.get(cache_key)
+    if body is None and etag not in request.if_none_match:
+        body = current_app.json.dumps(build()).encode('utf-8')
+        response_cache.put(cache_key, body)
+
+    response = current_app.response_class(body or b'', mimetype='application/json')
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # 列表需要登录后访问，只允许客户端缓存，每次使用前重新验证
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
@@ -1,218 +1,36 @@
 from flask import Blueprint, jsonify, request
-import json
-import os
+import random
+import uuid
+from api.catalog_cache import validation_cards
+from game_engine.deck_validation import IncrementalDeckValidator
+from game_engine.session_store import session_store_from_env
 from utils.deck_validator import validate_deck_composition
+from .search_index import split_search_terms
+from .card_catalog import (
+    get_card_catalog,
+    load_card_data,
+    extract_element_from_character,
+    extract_country_from_region,
+    extract_element_from_region,
+    extract_weapon_type_from_region,
+)
 
 deck_builder_api = Blueprint('deck_builder_api', __name__)
 
-def load_card_data():
-    """从card_data目录中加载所有卡牌数据，但不包括角色技能"""
-    card_data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'card_data')
-    all_cards = []
-    
-    # 加载各类卡牌数据
-    for filename in ['equipments.json', 'events.json', 'supports.json']:
-        file_path = os.path.join(card_data_path, filename)
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    cards = json.load(f)
-                    all_cards.extend(cards)
-            except Exception as e:
-                print(f"Error loading {file_path}: {e}")
-    
-    # 单独处理角色数据，提取国家、元素、武器信息
-    character_file = os.path.join(card_data_path, 'characters.json')
-    if os.path.exists(character_file):
-        try:
-            with open(character_file, 'r', encoding='utf-8') as f:
-                characters = json.load(f)
-                for character in characters:
-                    # 提取国家和元素信息
-                    region_info = character.get('region', '')
-                    # 从region字段中提取国家信息，例如：角色牌稻妻单手剑 -> 国家：稻妻，武器：单手剑
-                    country = extract_country_from_region(region_info)
-                    
-                    # 从角色技能费用中提取元素信息（这比从region字段更准确）
-                    element = extract_element_from_character(character)
-                    
-                    weapon_type = extract_weapon_type_from_region(region_info)
-                    
-                    # 创建角色的概要信息
-                    character_summary = {
-                        'name': character.get('name', ''),
-                        'type': '角色牌',  # 统一类型
-                        'subtype': '角色牌',
-                        'title': region_info,
-                        'description': f"角色牌：{character.get('name', '')}，武器类型：{character.get('weapon', '')}",
-                        'skills': character.get('skills', []),  # 保存技能信息以备后用，但不作为独立卡牌
-                        'country': country,  # 国家
-                        'element': element,  # 元素
-                        'weapon_type': weapon_type  # 武器类型
-                    }
-                    all_cards.append(character_summary)
-        except Exception as e:
-            print(f"Error loading {character_file}: {e}")
-    
-    return all_cards
-
-
-def extract_element_from_character(character):
-    """从角色技能费用中提取元素信息"""
-    if 'skills' in character and len(character['skills']) > 0:
-        first_skill = character['skills'][0]
-        if 'cost' in first_skill:
-            costs = first_skill['cost']
-            for cost in costs:
-                if isinstance(cost, dict) and 'type' in cost:
-                    cost_type = cost['type']
-                    # 检查是否为元素类型
-                    elements = ['火', '水', '雷', '草', '风', '岩', '冰', '物理']
-                    if cost_type in elements:
-                        return cost_type
-                    # 检查始基力类型
-                    if '始基力' in cost_type:
-                        if '荒性' in cost_type:
-                            return '荒性'
-                        elif '芒性' in cost_type:
-                            return '芒性'
-    
-    # 如果从技能费用中无法提取，尝试从region字段中获取
-    region_info = character.get('region', '')
-    elements = ['火', '水', '雷', '草', '风', '岩', '冰', '物理']
-    
-    # 检查是否包含始基力类型
-    if '始基力：荒性' in region_info:
-        return '荒性'
-    elif '始基力：芒性' in region_info:
-        return '芒性'
-    
-    # 检查常规元素
-    for element in elements:
-        if element in region_info:
-            return element
-    
-    return '物理'
-
-
-def extract_country_from_region(region):
-    """从region字段中提取国家信息"""
-    # region格式示例：角色牌稻妻单手剑
-    if not region:
-        return '未知'
-    
-    # 常见国家列表
-    countries = ['蒙德', '璃月', '稻妻', '须弥', '枫丹', '纳塔', '至冬', '魔物', '愚人众', '丘丘人']
-    
-    for country in countries:
-        if country in region:
-            return country
-    
-    return '其他'
-
-
-def extract_element_from_region(region):
-    """从region字段中提取元素信息"""
-    if not region:
-        return '未知'
-    
-    # 常见元素列表，包括始基力类型
-    elements = ['火', '水', '雷', '草', '风', '岩', '冰', '物理']
-    
-    # 检查是否包含始基力类型
-    if '始基力：荒性' in region:
-        return '荒性'
-    elif '始基力：芒性' in region:
-        return '芒性'
-    
-    # 检查常规元素
-    for element in elements:
-        if element in region:
-            return element
-    
-    return '物理'
+# 卡组编辑会话默认空闲30分钟后淘汰，可通过 DECK_EDIT_SESSION_* 环境变量配置
+DEFAULT_DECK_EDIT_SESSION_TTL = 30 * 60
 
+# 卡组编辑器不需要登录，会话数量设置上限，超出时淘汰最久未使用的会话（客户端收到404后重新提交完整卡组）
+DEFAULT_DECK_EDIT_SESSION_MAX = 10000
 
-def extract_weapon_type_from_region(region):
-    """从region字段中提取武器类型信息"""
-    if not region:
-        return '未知'
-    
-    # 常见武器类型
-    weapon_types = ['单手剑', '双手剑', '长柄武器', '弓', '法器', '其他武器']
-    
-    for weapon_type in weapon_types:
-        if weapon_type in region:
-            return weapon_type
-    
-    return '其他'
-
+# 卡组编辑会话：会话ID -> IncrementalDeckValidator
+deck_edit_sessions = session_store_from_env(prefix='DECK_EDIT_SESSION', namespace='deck_edit',
+                                            default_ttl=DEFAULT_DECK_EDIT_SESSION_TTL,
+                                            default_max_sessions=DEFAULT_DECK_EDIT_SESSION_MAX)
 
 def get_card_tags():
     """从卡牌数据中提取所有可能的标签"""
-    all_cards = load_card_data()
-    tags = set()
-    
-    # 定义有意义的标签类别
-    valid_tags = {
-        '事件牌', '装备牌', '支援牌', '角色牌', '元素共鸣', '武器', '圣遗物', 
-        '天赋', '特技', '秘传', '伙伴', '料理', '道具', '场地', '战斗行动'
-    }
-    
-    for card in all_cards:
-        # 如果是角色牌，跳过标签提取（因为用户选择其他卡牌时不需要角色牌标签）
-        if card.get('type') == '角色牌':
-            continue
-        
-        # 添加基础类型标签
-        if 'subtype' in card and card['subtype'] in valid_tags:
-            tags.add(card['subtype'])
-        if 'type' in card and card['type'] in valid_tags and card['type'] != '角色牌':
-            tags.add(card['type'])
-        if 'category' in card:
-            # 从category中提取标签，例如：装备牌行动牌武器 单手剑 -> 武器、单手剑
-            cat = card['category']
-            if '武器' in cat:
-                tags.add('武器')
-            if '圣遗物' in cat:
-                tags.add('圣遗物')
-            if '天赋' in cat:
-                tags.add('天赋')
-            if '特技' in cat:
-                tags.add('特技')
-            if '秘传' in cat:
-                tags.add('秘传')
-            if '伙伴' in cat:
-                tags.add('伙伴')
-            if '料理' in cat:
-                tags.add('料理')
-            if '道具' in cat:
-                tags.add('道具')
-            if '场地' in cat:
-                tags.add('场地')
-            if '元素共鸣' in cat:
-                tags.add('元素共鸣')
-            if '战斗行动' in cat:
-                tags.add('战斗行动')
-        
-        # 检查技能描述中是否包含特殊标签
-        if 'skills' in card:
-            for skill in card['skills']:
-                if 'description' in skill:
-                    desc = skill['description']
-                    # 确保只在非角色牌上检查技能描述中的标签
-                    if '特技' in desc:
-                        tags.add('特技')
-                    if '天赋' in desc and card.get('type') not in ['圣遗物牌', '武器牌']:
-                        # 修复天赋标签问题：确保天赋标签只应用于适当的卡牌类型
-                        tags.add('天赋')
-    
-    # 添加基础卡牌类型（但排除角色牌，因为用户选择其他卡牌时不需要角色牌标签）
-    tags.add('事件牌')
-    tags.add('装备牌')
-    tags.add('支援牌')
-    
-    return sorted(list(tags))
+    return get_card_catalog().tags
 
 
 @deck_builder_api.route('/api/deck/validate', methods=['POST'])
@@ -260,6 +78,85 @@ def validate_deck_api():
         }), 400
 
 
+def _card_refs(data, key):
+    refs = data.get(key) or []
+    if not isinstance(refs, list) or not all(isinstance(ref, str) for ref in refs):
+        raise ValueError(f"{key} 必须是卡牌ID列表")
+    return refs
+
+
+@deck_builder_api.route('/api/deck/validate-delta', methods=['POST'])
+def validate_deck_delta():
+    """
+    增量验证卡组：编辑卡组时只提交变化的卡牌
+
+    请求体:
+        session: 之前返回的编辑会话ID，省略或会话已过期时按 characters 和 cards 新建会话
+        characters / cards: 完整卡组（新建会话时使用），卡牌ID或卡牌名称列表
+        add / remove: 本次添加、移除的卡牌ID或卡牌名称列表
+
+    每次点击只更新变化的卡牌对应的规则状态，不查询数据库，也不重新验证整个卡组。
+    未知的卡牌会被忽略（与 /api/deck/validate 一致），并在 unknown 中返回。
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': '请求体必须是JSON对象'}), 400
+    try:
+        deck_refs = _card_refs(data, 'characters') + _card_refs(data, 'cards')
+        added = _card_refs(data, 'add')
+        removed = _card_refs(data, 'remove')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    session_id = data.get('session')
+    if not isinstance(session_id, str) or session_id not in deck_edit_sessions:
+        if session_id and not deck_refs:
+            return jsonify({'error': '卡组编辑会话不存在或已过期，请提交完整卡组'}), 404
+        session_id = None
+
+    cards = validation_cards.get()
+    unknown = [ref for ref in deck_refs + added + removed if ref not in cards]
+
+    if session_id is None:
+        session_id = uuid.uuid4().hex
+        validator = IncrementalDeckValidator(cards[ref] for ref in deck_refs if ref in cards)
+        deck_edit_sessions[session_id] = validator
+
+    with deck_edit_sessions.locked(session_id):
+        validator = deck_edit_sessions.get(session_id)
+        if validator is None:
+            return jsonify({'error': '卡组编辑会话不存在或已过期，请提交完整卡组'}), 404
+        done = []
+        try:
+            for ref in removed:
+                if ref in cards:
+                    validator.remove(cards[ref])
+                    done.append(cards[ref])
+        except ValueError as e:
+            # 撤销本次已经移除的卡牌，会话保持请求前的状态
+            for card in done:
+                validator.add(card)
+            return jsonify({'error': str(e)}), 400
+        for ref in added:
+            if ref in cards:
+                validator.add(cards[ref])
+        deck_edit_sessions[session_id] = validator
+        result = validator.result()
+
+    return jsonify({
+        'session': session_id,
+        'valid': result['is_valid'],
+        'errors': result['errors'],
+        'warnings': result['warnings'],
+        'counts': {
+            'total': validator.total,
+            'characters': validator.character_count,
+            'actions': validator.action_count,
+        },
+        'unknown': unknown,
+    })
+
+
 @deck_builder_api.route('/api/cards/tags', methods=['GET'])
 def get_tags():
     """获取所有可用的标签"""
@@ -270,31 +167,7 @@ def get_tags():
 @deck_builder_api.route('/api/characters/filters', methods=['GET'])
 def get_character_filters():
     """获取角色的过滤选项（国家、元素、武器类型）"""
-    all_cards = load_card_data()
-    characters = [card for card in all_cards if card.get('type') == '角色牌']
-    
-    countries = set()
-    elements = set()
-    weapon_types = set()
-    
-    for character in characters:
-        countries.add(character.get('country', '未知'))
-        elements.add(character.get('element', '未知'))
-        weapon_types.add(character.get('weapon_type', '未知'))
-    
-    # 移除'未知'选项，如果存在其他选项
-    if len(countries) > 1:
-        countries.discard('未知')
-    if len(elements) > 1:
-        elements.discard('未知')
-    if len(weapon_types) > 1:
-        weapon_types.discard('未知')
-    
-    return jsonify({
-        'countries': sorted(list(countries)),
-        'elements': sorted(list(elements)),
-        'weapon_types': sorted(list(weapon_types))
-    })
+    return jsonify(get_card_catalog().character_filters)
 
 
 @deck_builder_api.route('/api/cards/filter', methods=['GET'])
@@ -312,174 +185,44 @@ def filter_cards():
     # 过滤掉空字符串
     tags = [tag for tag in tags if tag]
     
-    all_cards = load_card_data()
-    filtered_cards = all_cards
-    
-    # 根据类型过滤
-    if card_type:
-        if card_type == '非角色牌':
-            # 只显示非角色牌
-            filtered_cards = [card for card in filtered_cards if card.get('type') != '角色牌']
-        else:
-            filtered_cards = [card for card in filtered_cards 
-                             if card.get('subtype', '').lower() == card_type.lower() or 
-                                card.get('type', '').lower() == card_type.lower()]
-    
-    # 根据费用过滤
-    if cost:
-        if cost == 'other':
-            # 费用为4或更高，或其他特殊费用
-            def has_high_cost(card):
-                # 对于角色牌，我们不考虑技能费用，因为角色牌本身没有费用
-                if card.get('type') == '角色牌':
-                    return False  # 角色牌没有费用
-                if 'skills' in card and len(card['skills']) > 0:
-                    # 处理装备、事件、支援牌等
-                    skill = card['skills'][0]
-                    if 'cost' in skill:
-                        costs = skill['cost']
-                        for c in costs:
-                            if isinstance(c, dict) and 'value' in c:
-                                if isinstance(c['value'], (int, float)) and c['value'] >= 4:
-                                    return True
-                        # 检查是否有其他非数值的高成本标识
-                        return len(costs) >= 4
-                return False
-            filtered_cards = [card for card in filtered_cards if has_high_cost(card)]
-        else:
-            cost_value = int(cost)
-            def has_specific_cost(card):
-                # 对于角色牌，我们不考虑技能费用，因为角色牌本身没有费用
-                if card.get('type') == '角色牌':
-                    # 角色牌没有费用，所以只有当cost_value为0时才匹配
-                    return cost_value == 0
-                if 'skills' in card and len(card['skills']) > 0:
-                    skill = card['skills'][0]
-                    if 'cost' in skill:
-                        costs = skill['cost']
-                        # 简化费用计算逻辑：检查是否有指定数量的费用项
-                        cost_count = 0
-                        for c in costs:
-                            if isinstance(c, dict) and 'value' in c:
-                                if isinstance(c['value'], (int, float)):
-                                    cost_count += c['value']
-                                else:
-                                    cost_count += 1
-                            else:
-                                cost_count += 1
-                        return cost_count == cost_value
-                return cost_value == 0
-            filtered_cards = [card for card in filtered_cards if has_specific_cost(card)]
-    
-    # 根据国家过滤（仅适用于角色牌）
-    if country:
-        filtered_cards = [card for card in filtered_cards if card.get('type') != '角色牌' or card.get('country', '').lower() == country.lower()]
-    
-    # 根据元素过滤（仅适用于角色牌）
-    if element:
-        filtered_cards = [card for card in filtered_cards if card.get('type') != '角色牌' or card.get('element', '').lower() == element.lower()]
-    
-    # 根据武器类型过滤（仅适用于角色牌）
-    if weapon_type:
-        filtered_cards = [card for card in filtered_cards if card.get('type') != '角色牌' or card.get('weapon_type', '').lower() == weapon_type.lower()]
-    
-    # 根据标签过滤（多选）
-    if tags:
-        def has_any_tag(card):
-            for tag in tags:
-                # 检查类型标签
-                if card.get('subtype', '') == tag or card.get('type', '') == tag:
-                    return True
-                # 检查类别标签
-                if 'category' in card:
-                    cat = card['category']
-                    if tag in cat:
-                        return True
-                # 检查技能描述（仅对非角色牌）
-                if 'skills' in card and card.get('type') != '角色牌':
-                    for skill in card['skills']:
-                        if 'description' in skill and tag in skill['description']:
-                            return True
-                # 对角色牌检查区域等信息
-                if card.get('type') == '角色牌' and tag in card.get('title', ''):
-                    return True
-            return False
-        filtered_cards = [card for card in filtered_cards if has_any_tag(card)]
+    catalog = get_card_catalog()
+    card_ids = catalog.filter_ids(
+        card_type=card_type,
+        cost=cost,
+        country=country,
+        element=element,
+        weapon_type=weapon_type,
+        tags=tags
+    )
+    filtered_ids = sorted(card_ids)
+    
+    # 根据搜索关键词过滤（支持多关键字，空格分割），结果按相关度排序
+    search_terms = split_search_terms(search)
+    if search_terms:
+        filtered_ids = catalog.search_index.search(search_terms, within=filtered_ids)
+    
+    # 返回预先格式化好的卡牌数据
+    result_cards = catalog.views_for(filtered_ids)
     
-    # 根据搜索关键词过滤（支持多关键字，空格分割）
-    if search:
-        # 将搜索词按空格分割成多个关键字
-        search_terms = [term.strip().lower() for term in search.split() if term.strip()]
-        if search_terms:
-            def card_matches_search(card):
-                # 检查每个关键字是否在卡牌的任何字段中
-                for term in search_terms:
-                    # 检查名称
-                    if term in card.get('name', '').lower():
-                        continue  # 这个关键字匹配了，检查下一个
-                    # 检查类型
-                    if term in card.get('type', '').lower():
-                        continue  # 这个关键字匹配了，检查下一个
-                    # 检查标题
-                    if card.get('title', '') and term in card['title'].lower():
-                        continue  # 这个关键字匹配了，检查下一个
-                    # 检查描述
-                    if card.get('description', '') and term in card['description'].lower():
-                        continue  # 这个关键字匹配了，检查下一个
-                    # 检查技能描述（对于所有卡牌，包括角色牌）
-                    if 'skills' in card:
-                        skill_match = False
-                        for skill in card['skills']:
-                            # 检查技能名称
-                            if 'name' in skill and term in skill['name'].lower():
-                                skill_match = True
-                                break
-                            # 检查技能描述
-                            if 'description' in skill and term in skill['description'].lower():
-                                skill_match = True
-                                break
-                            # 检查技能类型
-                            if 'type' in skill and term in skill['type'].lower():
-                                skill_match = True
-                                break
-                        if skill_match:
-                            continue  # 这个关键字匹配了，检查下一个
-                    # 如果没有任何字段匹配当前关键字，则整个搜索不匹配
-                    return False
-                # 如果所有关键字都匹配了，则这个卡牌匹配搜索
-                return True
-            
-            filtered_cards = [card for card in filtered_cards if card_matches_search(card)]
+    return jsonify({'cards': result_cards, 'total': len(result_cards)})
+
+
+@deck_builder_api.route('/api/cards/suggest', methods=['GET'])
+def suggest_cards():
+    """搜索联想：返回名称以输入开头或包含输入的卡牌"""
+    query = request.args.get('q', '')
+    limit = min(request.args.get('limit', 10, type=int), 50)
     
-    # 格式化返回数据
-    result_cards = []
-    for card in filtered_cards:
-        result_card = {
-            'id': card.get('name', ''),  # 使用名字作为ID
-            'name': card.get('name', 'Unknown'),
-            'type': card.get('type', 'Unknown'),  # 使用统一的type
-            'description': card.get('description', ''),
-            'cost': [],
-            'country': card.get('country', ''),
-            'element': card.get('element', ''),
-            'weapon_type': card.get('weapon_type', ''),
-            'skills': card.get('skills', [])  # 包含技能信息，这对于角色卡很重要
-        }
-        
-        # 获取title（如果有）
-        if 'title' in card:
-            result_card['title'] = card['title']
-        
-        # 对于非角色牌，更新描述和费用信息
-        if card.get('type') != '角色牌' and 'skills' in card and len(card['skills']) > 0:
-            skill = card['skills'][0]
-            result_card['description'] = skill.get('description', '')
-            if 'cost' in skill:
-                result_card['cost'] = skill['cost']
-        
-        result_cards.append(result_card)
+    catalog = get_card_catalog()
+    suggestions = [
+        {
+            'id': view['id'],
+            'name': view['name'],
+            'type': view['type']
+        } for view in catalog.views_for(catalog.search_index.suggest(query, limit))
+    ]
     
-    return jsonify({'cards': result_cards, 'total': len(result_cards)})
+    return jsonify({'suggestions': suggestions})
 
 
 # 新增：随机选择功能
@@ -492,61 +235,16 @@ def get_random_cards():
     weapon_type = request.args.get('weapon_type', '')
     count = int(request.args.get('count', 1))
     
-    all_cards = load_card_data()
-    filtered_cards = all_cards
-    
-    # 根据类型过滤
-    if card_type:
-        if card_type == '非角色牌':
-            # 只显示非角色牌
-            filtered_cards = [card for card in filtered_cards if card.get('type') != '角色牌']
-        else:
-            filtered_cards = [card for card in filtered_cards 
-                             if card.get('subtype', '').lower() == card_type.lower() or 
-                                card.get('type', '').lower() == card_type.lower()]
-    
-    # 根据国家过滤（仅适用于角色牌）
-    if country:
-        filtered_cards = [card for card in filtered_cards if card.get('type') != '角色牌' or card.get('country', '').lower() == country.lower()]
-    
-    # 根据元素过滤（仅适用于角色牌）
-    if element:
-        filtered_cards = [card for card in filtered_cards if card.get('type') != '角色牌' or card.get('element', '').lower() == element.lower()]
-    
-    # 根据武器类型过滤（仅适用于角色牌）
-    if weapon_type:
-        filtered_cards = [card for card in filtered_cards if card.get('type') != '角色牌' or card.get('weapon_type', '').lower() == weapon_type.lower()]
+    catalog = get_card_catalog()
+    filtered_ids = sorted(catalog.filter_ids(
+        card_type=card_type,
+        country=country,
+        element=element,
+        weapon_type=weapon_type
+    ))
     
     # 随机选择卡牌
-    import random
-    selected_cards = random.sample(filtered_cards, min(count, len(filtered_cards)))
+    selected_ids = random.sample(filtered_ids, min(count, len(filtered_ids)))
+    result_cards = catalog.views_for(selected_ids)
     
-    # 格式化返回数据
-    result_cards = []
-    for card in selected_cards:
-        result_card = {
-            'id': card.get('name', ''),  # 使用名字作为ID
-            'name': card.get('name', 'Unknown'),
-            'type': card.get('type', 'Unknown'),  # 使用统一的type
-            'description': card.get('description', ''),
-            'cost': [],
-            'country': card.get('country', ''),
-            'element': card.get('element', ''),
-            'weapon_type': card.get('weapon_type', ''),
-            'skills': card.get('skills', [])  # 包含技能信息，这对于角色卡很重要
-        }
-        
-        # 获取title（如果有）
-        if 'title' in card:
-            result_card['title'] = card['title']
-        
-        # 对于非角色牌，更新描述和费用信息
-        if card.get('type') != '角色牌' and 'skills' in card and len(card['skills']) > 0:
-            skill = card['skills'][0]
-            result_card['description'] = skill.get('description', '')
-            if 'cost' in skill:
-                result_card['cost'] = skill['cost']
-        
-        result_cards.append(result_card)
-    
-    return jsonify({'cards': result_cards, 'total': len(result_cards)})
\ No newline at end of file
+    return jsonify({'cards': result_cards, 'total': len(result_cards)})
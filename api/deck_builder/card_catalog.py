@@ -0,0 +1,496 @@
+"""
+卡组构建器的卡牌目录
+
+进程内只解析一次 card_data/ 下的 JSON 文件，并预先计算类型、子类型、国家、元素、
+武器类型、标签和总费用的倒排索引，过滤时只需做集合运算。
+数据文件的修改时间变化时会自动重新加载。
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from .search_index import CardSearchIndex
+
+CARD_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'card_data')
+
+# 行动牌数据文件和角色数据文件
+ACTION_CARD_FILES = ['equipments.json', 'events.json', 'supports.json']
+CHARACTER_FILE = 'characters.json'
+
+# 有意义的标签类别
+VALID_TAGS = {
+    '事件牌', '装备牌', '支援牌', '角色牌', '元素共鸣', '武器', '圣遗物',
+    '天赋', '特技', '秘传', '伙伴', '料理', '道具', '场地', '战斗行动'
+}
+
+# 可以从category字段中提取的标签
+CATEGORY_TAGS = ['武器', '圣遗物', '天赋', '特技', '秘传', '伙伴', '料理', '道具', '场地', '元素共鸣', '战斗行动']
+
+# 两次检查数据文件修改时间的最小间隔（秒）
+RELOAD_CHECK_INTERVAL = 1.0
+
+# 未预先建立索引的标签的缓存上限
+MAX_ADHOC_TAG_CACHE = 256
+
+
+def load_card_data(card_data_path: str = CARD_DATA_PATH) -> List[Dict[str, Any]]:
+    """从card_data目录中加载所有卡牌数据，但不包括角色技能"""
+    all_cards = []
+
+    # 加载各类卡牌数据
+    for filename in ACTION_CARD_FILES:
+        file_path = os.path.join(card_data_path, filename)
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    cards = json.load(f)
+                    all_cards.extend(cards)
+            except Exception as e:
+                print(f"Error loading {file_path}: {e}")
+
+    # 单独处理角色数据，提取国家、元素、武器信息
+    character_file = os.path.join(card_data_path, CHARACTER_FILE)
+    if os.path.exists(character_file):
+        try:
+            with open(character_file, 'r', encoding='utf-8') as f:
+                characters = json.load(f)
+                for character in characters:
+                    # 提取国家和元素信息
+                    region_info = character.get('region', '')
+                    # 从region字段中提取国家信息，例如：角色牌稻妻单手剑 -> 国家：稻妻，武器：单手剑
+                    country = extract_country_from_region(region_info)
+
+                    # 从角色技能费用中提取元素信息（这比从region字段更准确）
+                    element = extract_element_from_character(character)
+
+                    weapon_type = extract_weapon_type_from_region(region_info)
+
+                    # 创建角色的概要信息
+                    character_summary = {
+                        'name': character.get('name', ''),
+                        'type': '角色牌',  # 统一类型
+                        'subtype': '角色牌',
+                        'title': region_info,
+                        'description': f"角色牌：{character.get('name', '')}，武器类型：{character.get('weapon', '')}",
+                        'skills': character.get('skills', []),  # 保存技能信息以备后用，但不作为独立卡牌
+                        'country': country,  # 国家
+                        'element': element,  # 元素
+                        'weapon_type': weapon_type  # 武器类型
+                    }
+                    all_cards.append(character_summary)
+        except Exception as e:
+            print(f"Error loading {character_file}: {e}")
+
+    return all_cards
+
+
+def extract_element_from_character(character):
+    """从角色技能费用中提取元素信息"""
+    if 'skills' in character and len(character['skills']) > 0:
+        first_skill = character['skills'][0]
+        if 'cost' in first_skill:
+            costs = first_skill['cost']
+            for cost in costs:
+                if isinstance(cost, dict) and 'type' in cost:
+                    cost_type = cost['type']
+                    # 检查是否为元素类型
+                    elements = ['火', '水', '雷', '草', '风', '岩', '冰', '物理']
+                    if cost_type in elements:
+                        return cost_type
+                    # 检查始基力类型
+                    if '始基力' in cost_type:
+                        if '荒性' in cost_type:
+                            return '荒性'
+                        elif '芒性' in cost_type:
+                            return '芒性'
+
+    # 如果从技能费用中无法提取，尝试从region字段中获取
+    region_info = character.get('region', '')
+    elements = ['火', '水', '雷', '草', '风', '岩', '冰', '物理']
+
+    # 检查是否包含始基力类型
+    if '始基力：荒性' in region_info:
+        return '荒性'
+    elif '始基力：芒性' in region_info:
+        return '芒性'
+
+    # 检查常规元素
+    for element in elements:
+        if element in region_info:
+            return element
+
+    return '物理'
+
+
+def extract_country_from_region(region):
+    """从region字段中提取国家信息"""
+    # region格式示例：角色牌稻妻单手剑
+    if not region:
+        return '未知'
+
+    # 常见国家列表
+    countries = ['蒙德', '璃月', '稻妻', '须弥', '枫丹', '纳塔', '至冬', '魔物', '愚人众', '丘丘人']
+
+    for country in countries:
+        if country in region:
+            return country
+
+    return '其他'
+
+
+def extract_element_from_region(region):
+    """从region字段中提取元素信息"""
+    if not region:
+        return '未知'
+
+    # 常见元素列表，包括始基力类型
+    elements = ['火', '水', '雷', '草', '风', '岩', '冰', '物理']
+
+    # 检查是否包含始基力类型
+    if '始基力：荒性' in region:
+        return '荒性'
+    elif '始基力：芒性' in region:
+        return '芒性'
+
+    # 检查常规元素
+    for element in elements:
+        if element in region:
+            return element
+
+    return '物理'
+
+
+def extract_weapon_type_from_region(region):
+    """从region字段中提取武器类型信息"""
+    if not region:
+        return '未知'
+
+    # 常见武器类型
+    weapon_types = ['单手剑', '双手剑', '长柄武器', '弓', '法器', '其他武器']
+
+    for weapon_type in weapon_types:
+        if weapon_type in region:
+            return weapon_type
+
+    return '其他'
+
+
+def collect_card_tags(all_cards: List[Dict[str, Any]]) -> List[str]:
+    """从卡牌数据中提取所有可能的标签"""
+    tags = set()
+
+    for card in all_cards:
+        # 如果是角色牌，跳过标签提取（因为用户选择其他卡牌时不需要角色牌标签）
+        if card.get('type') == '角色牌':
+            continue
+
+        # 添加基础类型标签
+        if 'subtype' in card and card['subtype'] in VALID_TAGS:
+            tags.add(card['subtype'])
+        if 'type' in card and card['type'] in VALID_TAGS and card['type'] != '角色牌':
+            tags.add(card['type'])
+        if 'category' in card:
+            # 从category中提取标签，例如：装备牌行动牌武器 单手剑 -> 武器、单手剑
+            cat = card['category']
+            for tag in CATEGORY_TAGS:
+                if tag in cat:
+                    tags.add(tag)
+
+        # 检查技能描述中是否包含特殊标签
+        if 'skills' in card:
+            for skill in card['skills']:
+                if 'description' in skill:
+                    desc = skill['description']
+                    # 确保只在非角色牌上检查技能描述中的标签
+                    if '特技' in desc:
+                        tags.add('特技')
+                    if '天赋' in desc and card.get('type') not in ['圣遗物牌', '武器牌']:
+                        # 修复天赋标签问题：确保天赋标签只应用于适当的卡牌类型
+                        tags.add('天赋')
+
+    # 添加基础卡牌类型（但排除角色牌，因为用户选择其他卡牌时不需要角色牌标签）
+    tags.add('事件牌')
+    tags.add('装备牌')
+    tags.add('支援牌')
+
+    return sorted(list(tags))
+
+
+def card_total_cost(card: Dict[str, Any]) -> int:
+    """计算卡牌打出的总费用（角色牌没有费用，视为0）"""
+    if card.get('type') == '角色牌':
+        return 0
+    if 'skills' in card and len(card['skills']) > 0:
+        skill = card['skills'][0]
+        if 'cost' in skill:
+            cost_count = 0
+            for c in skill['cost']:
+                if isinstance(c, dict) and 'value' in c:
+                    if isinstance(c['value'], (int, float)):
+                        cost_count += c['value']
+                    else:
+                        cost_count += 1
+                else:
+                    cost_count += 1
+            return cost_count
+    return 0
+
+
+def card_has_high_cost(card: Dict[str, Any]) -> bool:
+    """费用为4或更高，或有其他特殊费用"""
+    # 对于角色牌，我们不考虑技能费用，因为角色牌本身没有费用
+    if card.get('type') == '角色牌':
+        return False
+    if 'skills' in card and len(card['skills']) > 0:
+        skill = card['skills'][0]
+        if 'cost' in skill:
+            costs = skill['cost']
+            for c in costs:
+                if isinstance(c, dict) and 'value' in c:
+                    if isinstance(c['value'], (int, float)) and c['value'] >= 4:
+                        return True
+            # 检查是否有其他非数值的高成本标识
+            return len(costs) >= 4
+    return False
+
+
+def card_matches_tag(card: Dict[str, Any], tag: str) -> bool:
+    """检查卡牌是否带有指定标签"""
+    # 检查类型标签
+    if card.get('subtype', '') == tag or card.get('type', '') == tag:
+        return True
+    # 检查类别标签
+    if 'category' in card and tag in card['category']:
+        return True
+    # 检查技能描述（仅对非角色牌）
+    if 'skills' in card and card.get('type') != '角色牌':
+        for skill in card['skills']:
+            if 'description' in skill and tag in skill['description']:
+                return True
+    # 对角色牌检查区域等信息
+    if card.get('type') == '角色牌' and tag in card.get('title', ''):
+        return True
+    return False
+
+
+def format_card(card: Dict[str, Any]) -> Dict[str, Any]:
+    """将卡牌格式化为API返回的数据结构"""
+    result_card = {
+        'id': card.get('name', ''),  # 使用名字作为ID
+        'name': card.get('name', 'Unknown'),
+        'type': card.get('type', 'Unknown'),  # 使用统一的type
+        'description': card.get('description', ''),
+        'cost': [],
+        'country': card.get('country', ''),
+        'element': card.get('element', ''),
+        'weapon_type': card.get('weapon_type', ''),
+        'skills': card.get('skills', [])  # 包含技能信息，这对于角色卡很重要
+    }
+
+    # 获取title（如果有）
+    if 'title' in card:
+        result_card['title'] = card['title']
+
+    # 对于非角色牌，更新描述和费用信息
+    if card.get('type') != '角色牌' and 'skills' in card and len(card['skills']) > 0:
+        skill = card['skills'][0]
+        result_card['description'] = skill.get('description', '')
+        if 'cost' in skill:
+            result_card['cost'] = skill['cost']
+
+    return result_card
+
+
+def _add_to_index(index: Dict[str, Set[int]], key: str, card_index: int) -> None:
+    index.setdefault(key, set()).add(card_index)
+
+
+class CardCatalog:
+    """
+    不可变的卡牌目录快照
+
+    卡牌以其在列表中的位置作为内部编号，所有倒排索引都保存编号集合，
+    过滤结果按编号排序即可保持与数据文件一致的顺序。
+    """
+
+    def __init__(self, cards: List[Dict[str, Any]]):
+        self.cards = cards
+        # 预先格式化好的API返回数据，只读共享
+        self.views = [format_card(card) for card in cards]
+        self.all_ids: FrozenSet[int] = frozenset(range(len(cards)))
+
+        self._by_type: Dict[str, Set[int]] = {}
+        self._by_subtype: Dict[str, Set[int]] = {}
+        self._by_country: Dict[str, Set[int]] = {}
+        self._by_element: Dict[str, Set[int]] = {}
+        self._by_weapon_type: Dict[str, Set[int]] = {}
+        self._by_cost: Dict[int, Set[int]] = {}
+        self._by_tag: Dict[str, FrozenSet[int]] = {}
+        self._adhoc_tags: Dict[str, FrozenSet[int]] = {}
+        character_ids = set()
+        high_cost_ids = set()
+
+        for i, card in enumerate(cards):
+            _add_to_index(self._by_type, card.get('type', '').lower(), i)
+            _add_to_index(self._by_subtype, card.get('subtype', '').lower(), i)
+            if card.get('type') == '角色牌':
+                character_ids.add(i)
+                _add_to_index(self._by_country, card.get('country', '').lower(), i)
+                _add_to_index(self._by_element, card.get('element', '').lower(), i)
+                _add_to_index(self._by_weapon_type, card.get('weapon_type', '').lower(), i)
+            self._by_cost.setdefault(card_total_cost(card), set()).add(i)
+            if card_has_high_cost(card):
+                high_cost_ids.add(i)
+
+        self.character_ids: FrozenSet[int] = frozenset(character_ids)
+        self.non_character_ids: FrozenSet[int] = self.all_ids - self.character_ids
+        self.high_cost_ids: FrozenSet[int] = frozenset(high_cost_ids)
+
+        self.tags = collect_card_tags(cards)
+        for tag in VALID_TAGS.union(self.tags):
+            self._by_tag[tag] = self._scan_tag(tag)
+
+        self.character_filters = self._build_character_filters()
+        self.search_index = CardSearchIndex(cards)
+
+    def _scan_tag(self, tag: str) -> FrozenSet[int]:
+        return frozenset(i for i, card in enumerate(self.cards) if card_matches_tag(card, tag))
+
+    def _build_character_filters(self) -> Dict[str, List[str]]:
+        countries = set()
+        elements = set()
+        weapon_types = set()
+
+        for i in self.character_ids:
+            character = self.cards[i]
+            countries.add(character.get('country', '未知'))
+            elements.add(character.get('element', '未知'))
+            weapon_types.add(character.get('weapon_type', '未知'))
+
+        # 移除'未知'选项，如果存在其他选项
+        if len(countries) > 1:
+            countries.discard('未知')
+        if len(elements) > 1:
+            elements.discard('未知')
+        if len(weapon_types) > 1:
+            weapon_types.discard('未知')
+
+        return {
+            'countries': sorted(list(countries)),
+            'elements': sorted(list(elements)),
+            'weapon_types': sorted(list(weapon_types))
+        }
+
+    def ids_for_type(self, card_type: str) -> FrozenSet[int]:
+        """按类型或子类型过滤，'非角色牌'表示所有行动牌"""
+        if card_type == '非角色牌':
+            return self.non_character_ids
+        key = card_type.lower()
+        return frozenset(self._by_type.get(key, set()) | self._by_subtype.get(key, set()))
+
+    def ids_for_cost(self, cost: str) -> FrozenSet[int]:
+        """按总费用过滤，'other'表示4费及以上或特殊费用"""
+        if cost == 'other':
+            return self.high_cost_ids
+        return frozenset(self._by_cost.get(int(cost), set()))
+
+    def ids_for_tags(self, tags: Iterable[str]) -> FrozenSet[int]:
+        """返回带有任一标签的卡牌"""
+        result: Set[int] = set()
+        for tag in tags:
+            result |= self._ids_for_tag(tag)
+        return frozenset(result)
+
+    def _ids_for_tag(self, tag: str) -> FrozenSet[int]:
+        ids = self._by_tag.get(tag)
+        if ids is None:
+            ids = self._adhoc_tags.get(tag)
+        if ids is None:
+            ids = self._scan_tag(tag)
+            if len(self._adhoc_tags) < MAX_ADHOC_TAG_CACHE:
+                self._adhoc_tags[tag] = ids
+        return ids
+
+    def _character_attribute_ids(self, index: Dict[str, Set[int]], value: str) -> FrozenSet[int]:
+        # 国家、元素、武器类型只作用于角色牌，行动牌始终保留
+        return self.non_character_ids | index.get(value.lower(), set())
+
+    def filter_ids(self, card_type: str = '', cost: str = '', country: str = '', element: str = '',
+                   weapon_type: str = '', tags: Optional[List[str]] = None) -> FrozenSet[int]:
+        """
+        按条件过滤卡牌，返回内部编号集合
+        """
+        ids = self.all_ids
+        if card_type:
+            ids = ids & self.ids_for_type(card_type)
+        if cost:
+            ids = ids & self.ids_for_cost(cost)
+        if country:
+            ids = ids & self._character_attribute_ids(self._by_country, country)
+        if element:
+            ids = ids & self._character_attribute_ids(self._by_element, element)
+        if weapon_type:
+            ids = ids & self._character_attribute_ids(self._by_weapon_type, weapon_type)
+        if tags:
+            ids = ids & self.ids_for_tags(tags)
+        return ids
+
+    def views_for(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """按编号返回格式化后的卡牌数据"""
+        return [self.views[i] for i in ids]
+
+
+class _CatalogHolder:
+    """
+    持有当前的卡牌目录，数据文件修改时间变化时重新构建
+    """
+
+    def __init__(self, card_data_path: str):
+        self.card_data_path = card_data_path
+        self._lock = threading.Lock()
+        self._catalog: Optional[CardCatalog] = None
+        self._mtimes = None
+        self._last_check = 0.0
+
+    def _source_mtimes(self):
+        mtimes = []
+        for filename in ACTION_CARD_FILES + [CHARACTER_FILE]:
+            try:
+                mtimes.append(os.stat(os.path.join(self.card_data_path, filename)).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def get(self) -> CardCatalog:
+        now = time.monotonic()
+        catalog = self._catalog
+        if catalog is not None and now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return catalog
+
+        with self._lock:
+            self._last_check = now
+            mtimes = self._source_mtimes()
+            if self._catalog is None or mtimes != self._mtimes:
+                self._catalog = CardCatalog(load_card_data(self.card_data_path))
+                self._mtimes = mtimes
+            return self._catalog
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._catalog = None
+            self._mtimes = None
+
+
+_catalog_holder = _CatalogHolder(CARD_DATA_PATH)
+
+
+def get_card_catalog() -> CardCatalog:
+    """获取进程内共享的卡牌目录"""
+    return _catalog_holder.get()
+
+
+def invalidate_card_catalog() -> None:
+    """丢弃当前的卡牌目录，下次访问时重新加载"""
+    _catalog_holder.invalidate()
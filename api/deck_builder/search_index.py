@@ -0,0 +1,173 @@
+"""
+卡牌全文搜索索引
+
+对卡牌名称、类型、标题、描述以及技能名称/描述/类型建立单字和双字（bigram）倒排索引，
+中文没有空格分词，按字切分的双字索引同样适用于英文和数字。
+搜索时先用索引求候选集合，再逐字段校验子串，结果与逐张扫描完全一致，并按匹配字段加权排序。
+"""
+import bisect
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# 字段权重：名称匹配最重要，其次是类型/标题，再次是描述和技能
+NAME_WEIGHT = 8
+TYPE_WEIGHT = 3
+TITLE_WEIGHT = 3
+DESCRIPTION_WEIGHT = 2
+SKILL_NAME_WEIGHT = 2
+SKILL_TEXT_WEIGHT = 1
+
+# 关键字是字段开头（前缀匹配）或与名称完全相同时的加分
+PREFIX_BONUS = 2
+EXACT_NAME_BONUS = 8
+
+
+def split_search_terms(search: str) -> List[str]:
+    """将搜索词按空格分割成多个小写关键字"""
+    return [term.strip().lower() for term in search.split() if term.strip()]
+
+
+def _grams(text: str) -> Set[str]:
+    """文本中的所有单字和相邻双字，跨越空白的双字没有意义，直接跳过"""
+    grams = set(text)
+    for i in range(len(text) - 1):
+        pair = text[i:i + 2]
+        if not pair[0].isspace() and not pair[1].isspace():
+            grams.add(pair)
+    grams.discard(' ')
+    return grams
+
+
+def _term_grams(term: str) -> List[str]:
+    if len(term) == 1:
+        return [term]
+    return [term[i:i + 2] for i in range(len(term) - 1)]
+
+
+def card_search_fields(card: Dict[str, Any]) -> List[Tuple[int, str]]:
+    """提取卡牌可搜索的字段，返回(权重, 小写文本)列表"""
+    fields = [
+        (NAME_WEIGHT, card.get('name', '').lower()),
+        (TYPE_WEIGHT, card.get('type', '').lower()),
+    ]
+    if card.get('title', ''):
+        fields.append((TITLE_WEIGHT, card['title'].lower()))
+    if card.get('description', ''):
+        fields.append((DESCRIPTION_WEIGHT, card['description'].lower()))
+    for skill in card.get('skills', []):
+        if 'name' in skill:
+            fields.append((SKILL_NAME_WEIGHT, skill['name'].lower()))
+        if 'description' in skill:
+            fields.append((SKILL_TEXT_WEIGHT, skill['description'].lower()))
+        if 'type' in skill:
+            fields.append((SKILL_TEXT_WEIGHT, skill['type'].lower()))
+    return fields
+
+
+class CardSearchIndex:
+    """
+    卡牌全文搜索索引，构建后只读
+    """
+
+    def __init__(self, cards: List[Dict[str, Any]]):
+        self._fields: List[List[Tuple[int, str]]] = []
+        self._postings: Dict[str, Set[int]] = {}
+        names = []
+
+        for i, card in enumerate(cards):
+            fields = card_search_fields(card)
+            self._fields.append(fields)
+            grams = set()
+            for _, text in fields:
+                grams |= _grams(text)
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(i)
+            names.append((fields[0][1], i))
+
+        # 按名称排序，用于前缀补全
+        names.sort()
+        self._sorted_names = [name for name, _ in names]
+        self._sorted_name_ids = [i for _, i in names]
+
+    def _candidates(self, term: str) -> Set[int]:
+        postings = [self._postings.get(gram) for gram in _term_grams(term)]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def _term_score(self, card_id: int, term: str) -> int:
+        """关键字在卡牌中的得分，0表示不匹配"""
+        best = 0
+        for weight, text in self._fields[card_id]:
+            if term in text:
+                score = weight
+                if text.startswith(term):
+                    score += PREFIX_BONUS
+                if weight == NAME_WEIGHT and text == term:
+                    score += EXACT_NAME_BONUS
+                if score > best:
+                    best = score
+        return best
+
+    def search(self, terms: List[str], within: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        搜索同时匹配所有关键字的卡牌
+
+        Args:
+            terms: 小写关键字列表
+            within: 可选的候选卡牌编号，只在其中搜索
+
+        Returns:
+            按得分从高到低排序的卡牌编号，同分时保持原有顺序
+        """
+        if not terms:
+            return sorted(within) if within is not None else list(range(len(self._fields)))
+
+        candidates = set(within) if within is not None else None
+        for term in sorted(set(terms), key=len, reverse=True):
+            term_candidates = self._candidates(term)
+            candidates = term_candidates if candidates is None else candidates & term_candidates
+            if not candidates:
+                return []
+
+        scored = []
+        for card_id in candidates:
+            total = 0
+            for term in terms:
+                score = self._term_score(card_id, term)
+                if not score:
+                    break
+                total += score
+            else:
+                scored.append((-total, card_id))
+        scored.sort()
+        return [card_id for _, card_id in scored]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[int]:
+        """
+        输入联想：名称以前缀开头的卡牌优先，不足时补充全文搜索结果
+        """
+        prefix = prefix.strip().lower()
+        if not prefix or limit <= 0:
+            return []
+
+        result = []
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        for pos in range(start, len(self._sorted_names)):
+            if not self._sorted_names[pos].startswith(prefix) or len(result) >= limit:
+                break
+            result.append(self._sorted_name_ids[pos])
+
+        if len(result) < limit:
+            seen = set(result)
+            for card_id in self.search(split_search_terms(prefix)):
+                if card_id not in seen:
+                    result.append(card_id)
+                    if len(result) >= limit:
+                        break
+        return result
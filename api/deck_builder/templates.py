@@ -495,6 +495,13 @@ DECK_BUILDER_TEMPLATE = '''
         // Page state
         let currentTab = 'character';
         
+        // Incremental validation state: the server keeps the deck rule state in an edit session,
+        // each click only sends the cards added or removed since the last sync
+        let deckSession = null;
+        let syncedCounts = {};
+        let validationQueue = Promise.resolve(null);
+        let validationTimer = null;
+        
         // Initialize the page
         document.addEventListener('DOMContentLoaded', function() {
             loadCards(); // Load cards from API
@@ -1081,6 +1088,9 @@ DECK_BUILDER_TEMPLATE = '''
             actionCountEl.textContent = `${deck.cards.length}/30`;
             totalCountEl.textContent = `${deck.cards.length}/30`;
             
+            // Keep the server-side validation session in sync with this click
+            scheduleDeckValidation();
+            
             // Check if deck is full and trigger auto-validation
             if (Object.keys(characterCounts).length === 3 && deck.cards.length === 30) {
                 // Auto-scroll to validation section
@@ -1099,60 +1109,132 @@ DECK_BUILDER_TEMPLATE = '''
             }
         }
         
+        // Count cards in the deck by id
+        function deckCounts() {
+            const counts = {};
+            [...deck.characters, ...deck.cards].forEach(card => {
+                counts[card.id] = (counts[card.id] || 0) + 1;
+            });
+            return counts;
+        }
+        
+        // Cards added and removed since the last sync
+        function deckDelta(counts) {
+            const add = [];
+            const remove = [];
+            new Set([...Object.keys(counts), ...Object.keys(syncedCounts)]).forEach(id => {
+                const diff = (counts[id] || 0) - (syncedCounts[id] || 0);
+                for (let i = 0; i < Math.abs(diff); i++) {
+                    (diff > 0 ? add : remove).push(id);
+                }
+            });
+            return { add, remove };
+        }
+        
+        function postDeckDelta(body) {
+            return fetch('/api/deck/validate-delta', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify(body)
+            });
+        }
+        
+        async function syncDeckValidation() {
+            const counts = deckCounts();
+            const fullDeck = {
+                characters: deck.characters.map(c => c.id),
+                cards: deck.cards.map(c => c.id)
+            };
+            
+            let response;
+            if (deckSession) {
+                response = await postDeckDelta({ session: deckSession, ...deckDelta(counts) });
+                if (response.status === 404) {
+                    // Session expired or evicted: start a new one from the full deck
+                    deckSession = null;
+                }
+            }
+            if (!deckSession) {
+                response = await postDeckDelta(fullDeck);
+            }
+            
+            const result = await response.json();
+            if (!response.ok) {
+                // Out of sync with the server: resend the full deck next time
+                deckSession = null;
+                throw new Error(result.error || response.statusText);
+            }
+            deckSession = result.session;
+            syncedCounts = counts;
+            return result;
+        }
+        
+        // Syncs run one at a time so deltas are applied in order
+        function queueDeckValidation() {
+            validationQueue = validationQueue.catch(() => null).then(syncDeckValidation);
+            return validationQueue;
+        }
+        
+        function scheduleDeckValidation() {
+            clearTimeout(validationTimer);
+            if (!deckSession && deck.characters.length === 0 && deck.cards.length === 0) {
+                return;
+            }
+            validationTimer = setTimeout(() => {
+                queueDeckValidation().then(renderValidation).catch(showValidationError);
+            }, 150);
+        }
+        
+        function escapeHtml(text) {
+            const div = document.createElement('div');
+            div.textContent = text;
+            return div.innerHTML;
+        }
+        
+        function renderValidation(result) {
+            const validationResult = document.getElementById('validationResult');
+            if (deck.characters.length === 0 && deck.cards.length === 0) {
+                validationResult.innerHTML = '选择卡牌并点击"验证卡组"来检查卡组是否符合规则。';
+                validationResult.className = 'validation-result';
+                return;
+            }
+            const counts = `角色 ${result.counts.characters}/3，行动牌 ${result.counts.actions}/30`;
+            if (result.valid) {
+                validationResult.innerHTML = `
+                    <div class="success">✓ 卡组验证通过！</div>
+                    <div>${counts}</div>
+                `;
+                validationResult.className = 'validation-result valid';
+            } else {
+                validationResult.innerHTML = `
+                    <div class="error">✗ 卡组验证失败！</div>
+                    <div>${counts}</div>
+                    <div><strong>错误详情:</strong></div>
+                    <ul>${result.errors.map(error => `<li>${escapeHtml(error)}</li>`).join('')}</ul>
+                `;
+                validationResult.className = 'validation-result invalid';
+            }
+        }
+        
+        function showValidationError(error) {
+            const validationResult = document.getElementById('validationResult');
+            validationResult.innerHTML = `验证失败: ${escapeHtml(error.message)}`;
+            validationResult.className = 'validation-result invalid';
+        }
+        
         // Validate the deck against rules
         async function validateDeck() {
             const validationResult = document.getElementById('validationResult');
             validationResult.innerHTML = '正在验证卡组...';
             validationResult.className = 'validation-result';
             
+            clearTimeout(validationTimer);
             try {
-                const response = await fetch('/api/deck/validate', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({
-                        characters: deck.characters.map(c => c.id),
-                        cards: deck.cards.map(c => c.id),
-                        deck_name: 'Test Deck'
-                    })
-                });
-                
-                const result = await response.json();
-                
-                if (result.valid) {
-                    validationResult.innerHTML = `
-                        <div class="success">✓ 卡组验证通过！</div>
-                        <div><strong>规则检查结果:</strong></div>
-                        <ul>
-                            <li>角色数量: ${result.rules.character_count ? '✓' : '✗'} ${result.rules.character_count_msg}</li>
-                            <li>卡牌总数: ${result.rules.deck_size ? '✓' : '✗'} ${result.rules.deck_size_msg}</li>
-                            <li>角色限制: ${result.rules.character_limit ? '✓' : '✗'} ${result.rules.character_limit_msg}</li>
-                            <li>卡牌限制: ${result.rules.card_limit ? '✓' : '✗'} ${result.rules.card_limit_msg}</li>
-                            <li>元素反应: ${result.rules.elemental_synergy ? '✓' : '✗'} ${result.rules.elemental_synergy_msg}</li>
-                        </ul>
-                        <div><strong>建议:</strong> ${result.suggestions.join(', ') || '无'}</div>
-                    `;
-                    validationResult.className = 'validation-result valid';
-                } else {
-                    validationResult.innerHTML = `
-                        <div class="error">✗ 卡组验证失败！</div>
-                        <div><strong>错误详情:</strong></div>
-                        <ul>
-                            <li>角色数量: ${result.rules.character_count ? '✓' : '✗'} ${result.rules.character_count_msg}</li>
-                            <li>卡牌总数: ${result.rules.deck_size ? '✓' : '✗'} ${result.rules.deck_size_msg}</li>
-                            <li>角色限制: ${result.rules.character_limit ? '✓' : '✗'} ${result.rules.character_limit_msg}</li>
-                            <li>卡牌限制: ${result.rules.card_limit ? '✓' : '✗'} ${result.rules.card_limit_msg}</li>
-                            <li>元素反应: ${result.rules.elemental_synergy ? '✓' : '✗'} ${result.rules.elemental_synergy_msg}</li>
-                        </ul>
-                        <div><strong>错误信息:</strong> ${result.errors.join(', ')}</div>
-                        <div><strong>建议:</strong> ${result.suggestions.join(', ') || '无'}</div>
-                    `;
-                    validationResult.className = 'validation-result invalid';
-                }
+                renderValidation(await queueDeckValidation());
             } catch (error) {
-                validationResult.innerHTML = `验证失败: ${error.message}`;
-                validationResult.className = 'validation-result invalid';
+                showValidationError(error);
             }
         }
         
@@ -1227,14 +1309,21 @@ DECK_BUILDER_TEMPLATE = '''
                 });
         }
         
-        // Search cards by name (just calls filterCards)
+        // Debounce search-as-you-type so each pause sends a single request
+        const SEARCH_DEBOUNCE_MS = 150;
+        let searchTimer = null;
+        let characterSearchTimer = null;
+        
+        // Search cards by name (debounced filterCards)
         function searchCards() {
-            filterCards();
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(filterCards, SEARCH_DEBOUNCE_MS);
         }
         
-        // Search character cards by name (just calls filterCharacterCards)
+        // Search character cards by name (debounced filterCharacterCards)
         function searchCharacterCards() {
-            filterCharacterCards();
+            clearTimeout(characterSearchTimer);
+            characterSearchTimer = setTimeout(filterCharacterCards, SEARCH_DEBOUNCE_MS);
         }
         
         // Function to populate tag buttons
@@ -0,0 +1,267 @@
+"""
+本地对局的实时通道（Socket.IO）
+
+客户端连接时在 auth 中提供JWT（token），可同时提供 gameId 直接加入对局房间。
+客户端事件：
+- joinGame: gameId 或 {gameId, knownVersion}，加入对局房间并收到当前状态
+- leaveGame: 离开当前对局房间
+- gameAction: {type 或 action_type, payload, gameId(可选)}，处理行动并立即向房间广播状态变更；
+  之后轮到AI时，AI在后台任务中行动，完成后再广播一次 gameUpdate（ai_actions 为AI执行的操作）
+- syncGame: {gameId(可选), since}，重新获取指定版本之后的变更
+服务端事件：
+- gameUpdate: {gameId, version, changes, ai_actions, log}，changes 为状态增量（见 game_engine/state_diff.py），
+  log 为本次新增的结构化日志事件，版本不连续时客户端应发送 syncGame
+- gameError: 错误信息
+- gameEnd: {gameId, winner, game_record}
+
+异步模式由 SOCKETIO_ASYNC_MODE 选择（eventlet/gevent/threading，默认自动选择已安装的），
+多个工作进程之间通过 SOCKETIO_MESSAGE_QUEUE 指定的消息队列广播。
+eventlet/gevent 模式下AI的搜索在系统线程中执行（多进程搜索时在后台任务中等待进程池），不阻塞事件循环上的其他连接。
+"""
+import logging
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import current_app, request
+from flask_jwt_extended import decode_token
+from flask_socketio import SocketIO, emit, join_room, leave_room
+
+from api.local_game import (AI_PLAYER_ID, changes_since, game_engine, local_game_sessions, record_state_version,
+                            run_ai_turns)
+from game_engine.state_diff import StateHistory
+from models.enums import PlayerAction
+
+# 前端使用的操作类型名称，也可以直接使用 PlayerAction 的名称
+SOCKET_ACTION_TYPES = {
+    'PlayCard': PlayerAction.PLAY_CARD,
+    'UseSkill': PlayerAction.USE_SKILL,
+    'SwitchCharacter': PlayerAction.SWITCH_CHARACTER,
+    'EndTurn': PlayerAction.PASS,
+    'Pass': PlayerAction.PASS,
+}
+
+# 当前进程中的连接：sid -> {'user_id': ..., 'game_id': ...}
+connections: Dict[str, Dict[str, Any]] = {}
+
+# 注册事件的 SocketIO 实例，后台任务通过它广播
+_socketio: Optional[SocketIO] = None
+
+
+class GameSocketError(Exception):
+    """需要以 gameError 返回给客户端的错误"""
+
+
+def parse_action_type(action_type: Any) -> PlayerAction:
+    if isinstance(action_type, str):
+        if action_type in SOCKET_ACTION_TYPES:
+            return SOCKET_ACTION_TYPES[action_type]
+        if action_type.upper() in PlayerAction.__members__:
+            return PlayerAction[action_type.upper()]
+    raise GameSocketError(f'无效的行动类型: {action_type}')
+
+
+def _current_connection() -> Dict[str, Any]:
+    connection = connections.get(request.sid)
+    if connection is None:
+        raise GameSocketError('未登录')
+    return connection
+
+
+def _authorize(game_id: Optional[str], user_id: str) -> Dict[str, Any]:
+    if not game_id or game_id not in local_game_sessions:
+        raise GameSocketError('游戏会话不存在')
+    session_info = local_game_sessions[game_id]
+    if session_info['player_id'] != user_id:
+        raise GameSocketError('无权访问此游戏会话')
+    return session_info
+
+
+def _state_update(game_id: str, session_info: Dict[str, Any], since: int) -> Dict[str, Any]:
+    """指定版本之后的变更，since 为 -1 时返回完整状态"""
+    game_state = game_engine.get_game_state(game_id)
+    if game_state is None:
+        raise GameSocketError('游戏状态不存在')
+    history = session_info.get('state_history') or StateHistory()
+    return {'gameId': game_id, 'version': history.version, 'changes': changes_since(history, game_state, since)}
+
+
+def _join(connection: Dict[str, Any], game_id: str, known_version: int) -> None:
+    session_info = _authorize(game_id, connection['user_id'])
+    if connection.get('game_id') and connection['game_id'] != game_id:
+        leave_room(connection['game_id'])
+    join_room(game_id)
+    connection['game_id'] = game_id
+    emit('gameUpdate', _state_update(game_id, session_info, known_version))
+
+
+def _handle_errors(handler):
+    @wraps(handler)
+    def wrapper(*args):
+        try:
+            return handler(*args)
+        except GameSocketError as e:
+            emit('gameError', str(e))
+        except Exception as e:
+            logging.error(f"Game socket {handler.__name__} error: {str(e)}")
+            emit('gameError', str(e))
+    return wrapper
+
+
+def on_connect(auth=None):
+    """验证JWT，失败时拒绝连接"""
+    auth = auth or {}
+    try:
+        user_id = decode_token(auth.get('token', ''))['sub']
+    except Exception as e:
+        logging.info(f"Game socket connection rejected: {str(e)}")
+        return False
+
+    connection = {'user_id': user_id, 'game_id': None}
+    connections[request.sid] = connection
+    game_id = auth.get('gameId')
+    if game_id:
+        try:
+            _join(connection, game_id, -1)
+        except GameSocketError as e:
+            emit('gameError', str(e))
+
+
+def on_disconnect(*args):
+    connections.pop(request.sid, None)
+
+
+@_handle_errors
+def on_join_game(data):
+    connection = _current_connection()
+    if isinstance(data, dict):
+        game_id = data.get('gameId')
+        known_version = data.get('knownVersion', -1)
+    else:
+        game_id, known_version = data, -1
+    if not isinstance(known_version, int):
+        raise GameSocketError('状态版本必须是整数')
+    _join(connection, game_id, known_version)
+
+
+@_handle_errors
+def on_leave_game(*args):
+    connection = _current_connection()
+    if connection.get('game_id'):
+        leave_room(connection['game_id'])
+        connection['game_id'] = None
+
+
+@_handle_errors
+def on_sync_game(data):
+    connection = _current_connection()
+    data = data or {}
+    game_id = data.get('gameId') or connection.get('game_id')
+    since = data.get('since', -1)
+    if not isinstance(since, int):
+        raise GameSocketError('状态版本必须是整数')
+    emit('gameUpdate', _state_update(game_id, _authorize(game_id, connection['user_id']), since))
+
+
+def _game_update(game_id: str, game_state, history: StateHistory, since: int, log_seq: int,
+                 ai_actions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        'gameId': game_id,
+        'version': history.version,
+        'changes': changes_since(history, game_state, since),
+        'ai_actions': ai_actions,
+        'log': [event.to_dict() for event in game_state.game_log.after(log_seq)]
+    }
+
+
+def _broadcast(game_id: str, update: Dict[str, Any], game_over: bool, winner: Optional[str]) -> None:
+    _socketio.emit('gameUpdate', update, to=game_id)
+    if game_over:
+        _socketio.emit('gameEnd', {'gameId': game_id, 'winner': winner,
+                                   'game_record': game_engine.get_game_record(game_id)}, to=game_id)
+
+
+def _ai_to_move(game_id: str, game_state) -> bool:
+    session_info = local_game_sessions.get(game_id)
+    return (bool(session_info) and session_info.get('ai_player') is not None and not game_state.is_game_over
+            and game_state.players[game_state.current_player_index].player_id == AI_PLAYER_ID)
+
+
+def _run_search(ai_player, choose: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    执行一次AI搜索：eventlet/gevent 模式下CPU密集的搜索放到系统线程中执行；
+    多进程搜索（workers > 1）在当前协程中提交并等待进程池，猴子补丁后的等待会让出事件循环
+    """
+    config = getattr(ai_player, 'config', None)
+    if getattr(config, 'workers', 0) > 1:
+        return choose()
+    async_mode = _socketio.async_mode if _socketio else None
+    if async_mode == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(choose)
+    if async_mode == 'gevent':
+        from gevent import get_hub
+        return get_hub().threadpool.apply(choose)
+    return choose()
+
+
+def _run_ai_turn(app, game_id: str) -> None:
+    """后台任务：AI行动到再次轮到玩家或游戏结束，向房间广播AI的状态变更"""
+    try:
+        with app.app_context(), game_engine.game_states.locked(game_id):
+            game_state = game_engine.get_game_state(game_id)
+            session_info = local_game_sessions.get(game_id)
+            if game_state is None or not session_info:
+                return
+            previous_version = session_info['state_history'].version
+            previous_log_seq = game_state.game_log.seq
+            ai_actions = run_ai_turns(game_id, _run_search)
+            game_state = game_engine.get_game_state(game_id)
+            history = record_state_version(game_id, game_state)
+            update = _game_update(game_id, game_state, history, previous_version, previous_log_seq, ai_actions)
+            game_over = game_state.is_game_over
+            winner = game_state.winner
+        _broadcast(game_id, update, game_over, winner)
+    except Exception as e:
+        logging.error(f"Game socket AI turn error in game {game_id}: {str(e)}")
+        _socketio.emit('gameError', str(e), to=game_id)
+
+
+@_handle_errors
+def on_game_action(data):
+    connection = _current_connection()
+    if not isinstance(data, dict):
+        raise GameSocketError('行动数据格式错误')
+    game_id = data.get('gameId') or connection.get('game_id')
+    _authorize(game_id, connection['user_id'])
+    action = parse_action_type(data.get('type') or data.get('action_type'))
+    payload = data.get('payload') or {}
+
+    # 玩家的行动立即处理并广播，AI的回合在后台任务中进行，不占用当前事件
+    with game_engine.game_states.locked(game_id):
+        previous = local_game_sessions[game_id].get('state_history')
+        previous_version = previous.version if previous else 0
+        previous_log_seq = game_engine.get_game_state(game_id).game_log.seq
+        if game_engine.process_action(game_id, connection['user_id'], action, payload) is None:
+            raise GameSocketError('处理行动失败')
+        game_state = game_engine.get_game_state(game_id)
+        history = record_state_version(game_id, game_state)
+        update = _game_update(game_id, game_state, history, previous_version, previous_log_seq, [])
+        game_over = game_state.is_game_over
+        winner = game_state.winner
+        ai_turn = _ai_to_move(game_id, game_state)
+
+    _broadcast(game_id, update, game_over, winner)
+    if ai_turn:
+        _socketio.start_background_task(_run_ai_turn, current_app._get_current_object(), game_id)
+
+
+def register_game_socket_events(socketio: SocketIO) -> None:
+    """在 SocketIO 实例上注册对局事件"""
+    global _socketio
+    _socketio = socketio
+    socketio.on_event('connect', on_connect)
+    socketio.on_event('disconnect', on_disconnect)
+    socketio.on_event('joinGame', on_join_game)
+    socketio.on_event('leaveGame', on_leave_game)
+    socketio.on_event('syncGame', on_sync_game)
+    socketio.on_event('gameAction', on_game_action)
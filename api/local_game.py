@@ -3,21 +3,49 @@
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from api.catalog_cache import catalog_version
+from game_engine.card_registry import card_registry
 from game_engine.core import GameEngine
-from models.db_models import User, Deck, CardData, db
+from game_engine.mcts import MCTSConfig, MCTSPlayer
+from game_engine.session_store import session_store_from_env
+from game_engine.state_diff import StateHistory
+from models.db_models import User, Deck, CardData, db, load_json_column
 from models.game_models import Card, CharacterCard
 from models.enums import PlayerAction, ElementType, CardType
-import json
 import logging
-from typing import Dict, Any
+from enum import Enum
+from functools import partial
+import random
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 local_game_bp = Blueprint('local_game', __name__)
 
+# 对局默认空闲2小时后淘汰，可通过 GAME_SESSION_* 环境变量配置
+DEFAULT_GAME_SESSION_TTL = 2 * 60 * 60
+
+
+def _on_game_evicted(game_id: str, game_state: Any) -> None:
+    """对局被淘汰后，对应的本地游戏会话也随之删除"""
+    local_game_sessions.pop(game_id, None)
+
+
 # 创建游戏引擎实例
-game_engine = GameEngine()
+game_engine = GameEngine(session_store_from_env(on_evict=_on_game_evicted, default_ttl=DEFAULT_GAME_SESSION_TTL))
+
+# 用于存储本地游戏会话，会话随对局一起淘汰
+# 使用 sqlite 后端时对局和会话保存在多个工作进程共享的数据库中
+local_game_sessions = session_store_from_env(namespace='local_sessions', evictable=False)
 
-# 用于存储本地游戏会话的字典
-local_game_sessions: Dict[str, Any] = {}
+# AI对手的玩家ID
+AI_PLAYER_ID = "ai_opponent"
+
+# AI连续行动次数上限，防止异常情况下请求无法返回
+MAX_AI_ACTIONS_PER_TURN = 50
+
+# 游戏日志分页大小
+DEFAULT_LOG_PAGE_SIZE = 100
+MAX_LOG_PAGE_SIZE = 500
 
 @local_game_bp.route('/local-game/start', methods=['POST'])
 @jwt_required()
@@ -31,6 +59,10 @@ def start_local_game():
         
         opponent_type = data.get('opponent_type', 'ai')  # 'ai' 或 'human'
         deck_id = data.get('deck_id')
+        seed = data.get('seed')  # 可选，指定随机种子以复现对局
+        
+        if seed is not None and not isinstance(seed, int):
+            return jsonify({'error': '随机种子必须是整数'}), 400
         
         if not deck_id:
             return jsonify({'error': '必须选择一个卡组'}), 400
@@ -40,65 +72,57 @@ def start_local_game():
         if not user_deck:
             return jsonify({'error': '卡组不存在或无权限访问'}), 404
         
-        # 获取对手卡组（如果是AI对手，使用系统提供的卡组）
-        if opponent_type == 'ai':
-            # 这里可以实现AI对手的逻辑，现在我们使用一个默认的卡组
-            # 为了测试，我们创建一个简单的AI卡组
-            ai_deck_data = [
-                {
-                    'id': 'ai_char_1',
-                    'name': 'AI角色1',
-                    'card_type': '角色牌',
-                    'cost': [ElementType.OMNI.value, ElementType.OMNI.value],
-                    'health': 10,
-                    'max_health': 10,
-                    'element_type': ElementType.PYRO.value,
-                    'skills': [
-                        {
-                            'id': 'ai_skill_1',
-                            'name': 'AI技能1',
-                            'cost': [ElementType.SAME.value, ElementType.SAME.value],
-                            'damage': 1
-                        }
-                    ]
-                }
-            ]
-            # 这只是一个简单示例，实际应从数据库获取AI卡组
-            ai_deck_cards = []
-        else:
+        if opponent_type != 'ai':
             # 如果是人对人，需要获取对手的卡组
             return jsonify({'error': '多人游戏尚未实现，请选择AI对手'}), 400
         
-        # 解析用户卡组
-        user_card_list = json.loads(user_deck.cards) if user_deck.cards else []
-        user_cards_data = CardData.query.filter(CardData.id.in_(user_card_list)).all()
+        # 解析用户卡组（同一张卡可能有多份，按卡组中的顺序逐张取出）
+        user_card_list = load_json_column(user_deck.cards)
+        cards_by_id = {card.id: card for card in CardData.query.filter(CardData.id.in_(user_card_list)).all()}
+        user_cards_data = [cards_by_id[card_id] for card_id in user_card_list if card_id in cards_by_id]
         
-        # 将数据库数据转换为游戏引擎需要的格式
+        # 将数据库数据转换为游戏引擎需要的格式（卡牌目录更新后先清空共享的卡牌定义）
+        card_registry.use_catalog(catalog_version.get())
         user_cards = convert_db_cards_to_game_cards(user_cards_data)
+        # AI使用与玩家相同的卡组，单独转换一次，避免双方共享角色对象
+        ai_cards = convert_db_cards_to_game_cards(user_cards_data)
         
         # 启动本地游戏
         game_session_id = game_engine.create_game_state(
             current_user_id,  # 玩家1 ID
-            "ai_opponent",    # 玩家2 ID (AI)
+            AI_PLAYER_ID,     # 玩家2 ID (AI)
             user_cards,       # 玩家卡组
-            []               # AI卡组 (暂时为空，需要实现AI卡组)
+            ai_cards,         # AI卡组
+            seed=seed
         )
+        if game_session_id is None:
+            return jsonify({'error': '卡组不符合规则，无法开始游戏'}), 400
         
         # 保存游戏会话信息
+        game_seed = game_engine.get_game_state(game_session_id).seed
         local_game_sessions[game_session_id] = {
             'player_id': current_user_id,
             'opponent_type': opponent_type,
-            'game_started_at': db.func.now()
+            'game_started_at': datetime.utcnow(),
+            'ai_player': MCTSPlayer(MCTSConfig.from_env()),
+            'ai_rng': random.Random(game_seed)
         }
         
-        # 获取初始游戏状态
-        game_state = game_engine.get_game_state(game_session_id)
-        
-        response_data = {
-            'game_session_id': game_session_id,
-            'message': '本地游戏已开始',
-            'game_state': serialize_game_state(game_state)
-        }
+        with game_engine.game_states.locked(game_session_id):
+            # AI可能需要先行动
+            ai_actions = run_ai_turns(game_session_id)
+            
+            # 获取初始游戏状态
+            game_state = game_engine.get_game_state(game_session_id)
+            history = record_state_version(game_session_id, game_state)
+            
+            response_data = {
+                'game_session_id': game_session_id,
+                'message': '本地游戏已开始',
+                'game_state': history.current,
+                'version': history.version,
+                'ai_actions': ai_actions
+            }
         
         return jsonify(response_data), 200
     except Exception as e:
@@ -133,21 +157,29 @@ def process_game_action(session_id):
         payload = data.get('payload', {})
         action_enum = PlayerAction[action_type.upper()]
         
-        game_state = game_engine.process_action(
-            session_id,
-            current_user_id,
-            action_enum,
-            payload
-        )
-        
-        if game_state is None:
-            return jsonify({'error': '处理行动失败'}), 400
-        
-        response_data = {
-            'game_session_id': session_id,
-            'message': '行动处理成功',
-            'game_state': serialize_game_state(game_state)
-        }
+        # 客户端提供已知的状态版本时只返回之后的变更
+        known_version = data.get('known_version')
+        if known_version is not None and not isinstance(known_version, int):
+            return jsonify({'error': '状态版本必须是整数'}), 400
+        
+        # 对局在锁内读取、修改并写回，多个工作进程不会同时处理同一局
+        with game_engine.game_states.locked(session_id):
+            result = play_turn(session_id, current_user_id, action_enum, payload)
+            if result is None:
+                return jsonify({'error': '处理行动失败'}), 400
+            game_state, ai_actions, history = result
+            
+            response_data = {
+                'game_session_id': session_id,
+                'message': '行动处理成功',
+                'version': history.version,
+                'ai_actions': ai_actions
+            }
+            if known_version is None:
+                # 记录版本时已经序列化过当前状态
+                response_data['game_state'] = history.current
+            else:
+                response_data['changes'] = changes_since(history, game_state, known_version)
         
         return jsonify(response_data), 200
     except KeyError as e:
@@ -179,9 +211,11 @@ def get_game_state(session_id):
         if game_state is None:
             return jsonify({'error': '游戏状态不存在'}), 404
         
+        history = session_info.get('state_history')
         response_data = {
             'game_session_id': session_id,
-            'game_state': serialize_game_state(game_state)
+            'game_state': serialize_game_state(game_state),
+            'version': history.version if history else 0
         }
         
         return jsonify(response_data), 200
@@ -190,6 +224,130 @@ def get_game_state(session_id):
         return jsonify({'error': str(e)}), 500
 
 
+@local_game_bp.route('/local-game/<session_id>/diff', methods=['GET'])
+@jwt_required()
+def get_game_state_diff(session_id):
+    """
+    获取指定版本（since 参数）之后的状态变更
+    版本过旧或无效时返回一个替换整个状态的变更，客户端统一按变更处理即可
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        
+        since = request.args.get('since', type=int)
+        if since is None:
+            return jsonify({'error': '必须提供整数版本号 since'}), 400
+        
+        # 验证会话是否存在
+        if session_id not in local_game_sessions:
+            return jsonify({'error': '游戏会话不存在'}), 404
+        
+        session_info = local_game_sessions[session_id]
+        if session_info['player_id'] != current_user_id:
+            return jsonify({'error': '无权访问此游戏会话'}), 403
+        
+        game_state = game_engine.get_game_state(session_id)
+        if game_state is None:
+            return jsonify({'error': '游戏状态不存在'}), 404
+        
+        history = session_info.get('state_history') or StateHistory()
+        response_data = {
+            'game_session_id': session_id,
+            'version': history.version,
+            'changes': changes_since(history, game_state, since)
+        }
+        
+        return jsonify(response_data), 200
+    except Exception as e:
+        logging.error(f"Get game state diff error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@local_game_bp.route('/local-game/<session_id>/log', methods=['GET'])
+@jwt_required()
+def get_game_log(session_id):
+    """
+    分页获取游戏日志：返回序号大于 after 的事件，最多 limit 个
+    事件为结构化数据（类型、行动玩家、参数），render=true 时附带中文文本
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        
+        after = request.args.get('after', 0, type=int)
+        limit = min(max(request.args.get('limit', DEFAULT_LOG_PAGE_SIZE, type=int), 1), MAX_LOG_PAGE_SIZE)
+        render = request.args.get('render', 'false').lower() == 'true'
+        
+        # 验证会话是否存在
+        if session_id not in local_game_sessions:
+            return jsonify({'error': '游戏会话不存在'}), 404
+        
+        session_info = local_game_sessions[session_id]
+        if session_info['player_id'] != current_user_id:
+            return jsonify({'error': '无权访问此游戏会话'}), 403
+        
+        game_state = game_engine.get_game_state(session_id)
+        if game_state is None:
+            return jsonify({'error': '游戏状态不存在'}), 404
+        
+        game_log = game_state.game_log
+        events = game_log.after(after, limit)
+        serialized_events = []
+        for event in events:
+            serialized = event.to_dict()
+            if render:
+                serialized['text'] = event.render()
+            serialized_events.append(serialized)
+        
+        response_data = {
+            'game_session_id': session_id,
+            'events': serialized_events,
+            'first_seq': game_log.first_seq,  # 更早的事件已被丢弃
+            'last_seq': game_log.seq,
+            'has_more': bool(events) and events[-1].seq < game_log.seq
+        }
+        
+        return jsonify(response_data), 200
+    except Exception as e:
+        logging.error(f"Get game log error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@local_game_bp.route('/local-game/<session_id>/legal-actions', methods=['GET'])
+@jwt_required()
+def get_legal_actions(session_id):
+    """
+    获取当前玩家可以执行的操作，每项的 action_type 和 payload 可直接用于行动接口
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        
+        # 验证会话是否存在
+        if session_id not in local_game_sessions:
+            return jsonify({'error': '游戏会话不存在'}), 404
+        
+        session_info = local_game_sessions[session_id]
+        if session_info['player_id'] != current_user_id:
+            return jsonify({'error': '无权访问此游戏会话'}), 403
+        
+        actions = game_engine.legal_actions(session_id, current_user_id)
+        
+        response_data = {
+            'game_session_id': session_id,
+            'actions': [
+                {
+                    'action_type': action['action'].name,
+                    'payload': action['payload'],
+                    'dice': [die.value for die in action['dice']]
+                } for action in actions
+            ]
+        }
+        
+        return jsonify(response_data), 200
+    except Exception as e:
+        logging.error(f"Get legal actions error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 @local_game_bp.route('/local-game/<session_id>/end', methods=['POST'])
 @jwt_required()
 def end_local_game(session_id):
@@ -208,93 +366,183 @@ def end_local_game(session_id):
             return jsonify({'error': '无权访问此游戏会话'}), 403
         
         # 结束游戏
-        game_state = game_engine.get_game_state(session_id)
-        if game_state:
-            winner_id = determine_winner(game_state)  # 简单的胜负判断逻辑
-            game_engine.end_game(session_id, winner_id)
-        
-        # 清理会话
-        del local_game_sessions[session_id]
-        
-        return jsonify({'message': '本地游戏已结束'}), 200
+        with game_engine.game_states.locked(session_id):
+            game_state = game_engine.get_game_state(session_id)
+            game_record = None
+            if game_state:
+                winner_id = determine_winner(game_state)  # 简单的胜负判断逻辑
+                game_engine.end_game(session_id, winner_id)
+                # 对局记录包含随机种子，可用于复现对局
+                game_record = game_engine.get_game_record(session_id)
+            
+            # 清理会话
+            del local_game_sessions[session_id]
+            game_engine.game_states.pop(session_id, None)
+        
+        return jsonify({'message': '本地游戏已结束', 'game_record': game_record}), 200
     except Exception as e:
         logging.error(f"End local game error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 
+def play_turn(session_id: str, player_id: str, action: PlayerAction,
+              payload: Dict[str, Any]) -> Optional[Tuple[Any, List[Dict[str, Any]], StateHistory]]:
+    """
+    处理玩家行动，之后轮到AI时由AI行动，直到再次轮到玩家或游戏结束，并记录新的状态版本
+    返回 (游戏状态, AI执行的操作, 状态历史)，行动无效时返回None
+    需要在对局的 locked 上下文中调用
+    """
+    if game_engine.process_action(session_id, player_id, action, payload) is None:
+        return None
+    
+    ai_actions = run_ai_turns(session_id)
+    game_state = game_engine.get_game_state(session_id)
+    history = record_state_version(session_id, game_state)
+    return game_state, ai_actions, history
+
+
+def run_ai_turns(session_id: str, run_search: Optional[Callable] = None) -> List[Dict[str, Any]]:
+    """
+    轮到AI时让AI连续行动，直到轮到玩家或游戏结束，返回AI执行的操作
+    run_search(ai_player, choose) 执行一次AI搜索并返回选择的操作，默认在当前线程中直接调用 choose；
+    Socket.IO 通道用它把搜索移出事件循环（见 api/game_socket.py）
+    需要在对局的 locked 上下文中调用
+    """
+    session_info = local_game_sessions.get(session_id)
+    ai_player = session_info.get('ai_player') if session_info else None
+    if ai_player is None:
+        return []
+    
+    ai_actions = []
+    for _ in range(MAX_AI_ACTIONS_PER_TURN):
+        game_state = game_engine.get_game_state(session_id)
+        if game_state is None or game_state.is_game_over:
+            break
+        if game_state.players[game_state.current_player_index].player_id != AI_PLAYER_ID:
+            break
+        
+        actions = game_engine.legal_actions(session_id, AI_PLAYER_ID)
+        if not actions:
+            break
+        choose = partial(ai_player.choose_action, game_engine, game_state, actions, session_info['ai_rng'])
+        action = run_search(ai_player, choose) if run_search else choose()
+        if game_engine.process_action(session_id, AI_PLAYER_ID, action['action'], action['payload']) is None:
+            logging.error(f"AI action {action['action'].name} failed in game {session_id}")
+            break
+        ai_actions.append({'action_type': action['action'].name, 'payload': action['payload']})
+    
+    if ai_actions:
+        # 保存AI随机数状态（共享存储中读取到的是副本）
+        local_game_sessions[session_id] = session_info
+    
+    return ai_actions
+
+
+def record_state_version(session_id: str, game_state) -> StateHistory:
+    """
+    记录对局的新状态版本，返回状态历史
+    需要在对局的 locked 上下文中调用
+    """
+    session_info = local_game_sessions[session_id]
+    history = session_info.setdefault('state_history', StateHistory())
+    history.record(serialize_game_state(game_state))
+    local_game_sessions[session_id] = session_info
+    return history
+
+
+def changes_since(history: StateHistory, game_state, version: int) -> List[Dict[str, Any]]:
+    """
+    返回指定版本之后的变更，历史中已没有该版本时返回替换整个状态的变更
+    """
+    changes = history.since(version)
+    if changes is None:
+        return [{'op': 'replace', 'path': '', 'value': serialize_game_state(game_state)}]
+    return changes
+
+
 def convert_db_cards_to_game_cards(db_cards):
     """
     将数据库卡牌数据转换为游戏引擎需要的卡牌对象
+    卡牌定义按卡牌ID和 updated_at 缓存并在所有对局间共享（见 game_engine/card_registry.py），
+    开始对局时只需查找缓存，角色牌每次返回新的实例
     """
-    from models.enums import ElementType as EType, CardType as CType
     game_cards = []
-    
     for db_card in db_cards:
-        card_data = json.loads(db_card.cost) if db_card.cost else []
-        cost = []
-        
-        # 将字符串转换为ElementType枚举
-        for cost_item in card_data:
-            if cost_item == "万能":
-                cost.append(EType.OMNI)
-            elif cost_item == "火":
-                cost.append(EType.PYRO)
-            elif cost_item == "水":
-                cost.append(EType.HYDRO)
-            elif cost_item == "雷":
-                cost.append(EType.ELECTRO)
-            elif cost_item == "风":
-                cost.append(EType.ANEMO)
-            elif cost_item == "岩":
-                cost.append(EType.GEO)
-            elif cost_item == "草":
-                cost.append(EType.DENDRO)
-            elif cost_item == "冰":
-                cost.append(EType.CRYO)
-            elif cost_item == "物理":
-                cost.append(EType.PHYSICAL)
-            elif cost_item == "同色":
-                cost.append(EType.SAME)
-            elif cost_item == "晶体":
-                cost.append(EType.CRYSTAL)
-            else:
-                cost.append(EType.NONE)
-        
-        # 根据卡牌类型创建相应对象
-        if db_card.card_type == "角色牌":
-            skills = json.loads(db_card.skills) if db_card.skills else []
-            game_card = CharacterCard(
-                id=db_card.id,
-                name=db_card.name,
-                card_type=CType.CHARACTER,
-                cost=cost,
-                health=db_card.health or 10,
-                max_health=db_card.max_health or 10,
-                energy=db_card.energy or 0,
-                max_energy=db_card.max_energy or 3,
-                skills=skills,
-                element_type=getattr(EType, db_card.element_type, EType.NONE) if db_card.element_type else EType.NONE,
-                weapon_type=db_card.weapon_type or "",
-                description=db_card.description
-            )
-        else:
-            game_card = Card(
-                id=db_card.id,
-                name=db_card.name,
-                card_type=getattr(CType, db_card.card_type.replace('牌', '').upper(), CType.EVENT),
-                cost=cost,
-                description=db_card.description,
-                character_subtype=db_card.character_subtype
-            )
-        
-        game_cards.append(game_card)
+        definition = card_registry.definition(
+            db_card.id, _db_card_version(db_card), lambda db_card=db_card: build_game_card(db_card)
+        )
+        game_cards.append(card_registry.instance(definition))
     
     return game_cards
 
 
-def serialize_game_state(game_state):
+def _db_card_version(db_card):
+    """
+    卡牌数据的版本标识：使用 updated_at（卡牌修改时由数据库更新），
+    没有 updated_at 的数据（例如直接写入的行）退化为比较各字段
+    """
+    updated_at = getattr(db_card, 'updated_at', None)
+    if updated_at is not None:
+        return updated_at
+    return (db_card.name, db_card.card_type, db_card.cost, db_card.description, db_card.character_subtype,
+            db_card.element_type, db_card.health, db_card.max_health, db_card.energy, db_card.max_energy,
+            db_card.weapon_type, db_card.skills)
+
+
+# 数据库中费用文本到元素类型的映射，未知的费用类型转换为 NONE
+DB_COST_ELEMENTS = {element.value: element for element in ElementType}
+
+
+def parse_db_cost(cost_data) -> tuple:
+    """
+    将数据库中的费用转换为元素类型元组
+    定义在对局间共享，使用元组避免被修改，也可以直接作为 compile_cost 的缓存键
+    """
+    return tuple(DB_COST_ELEMENTS.get(cost_item, ElementType.NONE) for cost_item in cost_data)
+
+
+def build_game_card(db_card):
+    """
+    将一条数据库卡牌数据构建为卡牌对象
+    费用和技能JSON只在构建卡牌定义时解析一次，之后的对局直接使用缓存的定义
+    """
+    cost = parse_db_cost(load_json_column(db_card.cost))
+    
+    # 根据卡牌类型创建相应对象
+    if db_card.card_type == "角色牌":
+        skills = load_json_column(db_card.skills)
+        game_card = CharacterCard(
+            id=db_card.id,
+            name=db_card.name,
+            card_type=CardType.CHARACTER,
+            cost=cost,
+            health=db_card.health or 10,
+            max_health=db_card.max_health or 10,
+            energy=db_card.energy or 0,
+            max_energy=db_card.max_energy or 3,
+            skills=skills,
+            element_type=getattr(ElementType, db_card.element_type, ElementType.NONE) if db_card.element_type else ElementType.NONE,
+            weapon_type=db_card.weapon_type or "",
+            description=db_card.description
+        )
+    else:
+        game_card = Card(
+            id=db_card.id,
+            name=db_card.name,
+            card_type=getattr(CardType, db_card.card_type.replace('牌', '').upper(), CardType.EVENT),
+            cost=cost,
+            description=db_card.description,
+            character_subtype=db_card.character_subtype
+        )
+    
+    return game_card
+
+
+def serialize_game_state(game_state) -> Optional[Dict[str, Any]]:
     """
     序列化游戏状态为JSON可序列化格式
+    游戏日志不包含在内，log_seq 为最新的日志序号，日志通过 /local-game/<id>/log 分页获取
+    每次都生成新的容器，不引用引擎中的可变对象，结果可以直接交给 StateHistory 保存
     """
     if game_state is None:
         return None
@@ -315,7 +563,7 @@ def serialize_game_state(game_state):
                         'element_type': char.element_type.value if hasattr(char.element_type, 'value') else str(char.element_type),
                         'weapon_type': char.weapon_type,
                         'status': char.status.value if hasattr(char.status, 'value') else str(char.status),
-                        'skills': char.skills if hasattr(char, 'skills') else []
+                        'skills': _json_value(char.skills) if hasattr(char, 'skills') else []
                     } for char in player.characters
                 ],
                 'active_character_index': player.active_character_index,
@@ -331,22 +579,34 @@ def serialize_game_state(game_state):
                 'dice': [
                     die.value if hasattr(die, 'value') else str(die) for die in player.dice
                 ],
-                'supports': player.supports,
-                'summons': player.summons
+                'supports': _json_value(player.supports),
+                'summons': _json_value(player.summons)
             } for player in game_state.players
         ],
         'current_player_index': game_state.current_player_index,
         'round_number': game_state.round_number,
         'phase': game_state.phase.value if hasattr(game_state.phase, 'value') else str(game_state.phase),
         'round_actions': game_state.round_actions,
-        'game_log': game_state.game_log,
+        'log_seq': game_state.game_log.seq,
         'is_game_over': game_state.is_game_over,
-        'winner': game_state.winner
+        'winner': game_state.winner,
+        'seed': game_state.seed
     }
     
     return serialized
 
 
+def _json_value(value):
+    """将技能等数据中的枚举转换为其值"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {key: _json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    return value
+
+
 def determine_winner(game_state):
     """
     简单的胜负判断逻辑
@@ -8,7 +8,13 @@ import os
 
 # 初始化扩展
 db = SQLAlchemy()
-socketio = SocketIO(cors_allowed_origins="*")
+# SOCKETIO_ASYNC_MODE 可选 eventlet/gevent/threading，未设置时自动选择已安装的异步库
+# 多个工作进程时通过 SOCKETIO_MESSAGE_QUEUE（如 redis://）在进程间广播
+socketio = SocketIO(
+    cors_allowed_origins="*",
+    async_mode=os.environ.get('SOCKETIO_ASYNC_MODE') or None,
+    message_queue=os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+)
 
 def create_app():
     app = Flask(__name__)
@@ -60,6 +66,12 @@ def create_app():
             register_deck_builder_routes(app)
         except ImportError as e:
             logging.warning(f"Could not import deck builder blueprint: {e}")
+        
+        try:
+            from api.game_socket import register_game_socket_events
+            register_game_socket_events(socketio)
+        except ImportError as e:
+            logging.warning(f"Could not import game socket events: {e}")
 
     # API endpoints for character data
     try:
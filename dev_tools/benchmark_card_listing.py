@@ -0,0 +1,81 @@
+"""
+开发工具：比较卡牌列表接口在重复编码JSON列和原生JSON列上的吞吐量
+
+在临时SQLite数据库中按原来导入脚本的方式写入卡牌（cost / skills 为JSON字符串），
+测量 /api/cards/characters 和 /api/cards 每秒能生成多少页（不经过响应缓存），
+然后执行 migrate_json_columns 转换为原生JSON值后再测一次。
+
+用法: python dev_tools/benchmark_card_listing.py --cards 400 --per-page 50 --rounds 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'benchmark_cards.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+
+from app import app, db  # noqa: E402
+from api import cards  # noqa: E402
+from migrate_db import migrate_json_columns  # noqa: E402
+from models.db_models import CardData  # noqa: E402
+
+SKILL = {'id': 'skill', 'name': '技能', 'description': '造成3点火元素伤害。' * 4, 'cost': ['火', '火', '火'], 'type': '元素战技'}
+
+
+def insert_double_encoded_cards(count):
+    """按原来导入脚本的方式写入卡牌：cost 和 skills 是JSON字符串"""
+    for i in range(count):
+        is_character = i % 4 == 0
+        db.session.add(CardData(
+            id=f'card-{i:05d}',
+            name=f'卡牌{i}',
+            card_type='角色牌' if is_character else '事件牌',
+            element_type='火',
+            cost=json.dumps(['火', '同色', '同色'], ensure_ascii=False),
+            description='测试卡牌描述' * 5,
+            skills=json.dumps([dict(SKILL, id=f'skill{n}') for n in range(3)] if is_character else [],
+                              ensure_ascii=False),
+            health=10,
+            max_health=10,
+        ))
+    db.session.commit()
+
+
+def measure(path, rounds, build):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        with app.test_request_context(path):
+            build()
+    return rounds / (time.perf_counter() - started)
+
+
+def run(label, per_page, rounds):
+    for path, build in ((f'/api/cards/characters?per_page={per_page}', cards._build_character_cards),
+                        (f'/api/cards?per_page={per_page}', cards._build_all_cards)):
+        print(f"{label} {path}: {measure(path, rounds, build):.0f} 页/秒")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='比较重复编码JSON列和原生JSON列的卡牌列表吞吐量')
+    parser.add_argument('--cards', type=int, default=400, help='卡牌数量')
+    parser.add_argument('--per-page', type=int, default=50, help='每页卡牌数')
+    parser.add_argument('--rounds', type=int, default=200, help='每个接口生成的页数')
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        db.create_all()
+        insert_double_encoded_cards(args.cards)
+        run('重复编码', args.per_page, args.rounds)
+        print(f"转换 {migrate_json_columns()} 行")
+        run('原生JSON', args.per_page, args.rounds)
+    os.remove(DB_PATH)
+
+
+if __name__ == '__main__':
+    main()
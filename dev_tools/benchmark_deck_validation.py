@@ -0,0 +1,77 @@
+"""
+开发工具：测量 validate_deck_composition 的耗时
+
+使用开发数据库中的卡牌（只读）生成 33 张的标准卡组和超大卡组（同一批卡牌ID重复多次），
+比较原来的实现（每个ID列表一次 IN 查询，并对每张查到的卡牌在ID列表上调用 count()）
+和当前实现（Counter 计数，卡牌对象来自按卡牌目录版本缓存的 validation_cards）。
+
+用法: python dev_tools/benchmark_deck_validation.py --sizes 33 330 3300 --rounds 200
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from game_engine.deck_validation import DeckValidationSystem  # noqa: E402
+from models.db_models import CardData, load_json_column  # noqa: E402
+from models.game_models import Card  # noqa: E402
+from utils.deck_validator import validate_deck_composition  # noqa: E402
+
+
+def legacy_validate_deck_composition(deck_data):
+    """原来的实现：每个ID列表查询一次数据库，每张卡牌对ID列表调用一次 count()"""
+    all_cards = []
+    for key in ('character_ids', 'card_ids'):
+        if not deck_data.get(key):
+            continue
+        for card in CardData.query.filter(CardData.id.in_(deck_data[key])).all():
+            card_obj = Card(id=str(card.id), name=card.name, card_type=card.card_type,
+                            cost=load_json_column(card.cost), description=card.description or "",
+                            character_subtype=card.character_subtype)
+            all_cards.extend([card_obj] * deck_data[key].count(card.id))
+    return DeckValidationSystem().validate_deck(all_cards)
+
+
+def build_deck(character_ids, action_ids, size):
+    """3张角色牌，其余为行动牌（按顺序循环，每张最多重复到填满卡组）"""
+    cards = [action_ids[i % len(action_ids)] for i in range(size - 3)]
+    return {'name': 'Benchmark Deck', 'character_ids': character_ids[:3], 'card_ids': cards}
+
+
+def measure(validate, deck_data, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        validate(deck_data)
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='测量卡组构成验证的耗时')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[33, 330, 3300], help='卡组大小')
+    parser.add_argument('--rounds', type=int, default=200, help='每种卡组验证的次数')
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        rows = CardData.query.with_entities(CardData.id, CardData.card_type).all()
+        character_ids = [card_id for card_id, card_type in rows if card_type == '角色牌']
+        action_ids = [card_id for card_id, card_type in rows if card_type != '角色牌'][:30]
+        if len(character_ids) < 3 or not action_ids:
+            print("数据库中没有足够的卡牌，请先运行 import_card_data.py")
+            return 1
+
+        # 预热卡牌缓存
+        validate_deck_composition(build_deck(character_ids, action_ids, 33))
+        for size in args.sizes:
+            deck_data = build_deck(character_ids, action_ids, size)
+            legacy = measure(legacy_validate_deck_composition, deck_data, args.rounds)
+            current = measure(validate_deck_composition, deck_data, args.rounds)
+            print(f"{size} 张: 原实现 {legacy:.3f} ms/次，当前实现 {current:.3f} ms/次")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+开发工具：测量每局对局占用的内存
+
+创建若干局对局，每局从JSON文本转换双方卡组（与本地对局从数据库转换卡牌相同，卡牌定义通过
+card_registry 共享；--copy-cards 时每局重新构建全部卡牌），随机推进若干步，
+用 tracemalloc 统计平均每局占用的字节数，同时给出会话存储中序列化后的大小。
+
+用法: python dev_tools/benchmark_game_memory.py --games 200 --actions 40 [--copy-cards]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine.card_library import CARD_DATA_PATH, CardLibrary, build_action_card, build_character_card
+from game_engine.card_registry import card_registry
+from game_engine.core import GameEngine
+from game_engine.session_store import dump_session, estimate_size
+from game_engine.simulate import RandomPolicy, configure_logging
+
+
+def load_card_texts(card_data_path):
+    """按卡牌名保存每张卡的JSON文本和是否为角色牌"""
+    texts = {}
+    for filename in ['characters.json', 'equipments.json', 'events.json', 'supports.json']:
+        with open(os.path.join(card_data_path, filename), 'r', encoding='utf-8') as f:
+            for card_data in json.load(f):
+                texts[card_data['name']] = (filename == 'characters.json', json.dumps(card_data, ensure_ascii=False))
+    return texts
+
+
+def build_card(card_text):
+    is_character, text = card_text
+    if is_character:
+        return build_character_card(json.loads(text))
+    return build_action_card(json.loads(text))
+
+
+def build_game_deck(card_texts, deck, copy_cards):
+    """从JSON文本转换卡组中的每张卡牌"""
+    if copy_cards:
+        return [build_card(card_texts[card.name]) for card in deck]
+    return [
+        card_registry.instance(card_registry.definition(
+            card.name, card_texts[card.name], lambda card=card: build_card(card_texts[card.name])
+        )) for card in deck
+    ]
+
+
+def create_games(engine, library, card_texts, games, actions, seed, copy_cards=False):
+    rng = random.Random(seed)
+    policy = RandomPolicy()
+    decks = [library.random_deck(random.Random(seed + i)) for i in range(2)]
+    game_ids = []
+    for i in range(games):
+        deck1 = build_game_deck(card_texts, decks[0], copy_cards)
+        deck2 = build_game_deck(card_texts, decks[1], copy_cards)
+        game_id = engine.create_game_state("player1", "player2", deck1, deck2, seed=seed + i)
+        for _ in range(actions):
+            game_state = engine.get_game_state(game_id)
+            if game_state.is_game_over:
+                break
+            player = game_state.players[game_state.current_player_index]
+            legal = engine.legal_actions(game_id, player.player_id)
+            if not legal:
+                break
+            action = policy.choose_action(engine, game_state, legal, rng)
+            engine.process_action(game_id, player.player_id, action['action'], action['payload'])
+        game_ids.append(game_id)
+    return game_ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='测量每局对局占用的内存')
+    parser.add_argument('--games', type=int, default=200, help='对局数')
+    parser.add_argument('--actions', type=int, default=40, help='每局推进的操作数')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子')
+    parser.add_argument('--card-data', default=CARD_DATA_PATH, help='卡牌数据目录')
+    parser.add_argument('--copy-cards', action='store_true', help='每局重新构建全部卡牌，不共享卡牌定义')
+    args = parser.parse_args(argv)
+
+    configure_logging(False)
+    library = CardLibrary(args.card_data)
+    card_texts = load_card_texts(args.card_data)
+    engine = GameEngine()
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    game_ids = create_games(engine, library, card_texts, args.games, args.actions, args.seed, args.copy_cards)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    states = [engine.get_game_state(game_id) for game_id in game_ids]
+    pickled = sum(estimate_size(state) for state in states) / len(states)
+    compressed = sum(len(dump_session(state)) for state in states) / len(states)
+
+    print(f"对局数: {len(game_ids)}")
+    print(f"每局内存: {(after - before) / len(game_ids):.0f} 字节")
+    print(f"每局序列化大小: {pickled:.0f} 字节（压缩后 {compressed:.0f} 字节）")
+
+
+if __name__ == '__main__':
+    main()
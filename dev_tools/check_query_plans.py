@@ -0,0 +1,137 @@
+"""
+开发工具：检查热点查询的执行计划
+
+对 api/cards.py、api/local_game.py、api/auth.py 中每次请求都会执行的查询运行 EXPLAIN QUERY PLAN（SQLite），
+任一查询对表做全表扫描（SCAN，且不是通过索引）时以非零状态退出，
+用于发现索引缺失或查询写法导致的退化。
+
+默认检查 DATABASE_URL 指向的数据库（先运行 migrate_db.py 创建索引），
+--fresh 时在内存数据库中按模型建表后检查（只验证模型中声明的索引）。
+
+用法: python dev_tools/check_query_plans.py [--fresh] [-v]
+"""
+import argparse
+import os
+import re
+import sys
+from typing import Callable, Dict, List, NamedTuple
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select  # noqa: E402
+
+# 对整张表的扫描（SQLite 对通过索引访问的计划输出 SEARCH，或 SCAN ... USING (COVERING) INDEX）
+FULL_SCAN_PATTERN = re.compile(r'^SCAN (\w+)\b(?! USING (?:COVERING )?INDEX)')
+
+
+class HotQuery(NamedTuple):
+    """
+    热点查询：名称、来源和生成查询语句的函数
+    allow_scan 为 True 的查询本身需要读取整张表（例如不带过滤条件的卡牌列表），不检查
+    """
+    name: str
+    source: str
+    build: Callable
+    allow_scan: bool = False
+
+
+def _page(statement):
+    """分页查询：paginate(count=False) 只按 LIMIT/OFFSET 查询当前页，总数来自卡牌数量统计（catalog_summary）"""
+    return [statement.limit(20).offset(20)]
+
+
+def hot_queries() -> List[HotQuery]:
+    from models.db_models import CardData, Deck, GameHistory, User
+
+    card_ids = ['card-1', 'card-2', 'card-3']
+    return [
+        HotQuery('cards_all', 'api/cards.py get_all_cards', lambda: _page(select(CardData)), allow_scan=True),
+        HotQuery('cards_by_type', 'api/cards.py get_all_cards?type=',
+                 lambda: _page(select(CardData).where(CardData.card_type == '事件牌'))),
+        HotQuery('cards_by_element', 'api/cards.py get_all_cards?element=',
+                 lambda: _page(select(CardData).where(CardData.element_type == '火'))),
+        HotQuery('cards_by_type_element', 'api/cards.py get_character_cards?element=',
+                 lambda: _page(select(CardData).where(CardData.card_type == '角色牌',
+                                                      CardData.element_type == '火'))),
+        HotQuery('cards_keyset', 'api/cards.py get_all_cards?cursor=',
+                 lambda: [select(CardData).where(CardData.id > 'card-1').order_by(CardData.id).limit(21)]),
+        HotQuery('cards_keyset_by_type', 'api/cards.py get_character_cards?cursor=',
+                 lambda: [select(CardData).where(CardData.card_type == '角色牌', CardData.id > 'card-1')
+                          .order_by(CardData.id).limit(21)]),
+        HotQuery('catalog_summary', 'api/catalog_cache.py 卡牌数量统计',
+                 lambda: [select(CardData.card_type, CardData.element_type, func.count())
+                          .group_by(CardData.card_type, CardData.element_type)]),
+        HotQuery('cards_by_ids', 'api/cards.py / api/local_game.py 卡组卡牌',
+                 lambda: [select(CardData).where(CardData.id.in_(card_ids))]),
+        HotQuery('cards_by_name', '按卡牌名查找', lambda: [select(CardData).where(CardData.name == '迪卢克')]),
+        HotQuery('user_decks', 'api/cards.py get_user_decks',
+                 lambda: [select(Deck).where(Deck.user_id == 'user-1')]),
+        HotQuery('user_deck', 'api/cards.py get_deck / api/local_game.py start_local_game',
+                 lambda: [select(Deck).where(Deck.id == 'deck-1', Deck.user_id == 'user-1')]),
+        HotQuery('user_by_name', 'api/auth.py register / login',
+                 lambda: [select(User).where(User.username == 'player')]),
+        HotQuery('user_by_id', 'api/auth.py profile', lambda: [select(User).where(User.id == 'user-1')]),
+        HotQuery('user_games', '对局记录',
+                 lambda: [select(GameHistory).where(GameHistory.player1_id == 'user-1'),
+                          select(GameHistory).where(GameHistory.player2_id == 'user-1'),
+                          select(GameHistory).where(GameHistory.winner_id == 'user-1')]),
+    ]
+
+
+def explain(connection, statement) -> List[str]:
+    """返回查询的 EXPLAIN QUERY PLAN 输出（每个步骤的描述）"""
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    return [step for step in plan if FULL_SCAN_PATTERN.match(step)]
+
+
+def check_query_plans(connection, verbose: bool = False) -> Dict[str, List[str]]:
+    """
+    检查所有热点查询，返回存在全表扫描的查询名称和对应的计划步骤
+    """
+    failures = {}
+    for query in hot_queries():
+        for statement in query.build():
+            plan = explain(connection, statement)
+            if verbose:
+                print(f"{query.name} ({query.source}):")
+                for step in plan:
+                    print(f"    {step}")
+            scans = full_scans(plan)
+            if scans and not query.allow_scan:
+                failures.setdefault(query.name, []).extend(scans)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='检查热点查询的执行计划')
+    parser.add_argument('--fresh', action='store_true', help='在内存数据库中按模型建表后检查')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出每个查询的执行计划')
+    args = parser.parse_args(argv)
+
+    from app import app
+    from models.db_models import db
+
+    with app.app_context():
+        if args.fresh:
+            engine = create_engine('sqlite://')
+            db.metadata.create_all(engine)
+        else:
+            engine = db.engine
+        with engine.connect() as connection:
+            failures = check_query_plans(connection, args.verbose)
+
+    for name, scans in failures.items():
+        print(f"全表扫描: {name}: {'; '.join(scans)}")
+    if failures:
+        return 1
+    print("所有热点查询都使用了索引")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+从 card_data/ 目录的 JSON 数据构建游戏引擎使用的卡牌对象
+
+用于不依赖数据库的场景，例如批量对局模拟
+"""
+import json
+import os
+import random
+import re
+from typing import Any, Dict, List, Optional
+
+from game_engine.card_registry import CardRegistry
+from models.game_models import Card, CharacterCard
+from models.enums import CardType, DamageType, ElementType
+
+CARD_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'card_data')
+
+# 元素名称到元素类型的映射
+ELEMENT_BY_NAME = {
+    '风': ElementType.ANEMO,
+    '岩': ElementType.GEO,
+    '雷': ElementType.ELECTRO,
+    '草': ElementType.DENDRO,
+    '水': ElementType.HYDRO,
+    '火': ElementType.PYRO,
+    '冰': ElementType.CRYO,
+}
+
+# 技能类型名称到引擎技能类型的映射（被动技能不能主动使用）
+SKILL_TYPE_BY_NAME = {
+    '普通攻击': 'NORMAL_ATTACK',
+    '元素战技': 'ELEMENTAL_SKILL',
+    '元素爆发': 'ELEMENTAL_BURST',
+}
+
+DAMAGE_PATTERN = re.compile(r'造成(\d+)点\s*(\S*?)伤害')
+
+MAX_COPIES_PER_CARD = 2
+CHARACTERS_PER_DECK = 3
+ACTION_CARDS_PER_DECK = 30
+
+# 名称包含这些关键字的行动牌有额外的构筑限制
+RESTRICTED_KEYWORDS = ('秘传', '元素共鸣', '国家')
+
+
+def parse_cost(cost_data: List[Dict[str, Any]]) -> List[ElementType]:
+    """
+    将JSON费用转换为元素骰列表
+    象形（同色）费用转换为SAME，无色费用转换为CRYSTAL，充能不消耗骰子
+    """
+    cost = []
+    for cost_item in cost_data:
+        cost_type = cost_item.get('type', '')
+        value = cost_item.get('value', 1)
+        if cost_type == '充能':
+            continue
+        if cost_type in ELEMENT_BY_NAME:
+            element = ELEMENT_BY_NAME[cost_type]
+        elif cost_type == '象形':
+            element = ElementType.SAME
+        else:
+            element = ElementType.CRYSTAL
+        cost.extend([element] * value)
+    return cost
+
+
+def parse_energy_cost(cost_data: List[Dict[str, Any]]) -> int:
+    """技能消耗的充能"""
+    return sum(item.get('value', 0) for item in cost_data if item.get('type') == '充能')
+
+
+def parse_skill(skill_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    将JSON技能转换为引擎技能字典，被动技能返回None
+    """
+    skill_type = SKILL_TYPE_BY_NAME.get(skill_data.get('type', ''))
+    if skill_type is None:
+        return None
+
+    skill = {
+        'id': skill_data.get('name', ''),
+        'name': skill_data.get('name', ''),
+        'skill_type': skill_type,
+        'cost': parse_cost(skill_data.get('cost', [])),
+        'energy_cost': parse_energy_cost(skill_data.get('cost', [])),
+        'damage': 0,
+        'damage_type': None,
+        'element_application': None,
+        'description': skill_data.get('description', ''),
+    }
+
+    match = DAMAGE_PATTERN.search(skill_data.get('description', ''))
+    if match:
+        skill['damage'] = int(match.group(1))
+        damage_kind = match.group(2)
+        element = ELEMENT_BY_NAME.get(damage_kind[:1]) if damage_kind.endswith('元素') else None
+        if element is not None:
+            skill['damage_type'] = DamageType.ELEMENTAL
+            skill['element_application'] = element
+        elif damage_kind == '穿透':
+            skill['damage_type'] = DamageType.PIERCING
+        else:
+            skill['damage_type'] = DamageType.PHYSICAL
+    return skill
+
+
+def character_element(character_data: Dict[str, Any]) -> ElementType:
+    """从技能费用中获取角色元素"""
+    for skill in character_data.get('skills', []):
+        for cost_item in skill.get('cost', []):
+            element = ELEMENT_BY_NAME.get(cost_item.get('type', ''))
+            if element is not None:
+                return element
+    return ElementType.NONE
+
+
+def build_character_card(character_data: Dict[str, Any]) -> CharacterCard:
+    """根据角色JSON数据构建角色卡"""
+    skills = []
+    max_energy = 3
+    for skill_data in character_data.get('skills', []):
+        skill = parse_skill(skill_data)
+        if skill is None:
+            continue
+        skills.append(skill)
+        if skill['skill_type'] == 'ELEMENTAL_BURST' and skill['energy_cost']:
+            max_energy = skill['energy_cost']
+
+    region = character_data.get('region', '')
+    return CharacterCard(
+        id=character_data['name'],
+        name=character_data['name'],
+        card_type=CardType.CHARACTER,
+        cost=[],
+        description=region,
+        max_energy=max_energy,
+        skills=skills,
+        element_type=character_element(character_data),
+    )
+
+
+def action_card_type(card_data: Dict[str, Any]) -> CardType:
+    """根据类别判断行动牌类型"""
+    category = card_data.get('category', '')
+    if '武器' in category:
+        return CardType.WEAPON
+    if '圣遗物' in category:
+        return CardType.ARTIFACT
+    if '天赋' in category:
+        return CardType.TALENT
+    if '支援牌' in category:
+        return CardType.SUPPORT
+    return CardType.EVENT
+
+
+def build_action_card(card_data: Dict[str, Any]) -> Card:
+    """根据行动牌JSON数据构建卡牌"""
+    skills = card_data.get('skills', [])
+    first_skill = skills[0] if skills else {}
+    return Card(
+        id=card_data['name'],
+        name=card_data['name'],
+        card_type=action_card_type(card_data),
+        cost=parse_cost(first_skill.get('cost', [])),
+        description=first_skill.get('description', ''),
+    )
+
+
+class CardLibrary:
+    """
+    按名称索引的卡牌库
+    """
+
+    def __init__(self, card_data_path: str = CARD_DATA_PATH):
+        self.characters: Dict[str, CharacterCard] = {}
+        self.action_cards: Dict[str, Card] = {}
+
+        with open(os.path.join(card_data_path, 'characters.json'), 'r', encoding='utf-8') as f:
+            for character_data in json.load(f):
+                self.characters[character_data['name']] = build_character_card(character_data)
+
+        for filename in ['equipments.json', 'events.json', 'supports.json']:
+            with open(os.path.join(card_data_path, filename), 'r', encoding='utf-8') as f:
+                for card_data in json.load(f):
+                    self.action_cards[card_data['name']] = build_action_card(card_data)
+
+    def build_deck(self, character_names: List[str], card_names: List[str]) -> List[Card]:
+        """
+        根据角色名和行动牌名构建卡组，未知的卡牌名会抛出KeyError
+        行动牌直接共享库中的定义，角色牌为独立的实例
+        """
+        deck: List[Card] = [CardRegistry.instance(self.characters[name]) for name in character_names]
+        deck.extend(self.action_cards[name] for name in card_names)
+        return deck
+
+    def random_deck(self, rng: random.Random) -> List[Card]:
+        """
+        随机构建一套合法卡组：3个角色和30张行动牌，每种最多2张
+        天赋牌、秘传牌和元素共鸣牌对角色组合有要求，不参与随机选择
+        """
+        character_names = rng.sample(sorted(self.characters), CHARACTERS_PER_DECK)
+        candidates = sorted(
+            name for name, card in self.action_cards.items()
+            if card.card_type != CardType.TALENT and not any(keyword in name for keyword in RESTRICTED_KEYWORDS)
+        )
+        card_names: List[str] = []
+        for name in rng.sample(candidates, ACTION_CARDS_PER_DECK // MAX_COPIES_PER_CARD):
+            card_names.extend([name] * MAX_COPIES_PER_CARD)
+        return self.build_deck(character_names, card_names)
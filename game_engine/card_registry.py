@@ -0,0 +1,85 @@
+"""
+共享卡牌定义
+
+同一张卡牌在所有对局中只保留一份定义（名称、描述、费用、技能等），按卡牌ID索引。
+- 行动牌在对局中从不修改，对局直接引用共享的定义对象
+- 角色牌有生命值、能量、装备、状态等对局内状态，每局使用一个浅复制的实例，
+  实例只持有这些可变字段，名称、描述、费用列表和技能列表仍然引用共享定义
+
+共享定义是只读的：引擎只修改 GameState / PlayerState / CharacterCard 的状态字段和它们持有的容器
+（见 snapshot.py），不会修改卡牌的费用列表和技能字典。
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from game_engine.snapshot import clone_character
+from models.game_models import Card, CharacterCard
+
+
+class CardRegistry:
+    """
+    按卡牌ID索引的卡牌定义，version 不同时（卡牌数据已更新）重新构建；
+    卡牌目录版本变化时（见 use_catalog）清空全部定义，已删除的卡牌不会一直留在登记中
+    """
+
+    def __init__(self):
+        self._definitions: Dict[Any, Tuple[Hashable, Card]] = {}
+        self._catalog_version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+
+    def use_catalog(self, catalog_version: Hashable) -> None:
+        """
+        记录当前的卡牌目录版本，与上次记录的版本不同时清空全部定义
+        """
+        if catalog_version == self._catalog_version:
+            return
+        with self._lock:
+            if catalog_version != self._catalog_version:
+                self._definitions.clear()
+                self._catalog_version = catalog_version
+
+    def definition(self, card_id: Any, version: Hashable, factory: Callable[[], Card]) -> Card:
+        """
+        获取卡牌定义，不存在或版本不一致时调用 factory 构建并登记
+        """
+        entry = self._definitions.get(card_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        card = factory()
+        with self._lock:
+            entry = self._definitions.get(card_id)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            self._definitions[card_id] = (version, card)
+        return card
+
+    def get(self, card_id: Any) -> Optional[Card]:
+        entry = self._definitions.get(card_id)
+        return entry[1] if entry else None
+
+    @staticmethod
+    def instance(definition: Card) -> Card:
+        """
+        对局中使用的卡牌：角色牌复制出独立的状态，行动牌直接共享定义
+        """
+        if isinstance(definition, CharacterCard):
+            return clone_character(definition)
+        return definition
+
+    def invalidate(self, card_id: Any = None) -> None:
+        """删除指定卡牌（未指定时删除全部）的定义"""
+        with self._lock:
+            if card_id is None:
+                self._definitions.clear()
+            else:
+                self._definitions.pop(card_id, None)
+
+    def __contains__(self, card_id: Any) -> bool:
+        return card_id in self._definitions
+
+    def __len__(self) -> int:
+        return len(self._definitions)
+
+
+# 进程内共享的卡牌定义
+card_registry = CardRegistry()
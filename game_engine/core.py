@@ -1,29 +1,40 @@
 """
 七圣召唤游戏引擎核心实现 - 改进版
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, MutableMapping
+import random
 from models.game_models import GameState, PlayerState, Card, CharacterCard
-from models.enums import GamePhase, PlayerAction, ElementType, CharacterStatus, DamageType
-from game_engine.element_reactions import ElementReactionSystem
-from game_engine.deck_validation import DeckValidationSystem
+from models.enums import GamePhase, PlayerAction, ElementType, CharacterStatus, DamageType, LogEventType
+from game_engine.element_reactions import element_reaction_system
+from game_engine.deck_validation import deck_validation_system
+from game_engine.snapshot import clone_game_state
+from models.dice import DicePool, DICE_SLOTS, CostRequirement, compile_cost, dice_from_counts, solve_requirement
 import logging
 
+# 技能费用表缓存的条目上限
+SKILL_COST_CACHE_SIZE = 1024
+
 
 class GameEngine:
     """
     游戏引擎核心类，处理游戏逻辑和状态变更
     """
     
-    def __init__(self):
-        self.game_states: Dict[str, GameState] = {}  # 存储游戏会话状态
-        self.element_reaction_system = ElementReactionSystem()  # 元素反应系统
-        self.deck_validation_system = DeckValidationSystem()  # 卡组验证系统
+    def __init__(self, game_states: Optional[MutableMapping] = None):
+        # 存储游戏会话状态，可以传入带淘汰策略的会话存储（见 session_store.py）替代字典
+        self.game_states: MutableMapping = game_states if game_states is not None else {}
+        self.element_reaction_system = element_reaction_system  # 元素反应系统（无状态，所有引擎共享）
+        self.deck_validation_system = deck_validation_system  # 卡组验证系统（无状态，所有引擎共享）
+        self._skill_cost_tables: Dict[int, Any] = {}  # 角色技能费用表缓存，按技能列表对象索引
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-    def create_game_state(self, player1_id: str, player2_id: str, deck1: List[Card], deck2: List[Card]) -> str:
+    def create_game_state(self, player1_id: str, player2_id: str, deck1: List[Card], deck2: List[Card],
+                          seed: Optional[int] = None) -> str:
         """
         创建新的游戏状态，包含初始手牌和初始手牌替换机制
+
+        本局的投骰和抽牌只使用由 seed 初始化的随机数生成器，未指定时随机生成种子并记录在游戏状态中
         """
         # 首先验证卡组
         validation_result1 = self.deck_validation_system.validate_deck(deck1)
@@ -37,7 +48,9 @@ class GameEngine:
             self.logger.error(f"Player {player2_id} deck validation failed: {validation_result2['errors']}")
             return None  # 返回None表示创建失败
         
-        import random
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(32)
+        rng = random.Random(seed)
         
         # 初始化玩家手牌（每个玩家抽5张）
         player1_deck = deck1.copy()
@@ -54,14 +67,14 @@ class GameEngine:
         player1_hand = []
         for _ in range(5):
             if player1_non_character_cards:
-                card = random.choice(player1_non_character_cards)
+                card = rng.choice(player1_non_character_cards)
                 player1_hand.append(card)
                 player1_non_character_cards.remove(card)
         
         player2_hand = []
         for _ in range(5):
             if player2_non_character_cards:
-                card = random.choice(player2_non_character_cards)
+                card = rng.choice(player2_non_character_cards)
                 player2_hand.append(card)
                 player2_non_character_cards.remove(card)
         
@@ -98,7 +111,9 @@ class GameEngine:
             current_player_index=0,  # 默认玩家1先手
             first_player_index=0,  # 记录先手玩家
             phase=GamePhase.ROLL_PHASE,
-            can_replace_initial_cards=True  # 允许替换初始手牌
+            can_replace_initial_cards=True,  # 允许替换初始手牌
+            seed=seed,
+            rng=rng
         )
         
         # 生成唯一的游戏ID
@@ -106,7 +121,7 @@ class GameEngine:
         game_id = str(uuid.uuid4())
         self.game_states[game_id] = game_state
         
-        self.logger.info(f"Created new game with ID: {game_id}")
+        self.logger.info(f"Created new game with ID: {game_id} (seed {seed})")
         return game_id
 
     def process_action(self, game_id: str, player_id: str, action: PlayerAction, payload: Dict[str, Any]) -> Optional[GameState]:
@@ -188,7 +203,7 @@ class GameEngine:
             game_state.phase = GamePhase.ROLL_PHASE
         
         # 记录到游戏日志
-        game_state.game_log.append(f"玩家 {player.player_id} 替换了 {len(card_ids_to_replace)} 张手牌")
+        game_state.game_log.append(LogEventType.REPLACE_CARDS, player.player_id, count=len(card_ids_to_replace))
         
         return game_state
 
@@ -207,17 +222,20 @@ class GameEngine:
                           ElementType.DENDRO, ElementType.HYDRO, ElementType.PYRO, 
                           ElementType.CRYO, ElementType.OMNI]  # 包含万能元素
             
-            for i in indices_to_reroll:
-                if 0 <= i < len(player.dice):
-                    # 随机选择一个新的骰子类型
-                    import random
-                    player.dice[i] = random.choice(dice_types)
+            # 骰池按元素排序，先取出所有要重投的骰子，避免重投后下标对应的骰子发生变化
+            dice = self._dice_pool(player)
+            rerolled = [dice[i] for i in set(indices_to_reroll) if 0 <= i < len(dice)]
+            for die in rerolled:
+                dice.remove(die)
+            for _ in rerolled:
+                # 随机选择一个新的骰子类型
+                dice.append(game_state.rng.choice(dice_types))
             
             # 标记已使用重投选项
             player.has_reroll_option_used = True
             
             # 记录到游戏日志
-            game_state.game_log.append(f"玩家 {player.player_id} 重投了骰子")
+            game_state.game_log.append(LogEventType.REROLL_DICE, player.player_id)
         else:
             # 初始化每个玩家的骰子（每个玩家8个骰子）
             for i, player in enumerate(game_state.players):
@@ -227,21 +245,20 @@ class GameEngine:
                               ElementType.CRYO]
                 
                 # 随机生成8个骰子
-                player.dice = []
+                player.dice = DicePool()
                 for _ in range(8):
-                    import random
                     # 8%概率生成万能元素骰
-                    if random.random() < 0.08:
+                    if game_state.rng.random() < 0.08:
                         player.dice.append(ElementType.OMNI)
                     else:
-                        player.dice.append(random.choice(dice_types))
+                        player.dice.append(game_state.rng.choice(dice_types))
             
             # 记录到游戏日志
-            game_state.game_log.append(f"投骰阶段 - 回合 {game_state.round_number}")
+            game_state.game_log.append(LogEventType.ROLL_PHASE, round=game_state.round_number)
             
             # 简单版本：直接进入行动阶段
             game_state.phase = GamePhase.ACTION_PHASE
-            game_state.game_log.append(f"进入行动阶段 - 回合 {game_state.round_number}")
+            game_state.game_log.append(LogEventType.ACTION_PHASE, round=game_state.round_number)
         
         return game_state
 
@@ -309,7 +326,7 @@ class GameEngine:
                         player.hand_cards.append(card)
                     else:
                         # 如果手牌已满，丢弃这张牌
-                        game_state.game_log.append(f"玩家 {player.player_id} 手牌已满，丢弃了 {card.name}")
+                        game_state.game_log.append(LogEventType.HAND_OVERFLOW, player.player_id, card=card.name)
         
         # 清空本轮行动次数
         game_state.round_actions = 0
@@ -322,7 +339,7 @@ class GameEngine:
         if game_state.round_number >= 15:
             game_state.is_game_over = True
             game_state.winner = None  # 平局
-            game_state.game_log.append(f"达到回合数上限，游戏平局")
+            game_state.game_log.append(LogEventType.ROUND_LIMIT)
             return game_state
         
         # 检查获胜条件（是否有玩家所有角色都被击倒）
@@ -330,7 +347,7 @@ class GameEngine:
         if winner is not None:
             game_state.is_game_over = True
             game_state.winner = winner
-            game_state.game_log.append(f"游戏结束，获胜者: {winner}")
+            game_state.game_log.append(LogEventType.GAME_OVER, winner=winner)
             return game_state
         
         # 切换先手玩家（在实际规则中，上回合最后行动的玩家成为下回合的先手）
@@ -344,7 +361,7 @@ class GameEngine:
         
         # 进入下一回合的投骰阶段
         game_state.phase = GamePhase.ROLL_PHASE
-        game_state.game_log.append(f"回合 {game_state.round_number} 开始")
+        game_state.game_log.append(LogEventType.ROUND_START, round=game_state.round_number)
         
         return game_state
 
@@ -394,7 +411,7 @@ class GameEngine:
                 return game_state
 
         # 记录到游戏日志
-        game_state.game_log.append(f"玩家 {player.player_id} 使用了技能 {skill.get('name', skill_id)}")
+        game_state.game_log.append(LogEventType.USE_SKILL, player.player_id, skill=skill.get('name', skill_id))
         
         # 增加行动次数
         game_state.round_actions += 1
@@ -408,7 +425,7 @@ class GameEngine:
         is_heavy_attack = False
         if len(player.dice) % 2 == 0 and skill_type == 'NORMAL_ATTACK':
             is_heavy_attack = True
-            game_state.game_log.append(f"触发重击效果！")
+            game_state.game_log.append(LogEventType.CHARGED_ATTACK, player.player_id)
 
         # 处理技能效果（简化处理，实际需要实现完整的伤害计算）
         damage = skill.get('damage', 0)
@@ -435,9 +452,10 @@ class GameEngine:
                 # 检查是否击倒角色
                 if target_character.health <= 0:
                     self._knock_out_character(game_state, target_player_index)
-                    game_state.game_log.append(f"角色 {target_character.name} 被击倒！")
+                    game_state.game_log.append(LogEventType.CHARACTER_DEFEATED, target_player.player_id, character=target_character.name)
                 
-                game_state.game_log.append(f"对角色 {target_character.name} 造成了 {actual_damage} 点{damage_type.value}伤害")
+                game_state.game_log.append(LogEventType.DAMAGE, player.player_id, character=target_character.name,
+                                           amount=actual_damage, damage_type=damage_type.value)
         
         return game_state
 
@@ -464,8 +482,6 @@ class GameEngine:
 
         # 检查是否为秘传卡，每场对局只能使用一张
         if '秘传' in card_to_play.name or 'Legacy' in card_to_play.name:
-            if not hasattr(player, 'used_legacy_card'):
-                player.used_legacy_card = False
             if player.used_legacy_card:
                 self.logger.error(f"Player {player.player_id} has already used a Legacy card this game")
                 return game_state
@@ -491,19 +507,19 @@ class GameEngine:
             active_character = self._get_active_character(player)
             if active_character:
                 active_character.weapon = card_to_play
-                game_state.game_log.append(f"角色 {active_character.name} 装备了 {card_to_play.name}")
+                game_state.game_log.append(LogEventType.EQUIP, player.player_id, character=active_character.name, card=card_to_play.name)
         elif card_to_play.card_type == 'ARTIFACT':
             # 装备圣遗物
             active_character = self._get_active_character(player)
             if active_character:
                 active_character.artifact = card_to_play
-                game_state.game_log.append(f"角色 {active_character.name} 装备了 {card_to_play.name}")
+                game_state.game_log.append(LogEventType.EQUIP, player.player_id, character=active_character.name, card=card_to_play.name)
         elif card_to_play.card_type == 'TALENT':
             # 装备天赋
             active_character = self._get_active_character(player)
             if active_character and self._character_match(active_character, card_to_play):
                 active_character.talent = card_to_play
-                game_state.game_log.append(f"角色 {active_character.name} 装备了天赋 {card_to_play.name}")
+                game_state.game_log.append(LogEventType.EQUIP_TALENT, player.player_id, character=active_character.name, card=card_to_play.name)
         elif card_to_play.card_type == 'SUPPORT':
             # 放置支援牌
             if len(player.supports) < player.max_support_size:
@@ -513,24 +529,21 @@ class GameEngine:
                     'card_type': card_to_play.card_type,
                     'effect': card_to_play.description
                 })
-                game_state.game_log.append(f"玩家 {player.player_id} 放置了支援牌 {card_to_play.name}")
+                game_state.game_log.append(LogEventType.PLACE_SUPPORT, player.player_id, card=card_to_play.name)
             else:
                 # 按规则需要先选择一张支援牌弃置
-                game_state.game_log.append(f"支援区已满，无法放置新的支援牌")
-                game_state.game_log.append(f"请选择一张支援牌进行弃置")
+                game_state.game_log.append(LogEventType.SUPPORT_ZONE_FULL, player.player_id)
                 # 将卡牌返回手牌
                 player.hand_cards.append(card_to_play)
                 return game_state
         elif card_to_play.card_type == 'EVENT':
             # 处理事件卡效果
-            game_state.game_log.append(f"玩家 {player.player_id} 打出了事件卡 {card_to_play.name}")
+            game_state.game_log.append(LogEventType.PLAY_EVENT, player.player_id, card=card_to_play.name)
             
             # 检查是否有复苏效果的料理，一回合内只能打出一张
             if '复苏' in card_to_play.description:
-                if not hasattr(player, 'used_recharge_food_this_round'):
-                    player.used_recharge_food_this_round = False
                 if player.used_recharge_food_this_round:
-                    game_state.game_log.append(f"本回合已使用过复苏效果的料理，无法再次使用")
+                    game_state.game_log.append(LogEventType.FOOD_LIMIT, player.player_id)
                     # 将卡牌返回手牌
                     player.hand_cards.append(card_to_play)
                     return game_state
@@ -543,15 +556,15 @@ class GameEngine:
                 active_character = self._get_active_character(player)
                 if active_character:
                     # 检查角色是否处于饱腹状态（如果是料理卡）
-                    if '料理' in card_to_play.description and hasattr(active_character, 'has_full_stomach') and active_character.has_full_stomach:
-                        game_state.game_log.append(f"角色 {active_character.name} 已处于饱腹状态，料理无效")
+                    if '料理' in card_to_play.description and active_character.has_full_stomach:
+                        game_state.game_log.append(LogEventType.FULL_STOMACH, player.player_id, character=active_character.name)
                     else:
                         # 通常料理或治疗卡会恢复生命值
                         heal_amount = 2  # 通常料理恢复2点生命值
                         original_health = active_character.health
                         active_character.health = min(active_character.health + heal_amount, active_character.max_health)
                         actual_heal = active_character.health - original_health
-                        game_state.game_log.append(f"角色 {active_character.name} 恢复了 {actual_heal} 点生命值")
+                        game_state.game_log.append(LogEventType.HEAL, player.player_id, character=active_character.name, amount=actual_heal)
                         
                         # 标记角色进入饱腹状态（如果是料理卡）
                         if '料理' in card_to_play.description:
@@ -563,17 +576,17 @@ class GameEngine:
                 if active_character:
                     # 通常护盾卡会提供1-2点护盾
                     shield_amount = 2  # 示例值
-                    current_max_shield = getattr(active_character, 'max_shield', 2)  # 默认最大护盾为2
+                    current_max_shield = active_character.max_shield
                     active_character.shield = min(active_character.shield + shield_amount, current_max_shield)
-                    game_state.game_log.append(f"角色 {active_character.name} 获得了 {shield_amount} 点护盾")
+                    game_state.game_log.append(LogEventType.SHIELD, player.player_id, character=active_character.name, amount=shield_amount)
             
             # 添加其他事件卡效果处理...
         else:
             # 其他类型的卡牌处理
-            game_state.game_log.append(f"玩家 {player.player_id} 打出了卡牌 {card_to_play.name}")
+            game_state.game_log.append(LogEventType.PLAY_CARD, player.player_id, card=card_to_play.name)
         
         # 记录到游戏日志
-        game_state.game_log.append(f"玩家 {player.player_id} 打出了卡牌 {card_to_play.name}")
+        game_state.game_log.append(LogEventType.PLAY_CARD, player.player_id, card=card_to_play.name)
         
         # 增加行动次数
         game_state.round_actions += 1
@@ -614,17 +627,15 @@ class GameEngine:
             # 记录到游戏日志
             old_char_name = old_character.name if old_character else "unknown"
             new_char = player.characters[new_character_index]
-            game_state.game_log.append(f"玩家 {player.player_id} 从角色 {old_char_name} 切换到角色 {new_char.name}")
+            game_state.game_log.append(LogEventType.SWITCH_CHARACTER, player.player_id,
+                                       from_character=old_char_name, to_character=new_char.name)
             
             # 增加行动次数
             game_state.round_actions += 1
             
             # 标记下落攻击可用（切换角色后下一次近战攻击变为下落攻击）
             # 这里我们用一个标志来表示
-            if not hasattr(player, 'plunge_attack_available'):
-                player.plunge_attack_available = True
-            else:
-                player.plunge_attack_available = True
+            player.plunge_attack_available = True
         else:
             self.logger.warning(f"Invalid character index {new_character_index}")
         
@@ -659,10 +670,21 @@ class GameEngine:
             self.logger.error(f"Player {player.player_id} has no dice to convert")
             return game_state
         
-        # 找到第一个骰子并转换为当前角色的元素类型
-        dice_to_convert_idx = 0  # 可以扩展为选择任意骰子
-        original_dice = player.dice[dice_to_convert_idx]
-        player.dice[dice_to_convert_idx] = active_character.element_type
+        if active_character.element_type not in DICE_SLOTS:
+            self.logger.error(f"Character {active_character.name} has no element to tune dice to")
+            return game_state
+        
+        # 找到第一个可转换的骰子（万能骰和已是角色元素的骰子不需要转换）并转换为当前角色的元素类型
+        dice = self._dice_pool(player)
+        original_dice = next(
+            (die for die in dice if die != ElementType.OMNI and die != active_character.element_type),
+            None
+        )
+        if original_dice is None:
+            self.logger.error(f"Player {player.player_id} has no dice to convert")
+            return game_state
+        dice.remove(original_dice)
+        dice.append(active_character.element_type)
         
         # 丢弃手牌
         discarded_card = player.hand_cards.pop(card_index_to_discard)
@@ -671,7 +693,8 @@ class GameEngine:
         player.has_used_elemental_tuning = True
         
         # 记录到游戏日志
-        game_state.game_log.append(f"玩家 {player.player_id} 使用元素调和，丢弃了 {discarded_card.name} 并将一个骰子转换为 {active_character.element_type.value}")
+        game_state.game_log.append(LogEventType.ELEMENTAL_TUNING, player.player_id,
+                                   card=discarded_card.name, element=active_character.element_type.value)
         
         # 增加行动次数
         game_state.round_actions += 1
@@ -683,7 +706,7 @@ class GameEngine:
         处理结束回合操作
         """
         current_player = game_state.players[game_state.current_player_index]
-        game_state.game_log.append(f"玩家 {current_player.player_id} 结束了回合")
+        game_state.game_log.append(LogEventType.END_TURN, current_player.player_id)
         
         # 标记当前玩家已结束回合
         current_player.round_passed = True
@@ -715,132 +738,147 @@ class GameEngine:
                         return char
         return None
 
+    def _dice_pool(self, player: PlayerState) -> DicePool:
+        """
+        获取玩家的骰池，直接赋值为列表的骰子会被转换为骰池
+        """
+        if not isinstance(player.dice, DicePool):
+            player.dice = DicePool(player.dice)
+        return player.dice
+
     def _can_pay_cost(self, player: PlayerState, cost: List[Any]) -> bool:
         """
         检查玩家是否能支付费用
         """
-        # 创建一个骰子副本进行模拟支付
-        dice_counts = {}
-        for die in player.dice:
-            dice_counts[die] = dice_counts.get(die, 0) + 1
-        
-        # 万能骰子数量
-        omni_count = dice_counts.get(ElementType.OMNI, 0)
-        
         # 获取当前出战角色
         active_character = self._get_active_character(player)
         if not active_character:
             return False  # 没有有效角色，无法支付
         
-        # 对每种需要的费用进行检查
-        for required_element in cost:
-            if required_element == ElementType.OMNI:
-                # 万能元素费用：必须用万能骰子支付
-                if dice_counts.get(ElementType.OMNI, 0) > 0:
-                    dice_counts[ElementType.OMNI] -= 1
-                else:
-                    return False
-            elif required_element == ElementType.SAME:
-                # SAME类型：需要相同元素类型的骰子
-                matched = False
-                for die_type, count in dice_counts.items():
-                    if count > 0 and die_type == active_character.element_type:
-                        dice_counts[die_type] -= 1
-                        matched = True
-                        break
-                if not matched and omni_count > 0:
-                    # 如果没有对应元素的骰子，可以用万能骰子
-                    dice_counts[ElementType.OMNI] -= 1
-                    omni_count -= 1
-                elif not matched:
-                    return False
-            elif required_element == ElementType.CRYSTAL:
-                # 晶体元素：可以是任意元素或万能骰子
-                matched = False
-                for die_type, count in dice_counts.items():
-                    if count > 0 and die_type != ElementType.PHYSICAL and die_type != ElementType.OMNI:
-                        dice_counts[die_type] -= 1
-                        matched = True
-                        break
-                if not matched and omni_count > 0:
-                    # 如果没有晶体元素骰子，可以用万能骰子
-                    dice_counts[ElementType.OMNI] -= 1
-                    omni_count -= 1
-                elif not matched:
-                    return False
-            else:
-                # 需要特定元素骰子
-                if dice_counts.get(required_element, 0) > 0:
-                    dice_counts[required_element] -= 1
-                elif omni_count > 0:
-                    # 使用万能骰子代替
-                    dice_counts[ElementType.OMNI] -= 1
-                    omni_count -= 1
-                else:
-                    return False
-        
-        return True
+        return self._dice_pool(player).can_pay(cost, active_character.element_type)
 
     def _pay_cost(self, player: PlayerState, cost: List[Any]) -> bool:
         """
-        支付费用
+        支付费用，无法支付时骰子不变
         """
-        # 检查是否能支付
-        if not self._can_pay_cost(player, cost):
-            return False
-        
         # 获取当前出战角色
         active_character = self._get_active_character(player)
         if not active_character:
             return False  # 没有有效角色，无法支付
         
-        # 实际支付
-        for required_element in cost:
-            if required_element == ElementType.OMNI:
-                # 万能元素费用：必须用万能骰子支付
-                if ElementType.OMNI in player.dice:
-                    player.dice.remove(ElementType.OMNI)
-                else:
-                    return False  # 无法支付
-            elif required_element == ElementType.SAME:
-                # SAME类型：需要相同元素类型的骰子
-                paid = False
-                for i, die in enumerate(player.dice):
-                    if die == active_character.element_type:
-                        player.dice.pop(i)
-                        paid = True
-                        break
-                if not paid:
-                    # 用万能骰子支付
-                    if ElementType.OMNI in player.dice:
-                        player.dice.remove(ElementType.OMNI)
-                    else:
-                        return False  # 无法支付
-            elif required_element == ElementType.CRYSTAL:
-                # 晶体元素：可以是任意元素或万能骰子
-                paid = False
-                for i, die in enumerate(player.dice):
-                    if die != ElementType.PHYSICAL and die != ElementType.OMNI:
-                        player.dice.pop(i)
-                        paid = True
-                        break
-                if not paid:
-                    # 用万能骰子支付
-                    if ElementType.OMNI in player.dice:
-                        player.dice.remove(ElementType.OMNI)
-                    else:
-                        return False  # 无法支付
-            else:
-                # 需要特定元素骰子
-                if required_element in player.dice:
-                    player.dice.remove(required_element)
-                elif ElementType.OMNI in player.dice:
-                    # 用万能骰子代替
-                    player.dice.remove(ElementType.OMNI)
-                else:
-                    return False  # 无法支付
-        
-        return True
+        return self._dice_pool(player).pay(cost, active_character.element_type) is not None
+
+    def get_payment_options(self, game_id: str, player_id: str, cost: List[Any]) -> List[List[ElementType]]:
+        """
+        列出玩家支付费用的所有骰子组合（用于AI和界面自动选择骰子），默认支付方式排在第一位
+        """
+        game_state = self.game_states.get(game_id)
+        if game_state is None:
+            return []
+        for player in game_state.players:
+            if player.player_id == player_id:
+                active_character = self._get_active_character(player)
+                if not active_character:
+                    return []
+                return self._dice_pool(player).payment_options(cost, active_character.element_type)
+        return []
+
+    def _skill_cost_table(self, character: CharacterCard) -> List[Tuple[Dict[str, Any], CostRequirement]]:
+        """
+        获取角色的技能费用表（技能和汇总后的费用需求）
+        技能列表在角色副本之间共享，按技能列表对象缓存，同一角色只计算一次
+        """
+        cached = self._skill_cost_tables.get(id(character.skills))
+        if cached is not None and cached[0] is character.skills and cached[1] == character.element_type:
+            return cached[2]
+        table = [(skill, compile_cost(skill.get('cost', []), character.element_type)) for skill in character.skills]
+        if len(self._skill_cost_tables) >= SKILL_COST_CACHE_SIZE:
+            # 缓存会持有技能列表，超出上限时丢弃最早的条目，已结束对局的角色数据可以被回收
+            del self._skill_cost_tables[next(iter(self._skill_cost_tables))]
+        self._skill_cost_tables[id(character.skills)] = (character.skills, character.element_type, table)
+        return table
+
+    def legal_actions(self, game_id: str, player_id: str) -> List[Dict[str, Any]]:
+        """
+        列出玩家当前可以执行的所有操作
+
+        Returns:
+            操作列表，每项包含 action（PlayerAction）、payload（可直接传给 process_action）
+            和 dice（默认支付方式使用的骰子）；不是该玩家行动时返回空列表
+        """
+        game_state = self.game_states.get(game_id)
+        if game_state is None or game_state.is_game_over:
+            return []
+        player = game_state.players[game_state.current_player_index]
+        if player.player_id != player_id:
+            return []
+
+        pass_action = {'action': PlayerAction.PASS, 'payload': {}, 'dice': []}
+        if game_state.can_replace_initial_cards:
+            # 可以替换任意手牌，这里只列出不替换的操作
+            return [{'action': PlayerAction.REPLACE_CARDS, 'payload': {'card_ids': []}, 'dice': []}]
+        if game_state.phase != GamePhase.ACTION_PHASE or player.round_passed:
+            # 投骰阶段和结束阶段的任何操作都会推进到下一阶段
+            return [pass_action]
+
+        actions = [pass_action]
+        active_character = self._get_active_character(player)
+        if not active_character:
+            return actions
+
+        dice = self._dice_pool(player)
+        counts = dice.counts
+
+        # 技能（冻结、眩晕时不能使用）
+        if not any(status.get('name') in ['Frozen', 'Stun'] for status in active_character.character_statuses):
+            for skill, requirement in self._skill_cost_table(active_character):
+                spent = solve_requirement(counts, requirement)
+                if spent is not None:
+                    actions.append({
+                        'action': PlayerAction.USE_SKILL,
+                        'payload': {'skill_id': skill.get('id')},
+                        'dice': dice_from_counts(spent)
+                    })
+
+        # 手牌（同名卡牌只列出一次）
+        seen_cards = set()
+        used_legacy_card = player.used_legacy_card
+        for card in player.hand_cards:
+            if card.id in seen_cards:
+                continue
+            seen_cards.add(card.id)
+            if used_legacy_card and ('秘传' in card.name or 'Legacy' in card.name):
+                continue
+            spent = solve_requirement(counts, compile_cost(card.cost, active_character.element_type))
+            if spent is not None:
+                actions.append({
+                    'action': PlayerAction.PLAY_CARD,
+                    'payload': {'card_id': card.id},
+                    'dice': dice_from_counts(spent)
+                })
+
+        # 切换角色
+        if player.can_change_active_character:
+            spent = solve_requirement(counts, compile_cost([ElementType.CRYSTAL], active_character.element_type))
+            if spent is not None:
+                for i, character in enumerate(player.characters):
+                    if i != player.active_character_index and character.is_alive:
+                        actions.append({
+                            'action': PlayerAction.SWITCH_CHARACTER,
+                            'payload': {'character_index': i},
+                            'dice': dice_from_counts(spent)
+                        })
+
+        # 元素调和（每种手牌列出一次）
+        if (not player.has_used_elemental_tuning and active_character.element_type in DICE_SLOTS
+                and any(die != ElementType.OMNI and die != active_character.element_type for die in dice)):
+            seen_cards = set()
+            for i, card in enumerate(player.hand_cards):
+                if card.id not in seen_cards:
+                    seen_cards.add(card.id)
+                    actions.append({'action': PlayerAction.ELEMENTAL_TUNING, 'payload': {'card_index': i}, 'dice': []})
+
+        return actions
 
     def _apply_damage(self, character: CharacterCard, damage: int, damage_type: DamageType, source_element: Optional[ElementType] = None, is_physical_hit: bool = False) -> int:
         """
@@ -853,7 +891,7 @@ class GameEngine:
             return abs(damage)
         else:
             # 检查角色是否有护盾
-            shield_absorption = min(damage, getattr(character, 'shield', 0))
+            shield_absorption = min(damage, character.shield)
             remaining_damage = damage - shield_absorption
             
             # 如果有护盾，先扣除护盾
@@ -908,7 +946,7 @@ class GameEngine:
             
             # 检查是否触发免于被击倒机制
             if character.health <= 0:
-                if hasattr(character, 'survive_at_hp') and character.survive_at_hp:
+                if character.survive_at_hp:
                     # 角色免于被击倒，恢复到1生命值
                     character.health = 1
                     character.survive_at_hp = False
@@ -941,7 +979,7 @@ class GameEngine:
                             # 检查是否击倒角色
                             if character.health <= 0:
                                 self._knock_out_character(game_state, game_state.players.index(player))
-                                game_state.game_log.append(f"角色 {character.name} 因状态效果被击倒！")
+                                game_state.game_log.append(LogEventType.STATUS_DEFEATED, player.player_id, character=character.name)
                         
                         # 更新状态的持续时间
                         status['duration'] -= 1
@@ -964,12 +1002,12 @@ class GameEngine:
         
         if active_character:
             # 检查是否有"免于被击倒"机制（例如某些角色的天赋或效果）
-            if hasattr(active_character, 'survive_at_hp') and active_character.survive_at_hp and active_character.health <= 0:
+            if active_character.survive_at_hp and active_character.health <= 0:
                 # 角色免于被击倒，恢复到特定生命值
                 active_character.health = 1  # 或者其他指定的生命值
                 # 移除免于被击倒标记
                 active_character.survive_at_hp = False
-                game_state.game_log.append(f"角色 {active_character.name} 免于被击倒！")
+                game_state.game_log.append(LogEventType.DEFEAT_PREVENTED, player.player_id, character=active_character.name)
                 return  # 不执行击倒逻辑
             
             # 标记角色死亡
@@ -1043,6 +1081,53 @@ class GameEngine:
         """
         return self.game_states.get(game_id)
 
+    def snapshot(self, game_id: str) -> Optional[GameState]:
+        """
+        获取游戏状态的快照，之后对游戏的操作不会影响快照
+        """
+        game_state = self.game_states.get(game_id)
+        if game_state is None:
+            self.logger.error(f"Cannot snapshot game {game_id}: game does not exist")
+            return None
+        return clone_game_state(game_state)
+
+    def restore(self, game_id: str, snapshot: GameState) -> GameState:
+        """
+        将游戏恢复到快照时的状态（可用于撤销），快照本身可以重复使用
+        """
+        game_state = clone_game_state(snapshot)
+        self.game_states[game_id] = game_state
+        return game_state
+
+    def fork(self, game_id: str) -> Optional[str]:
+        """
+        从当前游戏状态分出一个新的游戏，返回新游戏ID
+        """
+        snapshot = self.snapshot(game_id)
+        if snapshot is None:
+            return None
+
+        import uuid
+        fork_id = str(uuid.uuid4())
+        self.game_states[fork_id] = snapshot
+        return fork_id
+
+    def get_game_record(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取可保存到 GameHistory.game_data 的对局记录，使用相同的种子和操作序列可以复现对局
+        """
+        game_state = self.game_states.get(game_id)
+        if game_state is None:
+            return None
+        return {
+            'seed': game_state.seed,
+            'players': [player.player_id for player in game_state.players],
+            'round_number': game_state.round_number,
+            'is_game_over': game_state.is_game_over,
+            'winner': game_state.winner,
+            'game_log': game_state.game_log.to_list(),
+        }
+
     def end_game(self, game_id: str, winner_id: str) -> None:
         """
         结束游戏
@@ -1051,7 +1136,7 @@ class GameEngine:
             game_state = self.game_states[game_id]
             game_state.is_game_over = True
             game_state.winner = winner_id
-            game_state.game_log.append(f"游戏结束，获胜者: {winner_id}")
+            game_state.game_log.append(LogEventType.GAME_OVER, winner=winner_id)
             
             self.logger.info(f"Game {game_id} ended. Winner: {winner_id}")
         else:
@@ -1,12 +1,77 @@
 """
 卡组构筑验证系统
+
+每张卡牌的构筑规则标记（秘传、天赋对应的角色、元素共鸣要求的元素、国家牌要求的国家）
+由卡牌名称、类型和子类型决定，按这些字段编译一次后缓存（compile_card_rule），
+验证卡组时只遍历一次卡牌，不再对每张卡重复做子串匹配。
+
+卡组编辑器使用 IncrementalDeckValidator：每次添加或移除一张卡牌只更新这张卡牌相关的规则状态。
 """
-from typing import List, Dict, Any
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, List, Dict, Any, NamedTuple, Optional, Tuple
 from models.game_models import Card, CharacterCard
 from models.enums import CardType
 import logging
 
 
+# 元素共鸣牌和国家牌名称中可能出现的元素、国家名称（按顺序匹配第一个）
+RESONANCE_ELEMENTS = ("火", "水", "雷", "草", "风", "岩", "冰", "Pyro", "Hydro", "Electro", "Dendro", "Anemo", "Geo", "Cryo")
+NATIONS = ("蒙德", "璃月", "稻妻", "须弥", "枫丹", "纳塔", "穆斯贝尔", "蒙德城", "Mondstadt", "Liyue", "Inazuma", "Sumeru", "Fontaine")
+
+
+def _first_contained(names, card_name: str) -> str:
+    for name in names:
+        if name in card_name:
+            return name
+    return ""
+
+
+class CardRule(NamedTuple):
+    """
+    行动牌的构筑规则标记
+    """
+    is_legacy: bool  # 秘传牌
+    is_talent: bool  # 天赋牌
+    talent_for: Optional[str]  # 天赋牌需要的角色名称
+    is_resonance: bool  # 元素共鸣牌
+    resonance_element: str  # 元素共鸣牌需要的角色元素（无法识别时为空）
+    is_nation: bool  # 国家牌
+    nation: str  # 国家牌需要的角色国家（无法识别时为空）
+
+
+@lru_cache(maxsize=4096)
+def compile_card_rule(name: str, card_type: Any, character_subtype: Optional[str]) -> CardRule:
+    """
+    编译行动牌的构筑规则标记，结果按卡牌名称、类型和子类型缓存
+    """
+    is_resonance = '元素共鸣' in name or 'Elemental Resonance' in name
+    is_nation = '国家' in name or 'Nation' in name
+    return CardRule(
+        is_legacy='秘传' in name or 'Legacy' in name,
+        is_talent=card_type == CardType.TALENT,
+        talent_for=character_subtype if card_type == CardType.TALENT else None,
+        is_resonance=is_resonance,
+        resonance_element=_first_contained(RESONANCE_ELEMENTS, name) if is_resonance else "",
+        is_nation=is_nation,
+        nation=_first_contained(NATIONS, name) if is_nation else "",
+    )
+
+
+def card_rule(card: Card) -> CardRule:
+    """行动牌的构筑规则标记"""
+    return compile_card_rule(card.name, card.card_type, card.character_subtype)
+
+
+def character_matches(card: CharacterCard) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    角色满足的元素共鸣元素和国家（与 validate_deck 中统计满足要求的角色时的匹配方式一致）
+    """
+    elements = tuple(e for e in RESONANCE_ELEMENTS if e in str(card.element_type) or e in card.name)
+    nations = tuple(n for n in NATIONS if n in card.name)
+    return elements, nations
+
+
 class DeckValidationSystem:
     """
     卡组构筑验证系统，确保卡组符合官方规则
@@ -25,109 +90,98 @@ class DeckValidationSystem:
         Returns:
             验证结果字典，包含是否有效和错误信息
         """
-        result = {
-            "is_valid": True,
-            "errors": [],
-            "warnings": []
-        }
+        errors = []
         
         # 验证卡牌总数
         if len(deck) != 33:  # 3个角色+30张行动牌 = 33张
-            result["errors"].append(f"卡组总数应为33张，当前为{len(deck)}张")
-            result["is_valid"] = False
+            errors.append(f"卡组总数应为33张，当前为{len(deck)}张")
         
         # 分类卡牌
-        character_cards = [card for card in deck if isinstance(card, CharacterCard)]
-        action_cards = [card for card in deck if not isinstance(card, CharacterCard)]
+        character_cards = []
+        action_cards = []
+        for card in deck:
+            if isinstance(card, CharacterCard):
+                character_cards.append(card)
+            else:
+                action_cards.append(card)
         
         # 验证角色卡数量
         if len(character_cards) != 3:
-            result["errors"].append(f"角色卡应为3张，当前为{len(character_cards)}张")
-            result["is_valid"] = False
+            errors.append(f"角色卡应为3张，当前为{len(character_cards)}张")
         
         # 验证行动卡数量
         if len(action_cards) != 30:  # 30张行动牌
-            result["errors"].append(f"行动卡应为30张，当前为{len(action_cards)}张")
-            result["is_valid"] = False
+            errors.append(f"行动卡应为30张，当前为{len(action_cards)}张")
         
-        # 验证同名卡牌数量限制（除秘传牌外，每种行动牌最多2张）
+        # 一次遍历行动牌：统计同名卡牌数量，检查天赋、元素共鸣、国家牌的角色要求
         card_counts = {}
+        legacy_names = set()
+        talent_errors = []
+        resonance_errors = []
+        nation_errors = []
+        character_names = {c.name for c in character_cards}
+        matching_counts = {}  # 按 (规则, 名称) 缓存满足要求的角色数
+        
         for card in action_cards:
-            card_name = card.name
-            if card_name in card_counts:
-                card_counts[card_name] += 1
-            else:
-                card_counts[card_name] = 1
+            card_counts[card.name] = card_counts.get(card.name, 0) + 1
+            rule = card_rule(card)
+            if rule.is_legacy:
+                legacy_names.add(card.name)
+            
+            # 验证天赋牌规则：卡组中包含对应角色牌
+            if rule.is_talent:
+                if rule.talent_for not in character_names:
+                    talent_errors.append(f"天赋牌「{card.name}」缺少对应的「{card.character_subtype}」角色")
+            
+            # 验证元素共鸣牌规则：牌组包含至少两个对应元素角色
+            if rule.is_resonance and rule.resonance_element:
+                key = ('element', rule.resonance_element)
+                if key not in matching_counts:
+                    matching_counts[key] = sum(
+                        1 for c in character_cards
+                        if rule.resonance_element in str(c.element_type) or rule.resonance_element in c.name
+                    )
+                if matching_counts[key] < 2:
+                    resonance_errors.append(f"元素共鸣牌「{card.name}」需要至少2个{rule.resonance_element}角色，当前只有{matching_counts[key]}个")
+            
+            # 验证国家牌规则：牌组包含至少两个对应国家角色
+            if rule.is_nation and rule.nation:
+                key = ('nation', rule.nation)
+                if key not in matching_counts:
+                    matching_counts[key] = sum(1 for c in character_cards if rule.nation in c.name)
+                if matching_counts[key] < 2:
+                    nation_errors.append(f"国家牌「{card.name}」需要至少2个{rule.nation}角色，当前只有{matching_counts[key]}个")
         
+        # 验证同名卡牌数量限制（除秘传牌外，每种行动牌最多2张）
         for name, count in card_counts.items():
             if count > 2:
                 # 检查是否为秘传牌（通常每种只允许1张）
-                if '秘传' in name or 'Legacy' in name:
-                    if count > 1:
-                        result["errors"].append(f"秘传牌「{name}」超过1张限制，当前为{count}张")
-                        result["is_valid"] = False
+                if name in legacy_names:
+                    errors.append(f"秘传牌「{name}」超过1张限制，当前为{count}张")
                 else:
-                    result["errors"].append(f"卡牌「{name}」超过2张限制，当前为{count}张")
-                    result["is_valid"] = False
+                    errors.append(f"卡牌「{name}」超过2张限制，当前为{count}张")
         
-        # 验证天赋牌规则：卡组中包含对应角色牌
-        for card in action_cards:
-            if card.card_type == CardType.TALENT:
-                # 检查是否有对应的字符卡
-                has_matching_character = any(
-                    c.name == card.character_subtype for c in character_cards
-                )
-                if not has_matching_character:
-                    result["errors"].append(f"天赋牌「{card.name}」缺少对应的「{card.character_subtype}」角色")
-                    result["is_valid"] = False
-        
-        # 验证元素共鸣牌规则：牌组包含至少两个对应元素角色
-        element_cards = [card for card in action_cards if '元素共鸣' in card.name or 'Elemental Resonance' in card.name]
-        for card in element_cards:
-            element_name = self._extract_element_from_card(card.name)
-            if element_name:
-                matching_characters = [
-                    c for c in character_cards 
-                    if element_name in str(c.element_type) or element_name in c.name
-                ]
-                if len(matching_characters) < 2:
-                    result["errors"].append(f"元素共鸣牌「{card.name}」需要至少2个{element_name}角色，当前只有{len(matching_characters)}个")
-                    result["is_valid"] = False
+        errors.extend(talent_errors)
+        errors.extend(resonance_errors)
+        errors.extend(nation_errors)
         
-        # 验证国家牌规则：牌组包含至少两个对应国家角色
-        nation_cards = [card for card in action_cards if '国家' in card.name or 'Nation' in card.name]
-        for card in nation_cards:
-            nation_name = self._extract_nation_from_card(card.name)
-            if nation_name:
-                matching_characters = [
-                    c for c in character_cards 
-                    if nation_name in c.name
-                ]
-                if len(matching_characters) < 2:
-                    result["errors"].append(f"国家牌「{card.name}」需要至少2个{nation_name}角色，当前只有{len(matching_characters)}个")
-                    result["is_valid"] = False
-        
-        return result
+        return {
+            "is_valid": not errors,
+            "errors": errors,
+            "warnings": []
+        }
     
     def _extract_element_from_card(self, card_name: str) -> str:
         """
         从卡牌名称中提取元素名称
         """
-        elements = ["火", "水", "雷", "草", "风", "岩", "冰", "Pyro", "Hydro", "Electro", "Dendro", "Anemo", "Geo", "Cryo"]
-        for element in elements:
-            if element in card_name:
-                return element
-        return ""
+        return _first_contained(RESONANCE_ELEMENTS, card_name)
     
     def _extract_nation_from_card(self, card_name: str) -> str:
         """
         从卡牌名称中提取国家名称
         """
-        nations = ["蒙德", "璃月", "稻妻", "须弥", "枫丹", "纳塔", "穆斯贝尔", "蒙德城", "Mondstadt", "Liyue", "Inazuma", "Sumeru", "Fontaine"]
-        for nation in nations:
-            if nation in card_name:
-                return nation
-        return ""
+        return _first_contained(NATIONS, card_name)
     
     def get_deck_stats(self, deck: List[Card]) -> Dict[str, Any]:
         """
@@ -167,4 +221,133 @@ class DeckValidationSystem:
             "action_type_distribution": action_type_counts,
             "element_distribution": element_counts,
             "characters": [char.name for char in character_cards]
-        }
\ No newline at end of file
+        }
+
+# 共享的卡组验证系统实例（验证系统没有状态，不需要每次请求创建）
+deck_validation_system = DeckValidationSystem()
+
+
+class IncrementalDeckValidator:
+    """
+    增量卡组验证器
+
+    保存卡组的规则状态（各类卡牌数量、同名行动牌数量、每个元素和国家的角色数），
+    添加或移除一张卡牌时只更新与这张卡牌相关的计数，工作量与卡组大小无关。
+    result() 返回的错误与 DeckValidationSystem.validate_deck 相同，只是同名卡牌的错误排在一起。
+
+    只保存卡牌名称和规则标记，不引用卡牌对象，可以序列化后保存在会话存储中。
+    """
+
+    def __init__(self, deck: Iterable[Card] = ()):
+        self.total = 0
+        self.character_count = 0
+        self.action_count = 0
+        self.characters: Counter = Counter()  # 角色名称 -> 数量
+        self.element_matches: Counter = Counter()  # 元素 -> 满足元素共鸣要求的角色数
+        self.nation_matches: Counter = Counter()  # 国家 -> 满足国家牌要求的角色数
+        self.action_counts: Counter = Counter()  # 行动牌名称 -> 数量
+        self.rules: Dict[str, CardRule] = {}  # 行动牌名称 -> 规则标记
+        self.over_limit: Dict[str, None] = {}  # 超过数量限制的行动牌名称（按超出的先后顺序）
+        self.constrained: Dict[str, None] = {}  # 有角色要求的行动牌名称（天赋、元素共鸣、国家牌）
+        for card in deck:
+            self.add(card)
+
+    def add(self, card: Card) -> None:
+        """向卡组中添加一张卡牌"""
+        self.total += 1
+        if isinstance(card, CharacterCard):
+            self.character_count += 1
+            self.characters[card.name] += 1
+            elements, nations = character_matches(card)
+            self.element_matches.update(elements)
+            self.nation_matches.update(nations)
+            return
+
+        self.action_count += 1
+        count = self.action_counts[card.name] + 1
+        self.action_counts[card.name] = count
+        if count == 1:
+            rule = card_rule(card)
+            self.rules[card.name] = rule
+            if rule.is_talent or (rule.is_resonance and rule.resonance_element) or (rule.is_nation and rule.nation):
+                self.constrained[card.name] = None
+        elif count == 3:
+            self.over_limit[card.name] = None
+
+    def remove(self, card: Card) -> None:
+        """
+        从卡组中移除一张卡牌，卡组中没有这张卡牌时抛出 ValueError
+        """
+        if isinstance(card, CharacterCard):
+            if not self.characters.get(card.name):
+                raise ValueError(f"卡组中没有角色「{card.name}」")
+            self.total -= 1
+            self.character_count -= 1
+            self.characters[card.name] -= 1
+            if not self.characters[card.name]:
+                del self.characters[card.name]
+            elements, nations = character_matches(card)
+            self.element_matches.subtract(elements)
+            self.nation_matches.subtract(nations)
+            return
+
+        count = self.action_counts.get(card.name, 0)
+        if not count:
+            raise ValueError(f"卡组中没有卡牌「{card.name}」")
+        self.total -= 1
+        self.action_count -= 1
+        if count == 1:
+            del self.action_counts[card.name]
+            del self.rules[card.name]
+            self.constrained.pop(card.name, None)
+        else:
+            self.action_counts[card.name] = count - 1
+            if count == 3:
+                del self.over_limit[card.name]
+
+    def result(self) -> Dict[str, Any]:
+        """
+        当前卡组的验证结果，格式与 DeckValidationSystem.validate_deck 相同
+        """
+        errors = []
+        if self.total != 33:
+            errors.append(f"卡组总数应为33张，当前为{self.total}张")
+        if self.character_count != 3:
+            errors.append(f"角色卡应为3张，当前为{self.character_count}张")
+        if self.action_count != 30:
+            errors.append(f"行动卡应为30张，当前为{self.action_count}张")
+
+        for name in self.over_limit:
+            count = self.action_counts[name]
+            if self.rules[name].is_legacy:
+                errors.append(f"秘传牌「{name}」超过1张限制，当前为{count}张")
+            else:
+                errors.append(f"卡牌「{name}」超过2张限制，当前为{count}张")
+
+        talent_errors = []
+        resonance_errors = []
+        nation_errors = []
+        for name in self.constrained:
+            rule = self.rules[name]
+            count = self.action_counts[name]
+            if rule.is_talent and rule.talent_for not in self.characters:
+                talent_errors.extend([f"天赋牌「{name}」缺少对应的「{rule.talent_for}」角色"] * count)
+            if rule.is_resonance and rule.resonance_element:
+                matched = self.element_matches[rule.resonance_element]
+                if matched < 2:
+                    resonance_errors.extend(
+                        [f"元素共鸣牌「{name}」需要至少2个{rule.resonance_element}角色，当前只有{matched}个"] * count)
+            if rule.is_nation and rule.nation:
+                matched = self.nation_matches[rule.nation]
+                if matched < 2:
+                    nation_errors.extend([f"国家牌「{name}」需要至少2个{rule.nation}角色，当前只有{matched}个"] * count)
+
+        errors.extend(talent_errors)
+        errors.extend(resonance_errors)
+        errors.extend(nation_errors)
+
+        return {
+            "is_valid": not errors,
+            "errors": errors,
+            "warnings": []
+        }
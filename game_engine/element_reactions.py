@@ -1,89 +1,128 @@
 """
 元素反应系统实现
+
+反应按 REACTION_TABLE[附着元素序号][攻击元素序号] 查表（序号见 ElementType.ordinal），
+每种反应对应一条预先生成的不可变反应记录，结算时不再拼接键、逐项读取效果。
 """
-from typing import Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
 from models.game_models import CharacterCard
 from models.enums import ElementType, DamageType
 
 
+class ReactionEffect(NamedTuple):
+    """
+    元素反应效果（不可变，所有调用方共享）
+    """
+    damage_multiplier: float
+    is_amplifying: bool  # 增幅反应
+    additional_effect: Optional[str] = None
+    spread_damage: Optional[int] = None
+    status_name: Optional[str] = None
+    damage_per_turn: Optional[int] = None
+    duration: Optional[int] = None
+    enhance_future_damage: int = 0
+
+
+def _symmetric(pairs: Dict[Tuple[ElementType, ElementType], str]) -> Dict[Tuple[ElementType, ElementType], str]:
+    table = dict(pairs)
+    table.update({(incoming, existing): reaction for (existing, incoming), reaction in pairs.items()})
+    return table
+
+
+# 元素反应映射（双向），模块级只读表
+REACTIONS: Mapping[Tuple[ElementType, ElementType], str] = MappingProxyType(_symmetric({
+    (ElementType.PYRO, ElementType.HYDRO): "Vaporize",            # 蒸发
+    (ElementType.PYRO, ElementType.CRYO): "Melt",                 # 融化
+    (ElementType.ELECTRO, ElementType.HYDRO): "Electro-Charged",  # 感电
+    (ElementType.ELECTRO, ElementType.CRYO): "Superconduct",      # 超导
+    (ElementType.PYRO, ElementType.ELECTRO): "Overloaded",        # 超载
+    (ElementType.PYRO, ElementType.DENDRO): "Burning",            # 燃烧
+    (ElementType.HYDRO, ElementType.DENDRO): "Bloom",             # 绽放
+    (ElementType.ELECTRO, ElementType.DENDRO): "Catalyze",        # 催化
+}))
+
+# 反应效果，模块级只读表
+REACTION_EFFECTS: Mapping[str, ReactionEffect] = MappingProxyType({
+    "Vaporize": ReactionEffect(damage_multiplier=2.0, is_amplifying=True),  # 伤害翻倍
+    "Melt": ReactionEffect(damage_multiplier=2.0, is_amplifying=True),      # 伤害翻倍
+    "Electro-Charged": ReactionEffect(damage_multiplier=1.0, is_amplifying=False,  # 物化反应
+                                      additional_effect="spread_damage_to_other_enemies", spread_damage=1),
+    "Superconduct": ReactionEffect(damage_multiplier=1.0, is_amplifying=False,     # 物化反应
+                                   additional_effect="spread_damage_to_other_enemies", spread_damage=1),
+    "Overloaded": ReactionEffect(damage_multiplier=2.0, is_amplifying=False,       # 物化反应
+                                 additional_effect="force_character_switch"),
+    "Burning": ReactionEffect(damage_multiplier=1.0, is_amplifying=False, additional_effect="create_status",
+                              status_name="Burn", damage_per_turn=1, duration=2),
+    "Bloom": ReactionEffect(damage_multiplier=1.0, is_amplifying=False, additional_effect="create_status",
+                            status_name="Bloom", enhance_future_damage=2),
+    "Catalyze": ReactionEffect(damage_multiplier=1.0, is_amplifying=False, additional_effect="create_status",
+                               status_name="Catalyze", enhance_future_damage=1),
+})
+
+# 未知反应类型按无额外效果处理
+NO_REACTION_EFFECT = ReactionEffect(damage_multiplier=1.0, is_amplifying=False)
+
+
+class Reaction(NamedTuple):
+    """
+    元素反应记录：反应名称、效果和 calculate_reaction_damage 返回的效果字典模板
+    """
+    name: str
+    effect: ReactionEffect
+    info: Mapping[str, Any]
+
+
+def _reaction_record(name: str, effect: ReactionEffect) -> Reaction:
+    return Reaction(name, effect, MappingProxyType({
+        "reaction_type": name,
+        "is_amplifying": effect.is_amplifying,
+        "additional_effect": effect.additional_effect,
+        "multiplier": effect.damage_multiplier,
+        "spread_damage": effect.spread_damage,
+        "status_name": effect.status_name,
+        "duration": effect.duration,
+        "enhance_value": effect.enhance_future_damage
+    }))
+
+
+# 反应名称 -> 反应记录
+REACTION_RECORDS: Mapping[str, Reaction] = MappingProxyType({
+    name: _reaction_record(name, effect) for name, effect in REACTION_EFFECTS.items()
+})
+
+# 元素反应表：REACTION_TABLE[附着元素序号][攻击元素序号] -> 反应记录，不产生反应时为 None
+REACTION_TABLE: Tuple[Tuple[Optional[Reaction], ...], ...] = tuple(
+    tuple(
+        REACTION_RECORDS[REACTIONS[(existing, incoming)]] if (existing, incoming) in REACTIONS else None
+        for incoming in ElementType
+    )
+    for existing in ElementType
+)
+
+# 按元素序号判断能否附着（物理、万能元素以及风、岩元素无法附着）
+ATTACHABLE: Tuple[bool, ...] = tuple(
+    element not in (ElementType.PHYSICAL, ElementType.OMNI, ElementType.ANEMO, ElementType.GEO)
+    for element in ElementType
+)
+
+
+def reaction_between(existing_element: Optional[ElementType], incoming_element: Optional[ElementType]) -> Optional[Reaction]:
+    """附着元素受到攻击元素作用时产生的反应记录，不产生反应时返回 None"""
+    if existing_element is None or incoming_element is None:
+        return None
+    return REACTION_TABLE[existing_element.ordinal][incoming_element.ordinal]
+
+
 class ElementReactionSystem:
     """
     元素反应系统，处理各种元素之间的相互作用
+
+    反应映射和效果是模块级只读表，系统本身没有状态，所有对局共享 element_reaction_system 实例
     """
     
-    def __init__(self):
-        # 定义元素反应映射
-        self.reactions = {
-            (ElementType.PYRO, ElementType.HYDRO): "Vaporize",  # 蒸发
-            (ElementType.HYDRO, ElementType.PYRO): "Vaporize",  # 蒸发(reverse)
-            (ElementType.PYRO, ElementType.CRYO): "Melt",       # 融化
-            (ElementType.CRYO, ElementType.PYRO): "Melt",       # 融化(reverse)
-            (ElementType.ELECTRO, ElementType.HYDRO): "Electro-Charged",  # 感电
-            (ElementType.HYDRO, ElementType.ELECTRO): "Electro-Charged",  # 感电(reverse)
-            (ElementType.ELECTRO, ElementType.CRYO): "Superconduct",      # 超导
-            (ElementType.CRYO, ElementType.ELECTRO): "Superconduct",      # 超导(reverse)
-            (ElementType.PYRO, ElementType.ELECTRO): "Overloaded",        # 超载
-            (ElementType.ELECTRO, ElementType.PYRO): "Overloaded",        # 超载(reverse)
-            (ElementType.PYRO, ElementType.DENDRO): "Burning",            # 燃烧
-            (ElementType.DENDRO, ElementType.PYRO): "Burning",            # 燃烧(reverse)
-            (ElementType.HYDRO, ElementType.DENDRO): "Bloom",            # 绽放
-            (ElementType.DENDRO, ElementType.HYDRO): "Bloom",            # 绽放(reverse)
-            (ElementType.ELECTRO, ElementType.DENDRO): "Catalyze",       # 催化
-            (ElementType.DENDRO, ElementType.ELECTRO): "Catalyze",       # 催化(reverse)
-        }
-        
-        # 定义反应效果
-        self.reaction_effects = {
-            "Vaporize": {
-                "damage_multiplier": 2.0,  # 伤害翻倍
-                "is_amplifying": True,     # 增幅反应
-                "additional_effect": None
-            },
-            "Melt": {
-                "damage_multiplier": 2.0,  # 伤害翻倍
-                "is_amplifying": True,     # 增幅反应
-                "additional_effect": None
-            },
-            "Electro-Charged": {
-                "damage_multiplier": 1.0,
-                "is_amplifying": False,    # 物化反应
-                "additional_effect": "spread_damage_to_other_enemies",
-                "spread_damage": 1
-            },
-            "Superconduct": {
-                "damage_multiplier": 1.0,
-                "is_amplifying": False,    # 物化反应
-                "additional_effect": "spread_damage_to_other_enemies",
-                "spread_damage": 1
-            },
-            "Overloaded": {
-                "damage_multiplier": 2.0,
-                "is_amplifying": False,    # 物化反应
-                "additional_effect": "force_character_switch"
-            },
-            "Burning": {
-                "damage_multiplier": 1.0,
-                "is_amplifying": False,
-                "additional_effect": "create_status",
-                "status_name": "Burn",
-                "damage_per_turn": 1,
-                "duration": 2
-            },
-            "Bloom": {
-                "damage_multiplier": 1.0,
-                "is_amplifying": False,
-                "additional_effect": "create_status",
-                "status_name": "Bloom",
-                "enhance_future_damage": 2
-            },
-            "Catalyze": {
-                "damage_multiplier": 1.0,
-                "is_amplifying": False,
-                "additional_effect": "create_status",
-                "status_name": "Catalyze",
-                "enhance_future_damage": 1
-            }
-        }
+    reactions = REACTIONS
+    reaction_effects = REACTION_EFFECTS
     
     def check_element_reaction(self, existing_element: Optional[ElementType], incoming_element: ElementType) -> Optional[str]:
         """
@@ -96,20 +135,8 @@ class ElementReactionSystem:
         Returns:
             反应名称，如果没有反应则返回None
         """
-        if existing_element is None or incoming_element is None:
-            return None
-            
-        # 检查是否产生元素反应
-        reaction = self.reactions.get((existing_element, incoming_element))
-        if reaction:
-            return reaction
-        
-        # 检查反向反应（有些反应是双向的）
-        reverse_reaction = self.reactions.get((incoming_element, existing_element))
-        if reverse_reaction:
-            return reverse_reaction
-            
-        return None
+        reaction = reaction_between(existing_element, incoming_element)
+        return None if reaction is None else reaction.name
     
     def calculate_reaction_damage(self, base_damage: int, reaction_type: str) -> Tuple[int, Dict[str, any]]:
         """
@@ -122,23 +149,13 @@ class ElementReactionSystem:
         Returns:
             (最终伤害, 反应效果字典)
         """
-        reaction_info = self.reaction_effects.get(reaction_type, {})
-        multiplier = reaction_info.get("damage_multiplier", 1.0)
-        is_amplifying = reaction_info.get("is_amplifying", False)
-        
-        final_damage = int(base_damage * multiplier)
+        reaction = REACTION_RECORDS.get(reaction_type)
+        if reaction is None:
+            reaction = _reaction_record(reaction_type, NO_REACTION_EFFECT)
         
-        # 反应效果
-        effect_info = {
-            "reaction_type": reaction_type,
-            "is_amplifying": is_amplifying,
-            "additional_effect": reaction_info.get("additional_effect"),
-            "multiplier": multiplier,
-            "spread_damage": reaction_info.get("spread_damage"),
-            "status_name": reaction_info.get("status_name"),
-            "duration": reaction_info.get("duration"),
-            "enhance_value": reaction_info.get("enhance_future_damage", 0)
-        }
+        final_damage = int(base_damage * reaction.effect.damage_multiplier)
+        # 反应效果（模板的副本，调用方可以修改或保存）
+        effect_info = reaction.info.copy()
         
         return final_damage, effect_info
     
@@ -153,12 +170,8 @@ class ElementReactionSystem:
         Returns:
             True 表示成功附着元素
         """
-        # 某些元素无法附着（物理、万能元素）
-        if element_type in [ElementType.PHYSICAL, ElementType.OMNI]:
-            return False
-            
-        # 风和岩元素无法附着
-        if element_type in [ElementType.ANEMO, ElementType.GEO]:
+        # 物理、万能元素以及风、岩元素无法附着
+        if not ATTACHABLE[element_type.ordinal]:
             return False
             
         # 应用元素附着
@@ -176,24 +189,55 @@ class ElementReactionSystem:
         Returns:
             (反应类型, 附加伤害)
         """
-        existing_element = target_character.element_attached
-        reaction_type = self.check_element_reaction(existing_element, incoming_element)
+        reaction = reaction_between(target_character.element_attached, incoming_element)
         
-        if reaction_type:
+        if reaction is not None:
             # 如果发生反应，清除原元素附着
-            if existing_element:
-                target_character.element_attached = None
-            return reaction_type, 0
-        else:
-            # 如果没有反应，但是是元素伤害且目标没有附着元素，则附着元素
-            if incoming_element not in [ElementType.PHYSICAL, ElementType.OMNI]:
-                if incoming_element not in [ElementType.ANEMO, ElementType.GEO]:
-                    # 附着新元素
-                    target_character.element_attached = incoming_element
-            return None, 0
+            target_character.element_attached = None
+            return reaction.name, 0
+        
+        # 如果没有反应，且是可以附着的元素伤害，则附着新元素
+        if incoming_element is None or ATTACHABLE[incoming_element.ordinal]:
+            target_character.element_attached = incoming_element
+        return None, 0
+    
+    def resolve_batch(self, hits: Iterable[Tuple[CharacterCard, ElementType, int]]) -> List[Tuple[Optional[Reaction], int]]:
+        """
+        批量结算元素伤害（用于模拟对局）
+        
+        按顺序处理每次命中 (目标角色, 攻击元素, 基础伤害) 的元素附着和反应，
+        同一角色的多次命中依次结算，前一次命中的附着会影响后一次。
+        与逐次调用 handle_element_attachment 和 calculate_reaction_damage 的结果相同，
+        但不生成效果字典，也不扣除生命值。
+        
+        Args:
+            hits: 命中列表
+            
+        Returns:
+            每次命中的 (反应记录，不产生反应时为 None, 反应后的伤害)
+        """
+        table = REACTION_TABLE
+        attachable = ATTACHABLE
+        results = []
+        append = results.append
+        for character, element, damage in hits:
+            existing = character.element_attached
+            reaction = None if existing is None or element is None else table[existing.ordinal][element.ordinal]
+            if reaction is None:
+                if element is None or attachable[element.ordinal]:
+                    character.element_attached = element
+                append((None, damage))
+            else:
+                character.element_attached = None
+                append((reaction, int(damage * reaction.effect.damage_multiplier)))
+        return results
     
     def remove_element_attachment(self, target_character: CharacterCard) -> None:
         """
         移除角色的元素附着
         """
-        target_character.element_attached = None
\ No newline at end of file
+        target_character.element_attached = None
+
+
+# 共享的元素反应系统实例
+element_reaction_system = ElementReactionSystem()
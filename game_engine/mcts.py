@@ -0,0 +1,282 @@
+"""
+蒙特卡洛树搜索（MCTS）AI
+
+每次迭代从当前局面的副本出发（快照复制，见 snapshot.py）：
+1. 确定化：对手的手牌和双方牌库顺序对AI不可见，每次迭代随机重排，并为后续投骰使用新的随机种子
+2. 选择/扩展：按UCB1在 legal_actions 中选择操作，每次扩展一个新节点
+3. 模拟：随机策略推演若干步，对局未结束时按双方剩余生命值估值
+4. 回传：结果按每个节点行动方的视角累加
+
+每步的思考时间和迭代次数都有上限。workers 大于1时在进程池中进行根并行搜索，
+各进程独立搜索后合并根节点统计，等待时间同样受时间上限约束。
+"""
+import logging
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from game_engine.core import GameEngine
+from game_engine.snapshot import clone_game_state
+from models.enums import PlayerAction
+from models.game_models import GameState
+
+SEARCH_GAME_ID = 'mcts_search'
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MCTSConfig:
+    """
+    MCTS参数
+    """
+    iterations: int = 400  # 每步最多迭代次数
+    time_limit: float = 1.0  # 每步最长思考时间（秒）
+    exploration: float = 1.4  # UCB1探索系数
+    rollout_depth: int = 60  # 随机推演的最大操作数
+    rollout_pass_probability: float = 0.2  # 随机推演中主动结束回合的概率
+    workers: int = 0  # 根并行的进程数，0或1表示在当前进程中搜索
+
+    @classmethod
+    def from_env(cls) -> 'MCTSConfig':
+        """从环境变量读取配置"""
+        return cls(
+            iterations=int(os.environ.get('AI_MCTS_ITERATIONS', cls.iterations)),
+            time_limit=float(os.environ.get('AI_MCTS_TIME_LIMIT', cls.time_limit)),
+            workers=int(os.environ.get('AI_MCTS_WORKERS', cls.workers)),
+        )
+
+
+def action_key(action: Dict[str, Any]) -> Tuple[Any, ...]:
+    """操作的可哈希标识"""
+    return (action['action'], repr(sorted(action['payload'].items())))
+
+
+class _Node:
+    __slots__ = ('parent', 'action', 'player_index', 'children', 'visits', 'value')
+
+    def __init__(self, parent: Optional['_Node'], action: Optional[Dict[str, Any]], player_index: int):
+        self.parent = parent
+        self.action = action
+        self.player_index = player_index  # 执行 action 的玩家
+        self.children: Dict[Tuple[Any, ...], _Node] = {}
+        self.visits = 0
+        self.value = 0.0
+
+    def ucb_child(self, legal_keys: List[Tuple[Any, ...]], exploration: float) -> '_Node':
+        log_visits = math.log(self.visits or 1)
+        best, best_score = None, -1.0
+        for key in legal_keys:
+            child = self.children[key]
+            score = child.value / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+
+def determinize(game_state: GameState, player_index: int, rng: random.Random) -> None:
+    """
+    将AI看不到的信息随机化：对手的手牌与牌库混合后重新分配，双方牌库重新排序，后续投骰使用新种子
+    """
+    opponent = game_state.players[1 - player_index]
+    hidden = opponent.hand_cards + opponent.deck
+    rng.shuffle(hidden)
+    hand_size = len(opponent.hand_cards)
+    opponent.hand_cards = hidden[:hand_size]
+    opponent.deck = hidden[hand_size:]
+    rng.shuffle(game_state.players[player_index].deck)
+    game_state.rng = random.Random(rng.getrandbits(32))
+
+
+def evaluate(game_state: GameState, player_index: int) -> float:
+    """
+    从指定玩家视角评估局面，胜1分、负0分、平局0.5分，未结束时按双方剩余生命值比例估算
+    """
+    if game_state.is_game_over:
+        if game_state.winner is None:
+            return 0.5
+        return 1.0 if game_state.winner == game_state.players[player_index].player_id else 0.0
+
+    def health_ratio(player):
+        max_health = sum(character.max_health for character in player.characters) or 1
+        return sum(max(character.health, 0) for character in player.characters) / max_health
+
+    own = health_ratio(game_state.players[player_index])
+    opponent = health_ratio(game_state.players[1 - player_index])
+    return 0.5 + 0.5 * (own - opponent)
+
+
+class MCTSSearch:
+    """
+    单进程MCTS搜索，使用独立的引擎实例推演，不影响正在进行的对局
+    """
+
+    def __init__(self, config: MCTSConfig, rng: random.Random):
+        self.config = config
+        self.rng = rng
+        self.engine = GameEngine()
+
+    def _apply(self, game_state: GameState, action: Dict[str, Any]) -> None:
+        player = game_state.players[game_state.current_player_index]
+        self.engine.process_action(SEARCH_GAME_ID, player.player_id, action['action'], action['payload'])
+
+    def _legal_actions(self, game_state: GameState) -> List[Dict[str, Any]]:
+        player = game_state.players[game_state.current_player_index]
+        return self.engine.legal_actions(SEARCH_GAME_ID, player.player_id)
+
+    def _rollout(self, game_state: GameState) -> None:
+        for _ in range(self.config.rollout_depth):
+            if game_state.is_game_over:
+                return
+            actions = self._legal_actions(game_state)
+            if not actions:
+                return
+            others = [action for action in actions if action['action'] != PlayerAction.PASS]
+            if not others or (len(others) < len(actions) and self.rng.random() < self.config.rollout_pass_probability):
+                self._apply(game_state, actions[0])
+            else:
+                self._apply(game_state, self.rng.choice(others))
+
+    def search(self, root_state: GameState) -> Dict[Tuple[Any, ...], Tuple[Dict[str, Any], int, float]]:
+        """
+        从 root_state 搜索，返回根节点各操作的 (操作, 访问次数, 累计得分)
+        """
+        player_index = root_state.current_player_index
+        root = _Node(None, None, 1 - player_index)
+        deadline = time.monotonic() + self.config.time_limit
+
+        try:
+            for _ in range(self.config.iterations):
+                if time.monotonic() >= deadline:
+                    break
+                game_state = clone_game_state(root_state)
+                determinize(game_state, player_index, self.rng)
+                self.engine.game_states[SEARCH_GAME_ID] = game_state
+
+                # 选择与扩展
+                node = root
+                path = [root]
+                while not game_state.is_game_over:
+                    actions = self._legal_actions(game_state)
+                    if not actions:
+                        break
+                    keyed = [(action_key(action), action) for action in actions]
+                    untried = [(key, action) for key, action in keyed if key not in node.children]
+                    acting_index = game_state.current_player_index
+                    if untried:
+                        key, action = self.rng.choice(untried)
+                        child = _Node(node, action, acting_index)
+                        node.children[key] = child
+                        self._apply(game_state, action)
+                        path.append(child)
+                        break
+                    node = node.ucb_child([key for key, _ in keyed], self.config.exploration)
+                    self._apply(game_state, node.action)
+                    path.append(node)
+
+                # 模拟
+                self._rollout(game_state)
+
+                # 回传
+                score = evaluate(game_state, player_index)
+                for visited in path:
+                    visited.visits += 1
+                    visited.value += score if visited.player_index == player_index else 1.0 - score
+        finally:
+            self.engine.game_states.pop(SEARCH_GAME_ID, None)
+
+        return {key: (child.action, child.visits, child.value) for key, child in root.children.items()}
+
+
+def _search_worker(root_state: GameState, config: MCTSConfig, seed: int):
+    logging.getLogger('game_engine').setLevel(logging.CRITICAL)
+    return MCTSSearch(config, random.Random(seed)).search(root_state)
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """进程池在多次搜索之间复用"""
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+
+class MCTSPlayer:
+    """
+    MCTS AI玩家，接口与模拟器策略一致，可用于本地对局和批量模拟
+    """
+
+    def __init__(self, config: Optional[MCTSConfig] = None):
+        self.config = config or MCTSConfig()
+
+    def choose_action(self, engine: GameEngine, game_state: GameState, actions: List[Dict[str, Any]],
+                      rng: random.Random) -> Dict[str, Any]:
+        """
+        从 actions 中选择一个操作，只有一个可选操作时不进行搜索
+        """
+        if len(actions) == 1:
+            return actions[0]
+
+        root_state = clone_game_state(game_state)
+        if self.config.workers > 1:
+            stats = self._parallel_search(root_state, rng)
+        else:
+            stats = MCTSSearch(self.config, rng).search(root_state)
+
+        legal = {action_key(action): action for action in actions}
+        best_key = max(
+            (key for key in stats if key in legal),
+            key=lambda key: (stats[key][1], stats[key][2]),
+            default=None
+        )
+        if best_key is None:
+            return actions[0]
+        return legal[best_key]
+
+    def _parallel_search(self, root_state: GameState, rng: random.Random):
+        """
+        根并行：各进程以不同种子独立搜索，合并根节点的访问次数和得分
+        进程池繁忙时只等待到时间上限，未完成的搜索结果被丢弃
+        """
+        deadline = time.monotonic() + self.config.time_limit * 2 + 1
+        executor = _get_executor(self.config.workers)
+        futures = [
+            executor.submit(_search_worker, root_state, self.config, rng.getrandbits(32))
+            for _ in range(self.config.workers)
+        ]
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for future in not_done:
+            future.cancel()
+
+        merged: Dict[Tuple[Any, ...], Tuple[Dict[str, Any], int, float]] = {}
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"MCTS worker failed: {str(e)}")
+                continue
+            for key, (action, visits, value) in result.items():
+                if key in merged:
+                    _, merged_visits, merged_value = merged[key]
+                    merged[key] = (action, merged_visits + visits, merged_value + value)
+                else:
+                    merged[key] = (action, visits, value)
+
+        if not merged:
+            # 没有进程按时返回，在当前进程中用剩余预算搜索（不超过一次搜索的时间上限）；
+            # 预算已用完时不再搜索，由调用方选择第一个合法操作
+            remaining = max(0.0, min(self.config.time_limit, deadline - time.monotonic()))
+            fallback = MCTSConfig(**{**self.config.__dict__, 'workers': 0, 'time_limit': remaining})
+            return MCTSSearch(fallback, rng).search(root_state)
+        return merged
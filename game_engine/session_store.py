@@ -0,0 +1,641 @@
+"""
+游戏会话存储
+
+GameEngine.game_states 和本地对局会话原来是无上限的字典，未调用结束接口的对局永远不会释放。
+会话存储提供与字典相同的接口，可以直接替换这些字典，并支持：
+- 按最近访问时间淘汰（LRU）和空闲超时（TTL）淘汰
+- 按对局估算内存占用（序列化后的大小），超出预算时淘汰最久未访问的对局
+- 可选地将空闲对局序列化到磁盘，再次访问时自动加载
+- 多个工作进程共享的SQLite存储（WAL模式），每局对局有跨进程的租约锁
+"""
+import hashlib
+import logging
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# 两次过期检查之间的最短间隔（秒），避免每次访问都遍历所有会话
+SWEEP_INTERVAL = 5.0
+
+_SAFE_KEY = re.compile(r'^[A-Za-z0-9_-]{1,128}$')
+
+
+class SessionLockLost(RuntimeError):
+    """
+    锁内写回会话时发现租约已被其他进程取得（租约过期后被抢占），本次修改没有写入
+    """
+
+
+def estimate_size(value: Any) -> int:
+    """估算对象占用的内存（序列化后的字节数）"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def dump_session(value: Any) -> bytes:
+    """将会话序列化为压缩后的二进制数据"""
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def load_session(data: bytes) -> Any:
+    return pickle.loads(zlib.decompress(data))
+
+
+class SessionStore(MutableMapping):
+    """
+    会话存储基类，具有字典接口
+    """
+
+    def __init__(self):
+        self._key_locks: Dict[str, threading.RLock] = {}
+        self._key_locks_guard = threading.Lock()
+
+    @contextmanager
+    def locked(self, key: str):
+        """
+        独占访问一个会话：读取、原地修改并保存对局时应在此上下文中进行
+        内存存储中返回的是同一个对象，只需要防止多个线程同时修改
+        """
+        with self._key_locks_guard:
+            lock = self._key_locks.setdefault(key, threading.RLock())
+        with lock:
+            yield
+
+    def _forget_lock(self, key: str) -> None:
+        with self._key_locks_guard:
+            self._key_locks.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """存储状态统计"""
+        return {'sessions': len(self)}
+
+    def sweep(self) -> None:
+        """淘汰过期的会话"""
+
+
+class _Entry:
+    __slots__ = ('value', 'last_access', 'size')
+
+    def __init__(self, value: Any, last_access: float, size: int):
+        self.value = value
+        self.last_access = last_access
+        self.size = size
+
+
+class MemorySessionStore(SessionStore):
+    """
+    内存会话存储
+
+    Args:
+        ttl: 空闲多少秒后淘汰，None 表示不按时间淘汰
+        max_sessions: 内存中最多保留的会话数
+        max_bytes: 内存中会话的总大小上限（按序列化大小估算）
+        spill_dir: 指定后被淘汰的会话写入该目录而不是丢弃，再次访问时加载
+        disk_ttl: 磁盘上的会话空闲多少秒后删除，None 表示一直保留
+        on_evict: 会话被彻底丢弃时的回调 on_evict(key, value)，写入磁盘的会话不会触发
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_sessions: Optional[int] = None,
+                 max_bytes: Optional[int] = None, spill_dir: Optional[str] = None,
+                 disk_ttl: Optional[float] = None, on_evict: Optional[Callable[[str, Any], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.disk_ttl = disk_ttl
+        self.on_evict = on_evict
+        self.clock = clock
+
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._spilled: Dict[str, float] = {}  # 写入磁盘的会话及其写入时间
+        self._bytes = 0
+        self._evictions = 0
+        self._spills = 0
+        self._last_sweep = clock()
+        self._lock = threading.RLock()
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    # 字典接口
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if key not in self._spilled:
+                    raise KeyError(key)
+                entry = self._load_spilled(key)
+            entry.last_access = self.clock()
+            self._entries.move_to_end(key)
+            self._maybe_sweep()
+            return entry.value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._discard_spilled(key)
+            entry = _Entry(value, self.clock(), estimate_size(value) if self.max_bytes else 0)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._enforce_limits()
+            self._maybe_sweep()
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+            elif key in self._spilled:
+                self._discard_spilled(key)
+            else:
+                raise KeyError(key)
+            self._forget_lock(key)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._entries or key in self._spilled
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries) + list(self._spilled))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries) + len(self._spilled)
+
+    # 淘汰
+
+    def sweep(self) -> None:
+        """淘汰空闲超时的会话，并删除磁盘上过期的会话"""
+        with self._lock:
+            now = self.clock()
+            self._last_sweep = now
+            if self.ttl is not None:
+                expired = [key for key, entry in self._entries.items() if now - entry.last_access > self.ttl]
+                for key in expired:
+                    self._evict(key)
+            if self.disk_ttl is not None:
+                for key, spilled_at in list(self._spilled.items()):
+                    if now - spilled_at > self.disk_ttl:
+                        value = self._read_spilled(key)
+                        self._discard_spilled(key)
+                        self._dropped(key, value)
+
+    def _maybe_sweep(self) -> None:
+        if self.clock() - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep()
+
+    def _enforce_limits(self) -> None:
+        """超出数量或内存预算时按最久未访问的顺序淘汰"""
+        while self.max_sessions is not None and len(self._entries) > self.max_sessions:
+            self._evict(next(iter(self._entries)))
+
+        if self.max_bytes is None or self._bytes <= self.max_bytes:
+            return
+        # 对局在内存中被原地修改，淘汰前重新估算大小
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes or len(self._entries) <= 1:
+                break
+            entry = self._entries[key]
+            size = estimate_size(entry.value)
+            self._bytes += size - entry.size
+            entry.size = size
+            self._evict(key)
+
+    def _evict(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        self._evictions += 1
+        if self.spill_dir:
+            try:
+                with open(self._spill_path(key), 'wb') as f:
+                    f.write(dump_session(entry.value))
+                self._spilled[key] = self.clock()
+                self._spills += 1
+                return
+            except Exception as e:
+                logger.error(f"Failed to spill session {key}: {str(e)}")
+        self._dropped(key, entry.value)
+
+    def _dropped(self, key: str, value: Any) -> None:
+        self._forget_lock(key)
+        if self.on_evict is not None:
+            try:
+                self.on_evict(key, value)
+            except Exception as e:
+                logger.error(f"Session evict callback failed for {key}: {str(e)}")
+
+    # 磁盘
+
+    def _spill_path(self, key: str) -> str:
+        name = key if _SAFE_KEY.match(key) else hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.spill_dir, f"{name}.session")
+
+    def _read_spilled(self, key: str) -> Any:
+        try:
+            with open(self._spill_path(key), 'rb') as f:
+                return load_session(f.read())
+        except Exception as e:
+            logger.error(f"Failed to load spilled session {key}: {str(e)}")
+            return None
+
+    def _load_spilled(self, key: str) -> _Entry:
+        value = self._read_spilled(key)
+        self._discard_spilled(key)
+        if value is None:
+            raise KeyError(key)
+        entry = _Entry(value, self.clock(), estimate_size(value) if self.max_bytes else 0)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._enforce_limits()
+        return entry
+
+    def _discard_spilled(self, key: str) -> None:
+        if self._spilled.pop(key, None) is not None:
+            try:
+                os.remove(self._spill_path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'sessions': len(self._entries),
+                'spilled': len(self._spilled),
+                'bytes': self._bytes,
+                'evictions': self._evictions,
+                'spills': self._spills,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite会话存储，多个工作进程可以共享同一个数据库文件
+
+    会话以压缩后的序列化数据保存。对局会被原地修改，因此修改必须在 locked(key) 上下文中进行：
+    上下文中第一次读取时从数据库加载，之后返回同一个对象，退出时写回数据库并释放锁。
+    锁是数据库中带过期时间的租约，持有锁期间后台线程定期续期，持有锁的进程异常退出后租约到期会自动释放。
+    锁内的写入与租约检查在同一个事务中进行，租约已被其他进程取得时抛出 SessionLockLost，不会覆盖更新的状态。
+    在上下文之外读取得到的是只读副本，对它的修改不会保存。
+
+    Args:
+        path: 数据库文件路径
+        namespace: 命名空间，同一数据库中可以保存多种会话
+        ttl: 多少秒未更新后删除，None 表示不按时间删除
+        on_evict: 会话因过期或超出数量上限被删除时的回调 on_evict(key, None)
+        max_sessions: 会话数量上限，超出时删除最久未更新的会话
+    """
+
+    LOCK_LEASE = 30.0  # 租约时长（秒）
+    LOCK_RENEW_INTERVAL = 10.0  # 持有锁期间续期的间隔（秒），应明显小于租约时长
+    LOCK_TIMEOUT = 10.0  # 等待锁的最长时间（秒）
+    LOCK_POLL_INTERVAL = 0.01
+
+    def __init__(self, path: str, namespace: str = 'games', ttl: Optional[float] = None,
+                 on_evict: Optional[Callable[[str, Any], None]] = None, max_sessions: Optional[int] = None):
+        super().__init__()
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.max_sessions = max_sessions
+        self._local = threading.local()
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self._last_sweep = time.time()
+        # 当前进程持有租约的会话及持有次数，由后台线程统一续期
+        self._held: Dict[str, int] = {}
+        self._held_guard = threading.Lock()
+        self._renewer: Optional[threading.Thread] = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, data BLOB NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_sessions_namespace_updated_at ON sessions (namespace, updated_at)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS session_locks ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, owner TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # 自动提交模式，需要原子性的地方显式开启事务
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _checked_out(self) -> Dict[str, Any]:
+        """当前线程在 locked 上下文中已加载的会话"""
+        checked_out = getattr(self._local, 'checked_out', None)
+        if checked_out is None:
+            checked_out = self._local.checked_out = {}
+        return checked_out
+
+    # 字典接口
+
+    def __getitem__(self, key: str) -> Any:
+        checked_out = self._checked_out()
+        if checked_out.get(key) is not None:
+            return checked_out[key]
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        value = load_session(row[0])
+        if key in checked_out:
+            checked_out[key] = value
+        self._maybe_sweep()
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        checked_out = self._checked_out()
+        if key in checked_out:
+            checked_out[key] = value
+            self._write_owned(key, value)
+            return
+        self._write(key, value)
+
+    def _write(self, key: str, value: Any) -> None:
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO sessions (namespace, key, data, updated_at) VALUES (?, ?, ?, ?)",
+            (self.namespace, key, dump_session(value), time.time())
+        )
+        connection.commit()
+        if self.max_sessions is not None:
+            self._enforce_max_sessions()
+
+    def _enforce_max_sessions(self) -> None:
+        """删除超出数量上限的会话（最久未更新的先删除）"""
+        connection = self._connection()
+        keys = [row[0] for row in connection.execute(
+            "SELECT key FROM sessions WHERE namespace = ? ORDER BY updated_at DESC LIMIT -1 OFFSET ?",
+            (self.namespace, self.max_sessions)
+        ).fetchall()]
+        if not keys:
+            return
+        connection.executemany("DELETE FROM sessions WHERE namespace = ? AND key = ?",
+                               [(self.namespace, key) for key in keys])
+        connection.commit()
+        self._evicted(keys)
+
+    def _write_owned(self, key: str, value: Any, only_existing: bool = False) -> None:
+        """
+        锁内写入：确认租约仍属于当前进程（并顺便续期）后再写入，两步在同一事务中
+        only_existing 为 True 时会话已被删除则不再写入
+        """
+        data = dump_session(value)
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = connection.execute(
+                "UPDATE session_locks SET expires_at = ? WHERE namespace = ? AND key = ? AND owner = ?",
+                (now + self.LOCK_LEASE, self.namespace, key, self._owner)
+            )
+            if cursor.rowcount == 0:
+                raise SessionLockLost(f"Session lock {key} was taken over by another worker")
+            if only_existing:
+                connection.execute(
+                    "UPDATE sessions SET data = ?, updated_at = ? WHERE namespace = ? AND key = ?",
+                    (data, now, self.namespace, key)
+                )
+            else:
+                connection.execute(
+                    "INSERT OR REPLACE INTO sessions (namespace, key, data, updated_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, data, now)
+                )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+
+    def __delitem__(self, key: str) -> None:
+        self._checked_out().pop(key, None)
+        connection = self._connection()
+        cursor = connection.execute("DELETE FROM sessions WHERE namespace = ? AND key = ?", (self.namespace, key))
+        connection.commit()
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM sessions WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._connection().execute("SELECT key FROM sessions WHERE namespace = ?", (self.namespace,)).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+    # 锁
+
+    @contextmanager
+    def locked(self, key: str):
+        checked_out = self._checked_out()
+        if key in checked_out:
+            # 同一线程重入
+            yield
+            return
+
+        with super().locked(key):
+            self._acquire_lease(key)
+            self._hold(key)
+            checked_out[key] = None
+            try:
+                yield
+            finally:
+                value = checked_out.pop(key, None)
+                try:
+                    if value is not None:
+                        self._write_owned(key, value, only_existing=True)
+                finally:
+                    self._unhold(key)
+                    self._release_lease(key)
+
+    def _acquire_lease(self, key: str) -> None:
+        connection = self._connection()
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+        while True:
+            now = time.time()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT owner, expires_at FROM session_locks WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is None or row[1] < now or row[0] == self._owner:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO session_locks (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)",
+                        (self.namespace, key, self._owner, now + self.LOCK_LEASE)
+                    )
+                    connection.commit()
+                    return
+                connection.rollback()
+            except Exception:
+                connection.rollback()
+                raise
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for session lock {key}")
+            time.sleep(self.LOCK_POLL_INTERVAL)
+
+    def _hold(self, key: str) -> None:
+        with self._held_guard:
+            self._held[key] = self._held.get(key, 0) + 1
+            if self._renewer is None:
+                self._renewer = threading.Thread(target=self._renew_leases, name='session-lease-renewer', daemon=True)
+                self._renewer.start()
+
+    def _unhold(self, key: str) -> None:
+        with self._held_guard:
+            count = self._held.pop(key, 0) - 1
+            if count > 0:
+                self._held[key] = count
+
+    def _renew_leases(self) -> None:
+        """后台线程：定期延长当前进程持有的所有租约，长时间的操作（例如多步AI行动）不会因租约过期丢失锁"""
+        while True:
+            time.sleep(self.LOCK_RENEW_INTERVAL)
+            with self._held_guard:
+                keys = list(self._held)
+            for key in keys:
+                try:
+                    self._renew_lease(key)
+                except Exception as e:
+                    logger.error(f"Failed to renew session lock {key}: {str(e)}")
+
+    def _renew_lease(self, key: str) -> None:
+        connection = self._connection()
+        cursor = connection.execute(
+            "UPDATE session_locks SET expires_at = ? WHERE namespace = ? AND key = ? AND owner = ?",
+            (time.time() + self.LOCK_LEASE, self.namespace, key, self._owner)
+        )
+        connection.commit()
+        if cursor.rowcount == 0 and key in self._held:
+            logger.warning(f"Session lock {key} is no longer held by this worker")
+
+    def _release_lease(self, key: str) -> None:
+        connection = self._connection()
+        connection.execute(
+            "DELETE FROM session_locks WHERE namespace = ? AND key = ? AND owner = ?",
+            (self.namespace, key, self._owner)
+        )
+        connection.commit()
+
+    # 淘汰
+
+    def _maybe_sweep(self) -> None:
+        if time.time() - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep()
+
+    def sweep(self) -> None:
+        """删除超过TTL未更新的会话"""
+        self._last_sweep = time.time()
+        if self.ttl is None:
+            return
+        connection = self._connection()
+        cutoff = time.time() - self.ttl
+        keys = [row[0] for row in connection.execute(
+            "SELECT key FROM sessions WHERE namespace = ? AND updated_at < ?", (self.namespace, cutoff)
+        ).fetchall()]
+        if not keys:
+            return
+        connection.execute("DELETE FROM sessions WHERE namespace = ? AND updated_at < ?", (self.namespace, cutoff))
+        connection.commit()
+        self._evicted(keys)
+
+    def _evicted(self, keys) -> None:
+        for key in keys:
+            self._forget_lock(key)
+            if self.on_evict is not None:
+                try:
+                    self.on_evict(key, None)
+                except Exception as e:
+                    logger.error(f"Session evict callback failed for {key}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        row = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return {'sessions': row[0], 'bytes': row[1]}
+
+
+def _env_number(name: str, cast: Callable[[str], Any]) -> Any:
+    value = os.environ.get(name)
+    return cast(value) if value else None
+
+
+def session_store_from_env(prefix: str = 'GAME_SESSION', namespace: str = 'games',
+                           on_evict: Optional[Callable[[str, Any], None]] = None,
+                           default_ttl: Optional[float] = None, evictable: bool = True,
+                           default_max_sessions: Optional[int] = None) -> SessionStore:
+    """
+    根据环境变量创建会话存储
+
+    {prefix}_BACKEND 为 memory（默认）或 sqlite：
+    - memory: {prefix}_TTL、{prefix}_MAX、{prefix}_MAX_BYTES、{prefix}_SPILL_DIR、{prefix}_DISK_TTL
+    - sqlite: {prefix}_DB（数据库路径）、{prefix}_TTL、{prefix}_MAX，多个工作进程共享同一个数据库
+
+    evictable 为 False 时不按时间或数量淘汰，会话只能被显式删除
+    """
+    backend = os.environ.get(f'{prefix}_BACKEND', 'memory').lower()
+    ttl = _env_number(f'{prefix}_TTL', float)
+    if ttl is None:
+        ttl = default_ttl
+    max_sessions = _env_number(f'{prefix}_MAX', int)
+    if max_sessions is None:
+        max_sessions = default_max_sessions
+
+    if backend == 'sqlite':
+        path = os.environ.get(f'{prefix}_DB', os.path.join('instance', 'game_sessions.db'))
+        if not evictable:
+            return SQLiteSessionStore(path, namespace=namespace)
+        return SQLiteSessionStore(path, namespace=namespace, ttl=ttl, on_evict=on_evict, max_sessions=max_sessions)
+    if backend != 'memory':
+        raise ValueError(f"Unknown session backend: {backend}")
+
+    if not evictable:
+        return MemorySessionStore()
+    return MemorySessionStore(
+        ttl=ttl,
+        max_sessions=max_sessions,
+        max_bytes=_env_number(f'{prefix}_MAX_BYTES', int),
+        spill_dir=os.environ.get(f'{prefix}_SPILL_DIR') or None,
+        disk_ttl=_env_number(f'{prefix}_DISK_TTL', float),
+        on_evict=on_evict,
+    )
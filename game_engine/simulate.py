@@ -0,0 +1,351 @@
+"""
+无界面批量对局模拟器
+
+让两套卡组使用指定的策略通过 GameEngine.process_action 进行N局对战，统计胜率、平均回合数和行动次数，
+用于评估卡组强度。对局分批交给 ProcessPoolExecutor 并行执行，每局使用独立的随机种子，结果可复现。
+
+用法:
+    python -m game_engine.simulate --deck1 random:1 --deck2 random:2 --games 200
+    python -m game_engine.simulate --deck1 my_deck.json --deck2 db:1be639bb-6444-40a4-b94b-fff543c9272b --policy1 greedy --workers 4
+
+卡组参数:
+    random:<seed>   由 card_data/ 随机构建的合法卡组
+    db:<deck_id>    数据库 decks 表中的卡组
+    <path>.json     {"characters": [角色名...], "cards": [行动牌名...]}，卡牌名对应 card_data/ 中的数据
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from game_engine.card_library import CardLibrary
+from game_engine.core import GameEngine
+from game_engine.mcts import MCTSConfig, MCTSPlayer
+from game_engine.snapshot import clone_character
+from models.enums import PlayerAction
+from models.game_models import Card, CharacterCard, GameState
+
+# 单局最多处理的操作数，防止策略与引擎的组合陷入死循环
+MAX_STEPS_PER_GAME = 2000
+
+PLAYER_IDS = ('player1', 'player2')
+
+
+class RandomPolicy:
+    """
+    随机策略：以一定概率结束回合，否则在可执行操作中随机选择
+    """
+
+    def __init__(self, pass_probability: float = 0.2):
+        self.pass_probability = pass_probability
+
+    def choose_action(self, engine: GameEngine, game_state: GameState, actions: List[Dict[str, Any]],
+                      rng: random.Random) -> Dict[str, Any]:
+        others = [action for action in actions if action['action'] != PlayerAction.PASS]
+        if not others or (len(others) < len(actions) and rng.random() < self.pass_probability):
+            return actions[0]
+        return rng.choice(others)
+
+
+class GreedyPolicy:
+    """
+    贪心策略：优先使用伤害最高的技能，其次打出手牌，最后结束回合
+    """
+
+    def choose_action(self, engine: GameEngine, game_state: GameState, actions: List[Dict[str, Any]],
+                      rng: random.Random) -> Dict[str, Any]:
+        if len(actions) == 1:
+            return actions[0]
+
+        player = game_state.players[game_state.current_player_index]
+        active_character = engine._get_active_character(player)
+        skills = {skill.get('id'): skill for skill in active_character.skills} if active_character else {}
+        best_action = None
+        best_damage = 0
+        for action in actions:
+            if action['action'] == PlayerAction.USE_SKILL:
+                damage = skills[action['payload']['skill_id']].get('damage', 0)
+                if damage > best_damage:
+                    best_action, best_damage = action, damage
+        if best_action:
+            return best_action
+
+        for action in actions:
+            if action['action'] == PlayerAction.PLAY_CARD:
+                return action
+        return actions[0]
+
+
+POLICIES: Dict[str, Callable[[], Any]] = {
+    'random': RandomPolicy,
+    'greedy': GreedyPolicy,
+    # 批量模拟时降低每步的搜索预算，并且不在工作进程中再创建进程池
+    'mcts': lambda: MCTSPlayer(MCTSConfig(iterations=100, time_limit=0.2, workers=0)),
+}
+
+
+def load_policy(name: str):
+    """
+    根据名称创建策略，支持内置策略名或 module:Class 形式的自定义策略
+    """
+    if name in POLICIES:
+        return POLICIES[name]()
+    if ':' in name:
+        module_name, class_name = name.split(':', 1)
+        return getattr(importlib.import_module(module_name), class_name)()
+    raise ValueError(f"Unknown policy: {name}")
+
+
+@dataclass
+class SimulationStats:
+    """
+    模拟结果统计，deck1/deck2 分别对应两套卡组（不论坐在哪个座位）
+    """
+    games: int = 0
+    deck1_wins: int = 0
+    deck2_wins: int = 0
+    draws: int = 0
+    aborted: int = 0
+    total_rounds: int = 0
+    total_steps: int = 0
+    action_counts: Dict[str, Counter] = field(default_factory=lambda: {'deck1': Counter(), 'deck2': Counter()})
+
+    def merge(self, other: 'SimulationStats') -> None:
+        self.games += other.games
+        self.deck1_wins += other.deck1_wins
+        self.deck2_wins += other.deck2_wins
+        self.draws += other.draws
+        self.aborted += other.aborted
+        self.total_rounds += other.total_rounds
+        self.total_steps += other.total_steps
+        for deck, counts in other.action_counts.items():
+            self.action_counts[deck].update(counts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        games = self.games or 1
+        return {
+            'games': self.games,
+            'deck1_wins': self.deck1_wins,
+            'deck2_wins': self.deck2_wins,
+            'draws': self.draws,
+            'aborted': self.aborted,
+            'deck1_win_rate': self.deck1_wins / games,
+            'deck2_win_rate': self.deck2_wins / games,
+            'average_rounds': self.total_rounds / games,
+            'average_actions': self.total_steps / games,
+            'action_counts': {
+                deck: {action: count / games for action, count in sorted(counts.items())}
+                for deck, counts in self.action_counts.items()
+            },
+        }
+
+
+def fresh_deck(deck: List[Card]) -> List[Card]:
+    """
+    每局使用新的角色对象，普通卡牌在对局中不会被修改，可以共享
+    """
+    return [clone_character(card) if isinstance(card, CharacterCard) else card for card in deck]
+
+
+def play_game(engine: GameEngine, deck1: List[Card], deck2: List[Card], policy1, policy2,
+              seed: int, swap_seats: bool = False) -> Dict[str, Any]:
+    """
+    进行一局对战
+
+    Returns:
+        对局结果字典，winner 为 'deck1'、'deck2'、None（平局）或 'aborted'
+    """
+    # 策略和引擎各自使用独立的随机数生成器，互不影响
+    rng = random.Random(seed)
+
+    seats = ['deck2', 'deck1'] if swap_seats else ['deck1', 'deck2']
+    decks = {'deck1': deck1, 'deck2': deck2}
+    policies = {'deck1': policy1, 'deck2': policy2}
+
+    game_id = engine.create_game_state(PLAYER_IDS[0], PLAYER_IDS[1],
+                                       fresh_deck(decks[seats[0]]), fresh_deck(decks[seats[1]]), seed=seed)
+    if game_id is None:
+        raise ValueError("Invalid deck for simulation")
+
+    game_state = engine.get_game_state(game_id)
+    action_counts = {'deck1': Counter(), 'deck2': Counter()}
+    steps = 0
+    try:
+        while not game_state.is_game_over and steps < MAX_STEPS_PER_GAME:
+            player_index = game_state.current_player_index
+            player = game_state.players[player_index]
+            deck_name = seats[player_index]
+            actions = engine.legal_actions(game_id, player.player_id)
+            if not actions:
+                break
+            chosen = policies[deck_name].choose_action(engine, game_state, actions, rng)
+            if engine.process_action(game_id, player.player_id, chosen['action'], chosen['payload']) is None:
+                break
+            action_counts[deck_name][chosen['action'].name] += 1
+            steps += 1
+    finally:
+        engine.game_states.pop(game_id, None)
+
+    if not game_state.is_game_over:
+        winner = 'aborted'
+    elif game_state.winner is None:
+        winner = None
+    else:
+        winner = seats[PLAYER_IDS.index(game_state.winner)]
+
+    return {
+        'winner': winner,
+        'rounds': game_state.round_number,
+        'steps': steps,
+        'action_counts': action_counts,
+    }
+
+
+def run_batch(deck1: List[Card], deck2: List[Card], policy1_name: str, policy2_name: str,
+              seeds: List[int]) -> SimulationStats:
+    """
+    在当前进程中连续进行多局对战，座位每局交替以抵消先手优势
+    """
+    engine = GameEngine()
+    policy1 = load_policy(policy1_name)
+    policy2 = load_policy(policy2_name)
+    stats = SimulationStats()
+    for seed in seeds:
+        result = play_game(engine, deck1, deck2, policy1, policy2, seed, swap_seats=seed % 2 == 1)
+        stats.games += 1
+        stats.total_rounds += result['rounds']
+        stats.total_steps += result['steps']
+        for deck, counts in result['action_counts'].items():
+            stats.action_counts[deck].update(counts)
+        if result['winner'] == 'deck1':
+            stats.deck1_wins += 1
+        elif result['winner'] == 'deck2':
+            stats.deck2_wins += 1
+        elif result['winner'] == 'aborted':
+            stats.aborted += 1
+        else:
+            stats.draws += 1
+    return stats
+
+
+def _init_worker(verbose: bool) -> None:
+    configure_logging(verbose)
+
+
+def simulate(deck1: List[Card], deck2: List[Card], games: int, policy1: str = 'random',
+             policy2: str = 'random', seed: int = 0, workers: Optional[int] = None,
+             verbose: bool = False) -> SimulationStats:
+    """
+    进行N局对战并汇总统计，workers 为1时在当前进程中执行
+    """
+    seeds = [seed + i for i in range(games)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or games <= 1:
+        return run_batch(deck1, deck2, policy1, policy2, seeds)
+
+    # 每个进程分到若干批，批次不宜过小以减少卡组序列化开销
+    batch_count = min(games, workers * 4)
+    batches = [seeds[i::batch_count] for i in range(batch_count)]
+    stats = SimulationStats()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(verbose,)) as executor:
+        futures = [executor.submit(run_batch, deck1, deck2, policy1, policy2, batch) for batch in batches]
+        for future in futures:
+            stats.merge(future.result())
+    return stats
+
+
+def load_deck_from_db(deck_id: str, app=None) -> List[Card]:
+    """
+    从数据库 decks 表加载卡组（卡组ID是UUID字符串），默认使用 app.py 中的应用
+    """
+    from api.local_game import convert_db_cards_to_game_cards
+    import models.db_models as db_models
+
+    if app is None:
+        from app import app
+
+    with app.app_context():
+        deck = db_models.db.session.get(db_models.Deck, deck_id)
+        if not deck:
+            raise ValueError(f"Deck {deck_id} not found")
+        card_ids = db_models.load_json_column(deck.cards)
+        cards_by_id = {
+            card.id: card
+            for card in db_models.CardData.query.filter(db_models.CardData.id.in_(set(card_ids))).all()
+        }
+        return convert_db_cards_to_game_cards([cards_by_id[card_id] for card_id in card_ids if card_id in cards_by_id])
+
+
+def load_deck(spec: str, library: Optional[CardLibrary] = None) -> List[Card]:
+    """
+    根据命令行参数加载卡组
+    """
+    if spec.startswith('db:'):
+        return load_deck_from_db(spec[3:])
+    library = library or CardLibrary()
+    if spec.startswith('random:'):
+        return library.random_deck(random.Random(int(spec[7:])))
+    with open(spec, 'r', encoding='utf-8') as f:
+        deck_data = json.load(f)
+    return library.build_deck(deck_data.get('characters', []), deck_data.get('cards', []))
+
+
+def configure_logging(verbose: bool) -> None:
+    """
+    模拟时引擎会对策略尝试的非法操作记录错误日志，默认只保留严重错误
+    """
+    logging.getLogger('game_engine').setLevel(logging.DEBUG if verbose else logging.CRITICAL)
+
+
+def format_report(stats: SimulationStats) -> str:
+    report = stats.to_dict()
+    lines = [
+        f"对局数: {report['games']}",
+        f"卡组1胜率: {report['deck1_win_rate']:.1%} ({report['deck1_wins']})",
+        f"卡组2胜率: {report['deck2_win_rate']:.1%} ({report['deck2_wins']})",
+        f"平局: {report['draws']}  中止: {report['aborted']}",
+        f"平均回合数: {report['average_rounds']:.2f}",
+        f"平均操作数: {report['average_actions']:.1f}",
+    ]
+    for deck, counts in report['action_counts'].items():
+        summary = ', '.join(f"{action}={count:.1f}" for action, count in counts.items())
+        lines.append(f"{deck} 每局操作: {summary}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='批量模拟对局，评估卡组胜率')
+    parser.add_argument('--deck1', required=True, help='卡组1: random:<seed>、db:<deck_id> 或 JSON文件路径')
+    parser.add_argument('--deck2', required=True, help='卡组2: random:<seed>、db:<deck_id> 或 JSON文件路径')
+    parser.add_argument('--games', type=int, default=100, help='对局数')
+    parser.add_argument('--policy1', default='random', help='卡组1策略: random、greedy、mcts 或 module:Class')
+    parser.add_argument('--policy2', default='random', help='卡组2策略: random、greedy、mcts 或 module:Class')
+    parser.add_argument('--seed', type=int, default=0, help='起始随机种子')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认CPU核数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    parser.add_argument('--verbose', action='store_true', help='输出引擎日志')
+    args = parser.parse_args(argv)
+
+    configure_logging(args.verbose)
+    library = CardLibrary()
+    deck1 = load_deck(args.deck1, library)
+    deck2 = load_deck(args.deck2, library)
+
+    stats = simulate(deck1, deck2, args.games, args.policy1, args.policy2,
+                     seed=args.seed, workers=args.workers, verbose=args.verbose)
+    if args.json:
+        print(json.dumps(stats.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(format_report(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
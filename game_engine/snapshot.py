@@ -0,0 +1,57 @@
+"""
+游戏状态快照
+
+引擎只会原地修改 GameState / PlayerState / CharacterCard 以及它们持有的列表和状态字典，
+普通卡牌对象、技能定义和日志字符串从不修改。因此复制状态时只需复制这些可变容器，
+卡牌和技能等不可变部分在各个分支之间共享，复制开销与实际会变化的状态大小成正比，
+而不是像 copy.deepcopy 那样复制整棵对象树。
+"""
+import copy
+import random
+from typing import Dict, Any, List
+
+from models.game_models import GameState, PlayerState, CharacterCard
+
+
+def _clone_dict_list(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [dict(item) for item in items]
+
+
+def clone_character(character: CharacterCard) -> CharacterCard:
+    """
+    复制角色的可变状态，技能列表和装备卡牌共享
+    """
+    cloned = copy.copy(character)
+    # 状态字典会被原地修改（例如持续回合数递减），需要逐个复制
+    cloned.character_statuses = _clone_dict_list(character.character_statuses)
+    return cloned
+
+
+def clone_player_state(player: PlayerState) -> PlayerState:
+    """
+    复制玩家状态，手牌和牌库中的卡牌对象共享
+    """
+    cloned = copy.copy(player)
+    cloned.characters = [clone_character(character) for character in player.characters]
+    cloned.hand_cards = list(player.hand_cards)
+    cloned.dice = player.dice.copy()
+    cloned.deck = list(player.deck)
+    cloned.supports = _clone_dict_list(player.supports)
+    cloned.summons = _clone_dict_list(player.summons)
+    cloned.team_status = _clone_dict_list(player.team_status)
+    return cloned
+
+
+def clone_game_state(game_state: GameState) -> GameState:
+    """
+    复制游戏状态，返回的状态与原状态互不影响
+    """
+    cloned = copy.copy(game_state)
+    cloned.players = [clone_player_state(player) for player in game_state.players]
+    cloned.game_log = game_state.game_log.copy()
+    cloned.action_queue = _clone_dict_list(game_state.action_queue)
+    cloned.damage_queue = _clone_dict_list(game_state.damage_queue)
+    # 随机数生成器也是可变状态，分支之后各自独立产生相同的后续序列
+    cloned.rng = random.Random()
+    cloned.rng.setstate(game_state.rng.getstate())
+    return cloned
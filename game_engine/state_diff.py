@@ -0,0 +1,157 @@
+"""
+游戏状态增量
+
+每次处理行动后，把序列化的状态与上一版本比较，生成类似 JSON Patch（RFC 6902）的变更操作：
+- {'op': 'replace', 'path': '/players/0/characters/1/health', 'value': 7}
+- {'op': 'add', 'path': '/players/0/dice/-', 'value': '火'}
+- {'op': 'remove', 'path': '/players/1/hand_cards/4'}
+
+版本号单调递增，最近若干个版本的变更保存在环形缓冲区中，客户端提供已知的版本号即可只获取之后的变更。
+比较时先整体比较子树（C 实现的相等比较），只递归进入有变化的子树；
+记录的状态直接作为下一次比较的基准，不再复制，调用方每次传入新生成的序列化结果即可。
+游戏日志不在状态中，状态只包含最新的日志序号，日志通过单独的分页接口获取（见 models/game_log.py）。
+"""
+import copy
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# 环形缓冲区保存的版本数，更早的版本只能重新获取完整状态
+DEFAULT_MAX_VERSIONS = 64
+
+
+def _escape(key: Any) -> str:
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def diff_values(old: Any, new: Any, path: str = '') -> List[Dict[str, Any]]:
+    """
+    比较两个JSON兼容的值，返回把 old 变为 new 的操作列表
+    字典逐个键比较；列表逐项比较，末尾多出或缺少的项用 add/remove 表示
+    """
+    if type(old) is not type(new):
+        return [{'op': 'replace', 'path': path, 'value': new}]
+    # 没有变化的子树不再逐项递归（容器按值比较，状态中每个字段的类型固定，不区分 1 与 True）
+    if old == new:
+        return []
+
+    if isinstance(new, dict):
+        ops = []
+        for key, value in new.items():
+            child_path = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({'op': 'add', 'path': child_path, 'value': value})
+            else:
+                ops.extend(diff_values(old[key], value, child_path))
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{_escape(key)}"})
+        return ops
+
+    if isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for index in range(common):
+            ops.extend(diff_values(old[index], new[index], f"{path}/{index}"))
+        for index in range(common, len(new)):
+            ops.append({'op': 'add', 'path': f"{path}/-", 'value': new[index]})
+        # 从末尾开始删除，前面的下标不受影响
+        for index in range(len(old) - 1, common - 1, -1):
+            ops.append({'op': 'remove', 'path': f"{path}/{index}"})
+        return ops
+
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+
+def apply_changes(state: Any, ops: List[Dict[str, Any]]) -> Any:
+    """
+    将变更操作应用到状态上（原地修改），返回修改后的状态
+    """
+    for op in ops:
+        tokens = [_unescape(token) for token in op['path'].split('/')[1:]]
+        if not tokens:
+            state = copy.deepcopy(op['value'])
+            continue
+
+        parent = state
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            if op['op'] == 'add':
+                value = copy.deepcopy(op['value'])
+                if last == '-':
+                    parent.append(value)
+                else:
+                    parent.insert(int(last), value)
+            elif op['op'] == 'remove':
+                del parent[int(last)]
+            else:
+                parent[int(last)] = copy.deepcopy(op['value'])
+        else:
+            if op['op'] == 'remove':
+                del parent[last]
+            else:
+                parent[last] = copy.deepcopy(op['value'])
+    return state
+
+
+class StateHistory:
+    """
+    对局状态的版本历史
+
+    记录上一版本的状态和最近 max_versions 个版本的变更
+    """
+
+    def __init__(self, max_versions: int = DEFAULT_MAX_VERSIONS):
+        self.version = 0
+        self.changes: deque = deque(maxlen=max_versions)  # (版本号, 变更操作)
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    def record(self, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        记录新的序列化状态，返回相对上一版本的变更；状态有变化时版本号加一
+
+        状态直接保存为比较基准，变更中的值也引用其中的对象，不做复制：
+        传入的状态不能与引擎共享可变对象（serialize_game_state 每次生成新的容器），记录后也不能再修改
+        """
+        if self._snapshot is None:
+            ops = [{'op': 'replace', 'path': '', 'value': state}]
+        else:
+            ops = diff_values(self._snapshot, state)
+
+        self._snapshot = state
+        if ops:
+            self.version += 1
+            self.changes.append((self.version, ops))
+        return ops
+
+    @property
+    def current(self) -> Optional[Dict[str, Any]]:
+        """最近记录的状态（只读），可以直接作为完整状态返回，不必重新序列化"""
+        return self._snapshot
+
+    def since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        返回指定版本之后的全部变更；版本已不在缓冲区内（或无效）时返回None，需要重新获取完整状态
+        """
+        if version == self.version:
+            return []
+        if version > self.version or version < 0:
+            return None
+        if not self.changes or version < self.changes[0][0] - 1:
+            return None
+        ops = []
+        for change_version, change_ops in self.changes:
+            if change_version > version:
+                ops.extend(change_ops)
+        return ops
+
+    def oldest_version(self) -> int:
+        """可以增量获取的最早版本号"""
+        return self.changes[0][0] - 1 if self.changes else self.version
+
@@ -4,6 +4,8 @@
 import json
 import os
 from app import create_app, db
+from api.catalog_cache import bump_catalog_version
+from game_engine.card_registry import card_registry
 from models.db_models import CardData
 from models.enums import ElementType
 
@@ -112,7 +114,7 @@ def import_character_cards():
                 description=char_data.get('description', ''),
                 character_subtype=char_data.get('region', ''),
                 rarity=char_data.get('rarity', 5),  # 假设角色都是5星
-                skills=json.dumps(skills_data),
+                skills=skills_data,
                 # 基本生命值和能量值（对于角色牌）
                 health=char_data.get('health', 10),
                 max_health=char_data.get('health', 10),
@@ -155,7 +157,7 @@ def import_event_cards():
                 name=event_data['name'],
                 card_type=card_type,
                 element_type=None,  # 事件牌通常没有元素类型
-                cost=json.dumps(total_cost),
+                cost=total_cost,
                 description=event_data.get('description', ''),
                 character_subtype=event_data.get('subtype', ''),
                 rarity=event_data.get('rarity', 3),  # 默认3星
@@ -198,7 +200,7 @@ def import_equipment_cards():
                 name=equip_data['name'],
                 card_type=card_type,
                 element_type=None,
-                cost=json.dumps(total_cost),
+                cost=total_cost,
                 description=equip_data.get('description', ''),
                 character_subtype=character_subtype,
                 rarity=equip_data.get('rarity', 3),
@@ -238,7 +240,7 @@ def import_support_cards():
                 name=support_data['name'],
                 card_type=card_type,
                 element_type=None,
-                cost=json.dumps(total_cost),
+                cost=total_cost,
                 description=support_data.get('description', ''),
                 character_subtype=support_data.get('subtype', ''),
                 rarity=support_data.get('rarity', 2),  # 支援牌通常为2星
@@ -273,6 +275,7 @@ def import_all_cards():
                 # 清空现有数据
                 db.session.execute(db.delete(CardData))
                 db.session.commit()
+                card_registry.invalidate()
                 print("现有数据已清空")
         
         # 导入各类卡牌
@@ -281,7 +284,11 @@ def import_all_cards():
         import_equipment_cards()
         import_support_cards()
         
-        print("所有卡牌数据导入完成！")
+        # 丢弃本进程中缓存的卡牌定义；其他进程中的缓存按卡牌ID和 updated_at 判断是否过期
+        card_registry.invalidate()
+        # 递增卡牌目录版本，所有进程中缓存的卡牌列表响应随之失效
+        version = bump_catalog_version()
+        print(f"所有卡牌数据导入完成！卡牌目录版本: {version}")
 
 if __name__ == "__main__":
     import_all_cards()
\ No newline at end of file
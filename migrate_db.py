@@ -106,7 +106,65 @@ def migrate_database():
         finally:
             conn.close()
 
+def migrate_json_columns():
+    """
+    将重复编码的JSON字符串（CardData.cost / CardData.skills / Deck.cards）转换为原生JSON值
+    需要在应用上下文中执行，返回转换的行数；已经是原生JSON值的行不会修改
+    """
+    from models.db_models import CardData, Deck, load_json_column
+    
+    migrated = 0
+    for model, columns in ((CardData, ('cost', 'skills')), (Deck, ('cards',))):
+        for row in model.query.all():
+            changed = False
+            for column in columns:
+                value = getattr(row, column)
+                if isinstance(value, str):
+                    setattr(row, column, load_json_column(value))
+                    changed = True
+            if changed:
+                migrated += 1
+    
+    db.session.commit()
+    return migrated
+
+# 已被模型中的新索引取代、迁移时删除的索引（表名 -> 索引名）
+REPLACED_INDEXES = {
+    # 卡牌过滤索引改为以 id 结尾（键集分页）
+    'card_data': ('ix_card_data_card_type_element_type', 'ix_card_data_element_type'),
+}
+
+def create_indexes():
+    """
+    为已有的表创建模型中声明的索引（create_all 不会给已存在的表添加索引），
+    并删除 REPLACED_INDEXES 中列出的旧索引
+    需要在应用上下文中执行，返回新建的索引名
+    """
+    from sqlalchemy import inspect
+    
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        declared = {index.name for index in table.indexes}
+        for name in REPLACED_INDEXES.get(table.name, ()):
+            if name in existing and name not in declared:
+                with db.engine.begin() as connection:
+                    connection.exec_driver_sql(f'DROP INDEX {preparer.quote(name)}')
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                created.append(index.name)
+    return created
+
 if __name__ == "__main__":
     print("开始数据库迁移...")
     migrate_database()
+    with create_app().app_context():
+        print(f"转换重复编码的JSON列: {migrate_json_columns()} 行")
+        print(f"新建索引: {create_indexes()}")
     print("迁移完成！请重启服务器以应用更改。")
\ No newline at end of file
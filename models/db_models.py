@@ -2,6 +2,7 @@
 七圣召唤数据库模型定义
 """
 from datetime import datetime
+import json
 import uuid
 from flask_sqlalchemy import SQLAlchemy
 
@@ -9,6 +10,19 @@ from flask_sqlalchemy import SQLAlchemy
 db = None
 _initialized = False
 
+
+def load_json_column(value, default=None):
+    """
+    读取 JSON 列（CardData.cost / CardData.skills / Deck.cards）
+    这些列直接存储 JSON 值；迁移前写入的数据是 JSON 字符串（重复编码），读取时一并解码，
+    迁移见 migrate_db.py 的 migrate_json_columns
+    """
+    while isinstance(value, str):
+        value = json.loads(value) if value else None
+    if value is None:
+        return [] if default is None else default
+    return value
+
 def init_models_db(sqlalchemy_db):
     """
     初始化模型中的 db 对象
@@ -50,9 +64,15 @@ def init_models_db(sqlalchemy_db):
         卡牌数据模型
         """
         __tablename__ = 'card_data'
+        __table_args__ = (
+            # 卡牌列表按类型、类型+元素、元素过滤，键集分页时按 id 排序（见 api/cards.py）
+            db.Index('ix_card_data_card_type_id', 'card_type', 'id'),
+            db.Index('ix_card_data_card_type_element_type_id', 'card_type', 'element_type', 'id'),
+            db.Index('ix_card_data_element_type_id', 'element_type', 'id'),
+        )
 
         id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
-        name = db.Column(db.String(100), nullable=False)  # 卡牌名称
+        name = db.Column(db.String(100), nullable=False, index=True)  # 卡牌名称
         card_type = db.Column(db.String(50), nullable=False)  # 卡牌类型
         element_type = db.Column(db.String(50))  # 元素类型
         cost = db.Column(db.JSON)  # 费用，存储为JSON格式
@@ -107,7 +127,7 @@ def init_models_db(sqlalchemy_db):
 
         id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
         name = db.Column(db.String(100), nullable=False)  # 卡组名称
-        user_id = db.Column(db.String, db.ForeignKey('users.id'), nullable=False)  # 所属用户
+        user_id = db.Column(db.String, db.ForeignKey('users.id'), nullable=False, index=True)  # 所属用户
         cards = db.Column(db.JSON)  # 卡牌ID列表，存储为JSON格式
         is_public = db.Column(db.Boolean, default=False)  # 是否公开
         created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -127,9 +147,9 @@ def init_models_db(sqlalchemy_db):
         __tablename__ = 'game_histories'
 
         id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
-        player1_id = db.Column(db.String, db.ForeignKey('users.id'), nullable=False)  # 玩家1
-        player2_id = db.Column(db.String, db.ForeignKey('users.id'), nullable=False)  # 玩家2
-        winner_id = db.Column(db.String, db.ForeignKey('users.id'))  # 获胜者
+        player1_id = db.Column(db.String, db.ForeignKey('users.id'), nullable=False, index=True)  # 玩家1
+        player2_id = db.Column(db.String, db.ForeignKey('users.id'), nullable=False, index=True)  # 玩家2
+        winner_id = db.Column(db.String, db.ForeignKey('users.id'), index=True)  # 获胜者
         deck1_id = db.Column(db.String, db.ForeignKey('decks.id'))  # 玩家1使用的卡组
         deck2_id = db.Column(db.String, db.ForeignKey('decks.id'))  # 玩家2使用的卡组
         game_data = db.Column(db.JSON)  # 完整游戏数据，存储为JSON格式
@@ -145,8 +165,19 @@ def init_models_db(sqlalchemy_db):
         deck1 = db.relationship("Deck", foreign_keys=[deck1_id], back_populates="game_histories_as_deck1")
         deck2 = db.relationship("Deck", foreign_keys=[deck2_id], back_populates="game_histories_as_deck2")
 
+    class CatalogVersion(db.Model):
+        """
+        卡牌目录版本，导入卡牌数据后递增，用于卡牌列表响应缓存和ETag
+        """
+        __tablename__ = 'catalog_version'
+
+        id = db.Column(db.Integer, primary_key=True)  # 只有一行，id 固定为 1
+        version = db.Column(db.Integer, nullable=False, default=0)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
     # 将模型类设置为模块属性，以便其他模块可以导入
     globals()['User'] = User
     globals()['CardData'] = CardData
     globals()['Deck'] = Deck
-    globals()['GameHistory'] = GameHistory
\ No newline at end of file
+    globals()['GameHistory'] = GameHistory
+    globals()['CatalogVersion'] = CatalogVersion
\ No newline at end of file
@@ -0,0 +1,346 @@
+"""
+元素骰池
+
+骰子按元素计数存储在固定的8个槽位中（万能骰和7种元素），数量、包含判断和费用检查都不需要遍历骰子列表。
+为了兼容原来的列表用法，骰池同样支持 len、迭代、下标读写、append、remove 和 pop，
+迭代顺序固定为万能骰在前、随后按元素顺序排列，下标即对应这一顺序中的位置。
+"""
+from functools import lru_cache
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from models.enums import ElementType
+
+# 骰子槽位顺序，也是骰子的展示顺序
+DICE_SLOTS = (
+    ElementType.OMNI,
+    ElementType.CRYO,
+    ElementType.HYDRO,
+    ElementType.PYRO,
+    ElementType.ELECTRO,
+    ElementType.ANEMO,
+    ElementType.GEO,
+    ElementType.DENDRO,
+)
+SLOT_INDEX = {element: index for index, element in enumerate(DICE_SLOTS)}
+OMNI_SLOT = SLOT_INDEX[ElementType.OMNI]
+ELEMENT_SLOTS = tuple(range(1, len(DICE_SLOTS)))
+
+
+def _slot(element: ElementType) -> int:
+    try:
+        return SLOT_INDEX[element]
+    except KeyError:
+        raise ValueError(f"{element} is not a dice type") from None
+
+
+class CostRequirement(NamedTuple):
+    """
+    汇总后的费用：万能骰需求、各元素槽位需求、任意元素需求
+    """
+    omni: int
+    elements: Tuple[int, ...]
+    any: int
+    total: int
+    active_index: Optional[int]
+
+
+class DicePool:
+    """
+    按元素计数的骰池
+    """
+
+    __slots__ = ('counts', 'total')
+
+    def __init__(self, dice: Iterable[ElementType] = ()):
+        self.counts = [0] * len(DICE_SLOTS)
+        self.total = 0
+        for die in dice:
+            self.counts[_slot(die)] += 1
+            self.total += 1
+
+    @classmethod
+    def from_counts(cls, counts: Sequence[int]) -> 'DicePool':
+        pool = cls()
+        pool.counts = list(counts)
+        pool.total = sum(counts)
+        return pool
+
+    def copy(self) -> 'DicePool':
+        return DicePool.from_counts(self.counts)
+
+    def count(self, element: ElementType) -> int:
+        index = SLOT_INDEX.get(element)
+        return self.counts[index] if index is not None else 0
+
+    # 列表兼容接口
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+    def __iter__(self) -> Iterator[ElementType]:
+        for element, count in zip(DICE_SLOTS, self.counts):
+            for _ in range(count):
+                yield element
+
+    def __contains__(self, element: object) -> bool:
+        index = SLOT_INDEX.get(element)
+        return index is not None and self.counts[index] > 0
+
+    def _slot_at(self, position: int) -> int:
+        if position < 0:
+            position += self.total
+        if not 0 <= position < self.total:
+            raise IndexError("dice index out of range")
+        for index, count in enumerate(self.counts):
+            if position < count:
+                return index
+            position -= count
+        raise IndexError("dice index out of range")
+
+    def __getitem__(self, position: int) -> ElementType:
+        return DICE_SLOTS[self._slot_at(position)]
+
+    def __setitem__(self, position: int, element: ElementType) -> None:
+        new_index = _slot(element)
+        self.counts[self._slot_at(position)] -= 1
+        self.counts[new_index] += 1
+
+    def append(self, element: ElementType) -> None:
+        self.counts[_slot(element)] += 1
+        self.total += 1
+
+    def extend(self, dice: Iterable[ElementType]) -> None:
+        for die in dice:
+            self.append(die)
+
+    def remove(self, element: ElementType) -> None:
+        index = SLOT_INDEX.get(element)
+        if index is None or self.counts[index] == 0:
+            raise ValueError(f"{element} not in dice pool")
+        self.counts[index] -= 1
+        self.total -= 1
+
+    def pop(self, position: int = -1) -> ElementType:
+        index = self._slot_at(position)
+        self.counts[index] -= 1
+        self.total -= 1
+        return DICE_SLOTS[index]
+
+    def clear(self) -> None:
+        self.counts = [0] * len(DICE_SLOTS)
+        self.total = 0
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, DicePool):
+            return self.counts == other.counts
+        if isinstance(other, list):
+            try:
+                return self.counts == DicePool(other).counts
+            except ValueError:
+                return False
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"DicePool({list(self)!r})"
+
+    def __getstate__(self):
+        return self.counts
+
+    def __setstate__(self, counts):
+        self.counts = list(counts)
+        self.total = sum(counts)
+
+    # 费用支付
+
+    def solve(self, cost: Sequence[ElementType], active_element: Optional[ElementType]) -> Optional[List[int]]:
+        """
+        计算支付费用使用的骰子（按槽位计数），无法支付时返回None
+        """
+        return solve_payment(self.counts, cost, active_element)
+
+    def can_pay_requirement(self, requirement: CostRequirement) -> bool:
+        return solve_requirement(self.counts, requirement) is not None
+
+    def can_pay(self, cost: Sequence[ElementType], active_element: Optional[ElementType]) -> bool:
+        return self.solve(cost, active_element) is not None
+
+    def pay(self, cost: Sequence[ElementType], active_element: Optional[ElementType]) -> Optional[List[ElementType]]:
+        """
+        检查并支付费用，返回使用的骰子；无法支付时返回None且骰池不变
+        """
+        spent = self.solve(cost, active_element)
+        if spent is None:
+            return None
+        return self.spend_counts(spent)
+
+    def spend_counts(self, spent: Sequence[int]) -> List[ElementType]:
+        """按槽位计数移除骰子"""
+        dice = []
+        for index, count in enumerate(spent):
+            if count:
+                self.counts[index] -= count
+                self.total -= count
+                dice.extend([DICE_SLOTS[index]] * count)
+        return dice
+
+    def payment_options(self, cost: Sequence[ElementType],
+                        active_element: Optional[ElementType]) -> List[List[ElementType]]:
+        """
+        列出所有可行的支付方式（骰子组合不重复），默认方式排在第一位
+        """
+        options = enumerate_payments(self.counts, cost, active_element)
+        default = self.solve(cost, active_element)
+        if default is not None:
+            options.sort(key=lambda spent: spent != default)
+        return [dice_from_counts(spent) for spent in options]
+
+
+def dice_from_counts(counts: Sequence[int]) -> List[ElementType]:
+    """按槽位计数还原骰子列表"""
+    return [DICE_SLOTS[index] for index, count in enumerate(counts) for _ in range(count)]
+
+
+@lru_cache(maxsize=4096)
+def _compile_cost(cost: Tuple[ElementType, ...], active_element: Optional[ElementType]) -> CostRequirement:
+    omni_required = 0
+    element_required = [0] * len(DICE_SLOTS)
+    any_required = 0
+    for required in cost:
+        if required == ElementType.OMNI:
+            omni_required += 1
+        elif required == ElementType.CRYSTAL:
+            any_required += 1
+        else:
+            element = active_element if required == ElementType.SAME else required
+            index = SLOT_INDEX.get(element)
+            if index is None or index == OMNI_SLOT:
+                omni_required += 1
+            else:
+                element_required[index] += 1
+    return CostRequirement(omni_required, tuple(element_required), any_required,
+                           omni_required + sum(element_required) + any_required, SLOT_INDEX.get(active_element))
+
+
+def compile_cost(cost: Sequence[ElementType], active_element: Optional[ElementType]) -> CostRequirement:
+    """
+    将费用汇总为按槽位的需求，结果会被缓存，可以预先计算后反复用于求解
+    SAME 表示与出战角色相同的元素；出战角色没有可用元素时只能用万能骰支付
+    """
+    return _compile_cost(tuple(cost), active_element)
+
+
+def solve_payment(counts: Sequence[int], cost: Sequence[ElementType],
+                  active_element: Optional[ElementType]) -> Optional[List[int]]:
+    """
+    计算支付费用使用的骰子（按槽位计数），无法支付时返回None
+    """
+    return solve_requirement(counts, compile_cost(cost, active_element))
+
+
+def solve_requirement(counts: Sequence[int], requirement: CostRequirement) -> Optional[List[int]]:
+    """
+    费用求解：依次满足万能骰费用、指定元素费用（不足部分用万能骰补）和任意元素费用。
+    任意元素费用优先使用与出战角色元素不同、数量最多的骰子，最后才使用万能骰。
+    这一顺序只要存在可行支付方式就一定能找到。
+    """
+    if requirement.total > sum(counts):
+        return None
+
+    omni_required = requirement.omni
+    element_required = requirement.elements
+    any_required = requirement.any
+
+    spent = [0] * len(DICE_SLOTS)
+    omni_left = counts[OMNI_SLOT] - omni_required
+    if omni_left < 0:
+        return None
+    spent[OMNI_SLOT] = omni_required
+
+    remaining = list(counts)
+    for index in ELEMENT_SLOTS:
+        required = element_required[index]
+        if not required:
+            continue
+        used = min(required, remaining[index])
+        spent[index] += used
+        remaining[index] -= used
+        shortfall = required - used
+        if shortfall > omni_left:
+            return None
+        omni_left -= shortfall
+        spent[OMNI_SLOT] += shortfall
+
+    if any_required:
+        active_index = requirement.active_index
+        order = sorted(ELEMENT_SLOTS, key=lambda index: (index == active_index, -remaining[index]))
+        for index in order:
+            if not any_required:
+                break
+            used = min(any_required, remaining[index])
+            spent[index] += used
+            any_required -= used
+        if any_required > omni_left:
+            return None
+        spent[OMNI_SLOT] += any_required
+
+    return spent
+
+
+def enumerate_payments(counts: Sequence[int], cost: Sequence[ElementType],
+                       active_element: Optional[ElementType]) -> List[List[int]]:
+    """
+    枚举所有可行的支付方式，每种方式为按槽位计数的骰子组合
+    """
+    omni_required, element_required, any_required, _, _ = compile_cost(cost, active_element)
+    if counts[OMNI_SLOT] < omni_required:
+        return []
+
+    # 同一组骰子可能由不同的分配方式得到（例如万能骰付指定元素、元素骰付任意元素），按组合去重
+    results = {}
+    spent = [0] * len(DICE_SLOTS)
+    spent[OMNI_SLOT] = omni_required
+    remaining = list(counts)
+    remaining[OMNI_SLOT] -= omni_required
+    required_slots = [index for index in ELEMENT_SLOTS if element_required[index]]
+
+    def pay_any(position: int, left: int) -> None:
+        # 任意元素费用：依次决定每个槽位用几个骰子，万能骰作为最后一个槽位
+        if position == len(DICE_SLOTS):
+            if left == 0:
+                results.setdefault(tuple(spent), list(spent))
+            return
+        index = ELEMENT_SLOTS[position] if position < len(ELEMENT_SLOTS) else OMNI_SLOT
+        for used in range(min(left, remaining[index]), -1, -1):
+            spent[index] += used
+            remaining[index] -= used
+            pay_any(position + 1, left - used)
+            spent[index] -= used
+            remaining[index] += used
+
+    def pay_elements(position: int) -> None:
+        if position == len(required_slots):
+            pay_any(0, any_required)
+            return
+        index = required_slots[position]
+        required = element_required[index]
+        for used in range(min(required, remaining[index]), -1, -1):
+            omni_used = required - used
+            if omni_used > remaining[OMNI_SLOT]:
+                break
+            spent[index] += used
+            remaining[index] -= used
+            spent[OMNI_SLOT] += omni_used
+            remaining[OMNI_SLOT] -= omni_used
+            pay_elements(position + 1)
+            spent[index] -= used
+            remaining[index] += used
+            spent[OMNI_SLOT] -= omni_used
+            remaining[OMNI_SLOT] += omni_used
+
+    pay_elements(0)
+    return list(results.values())
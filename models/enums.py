@@ -21,6 +21,10 @@ class ElementType(Enum):
     CRYSTAL = "晶体"  # 任意元素（非物理、非万能）
     SAME = "同色"  # 与当前角色相同元素
 
+    def __init__(self, value):
+        # 成员在枚举中的序号，用于按序号索引的查找表（枚举成员的哈希计算较慢）
+        self.ordinal = len(type(self).__members__)
+
 
 class CardType(Enum):
     """
@@ -111,4 +115,38 @@ class ZoneType(Enum):
     TALENT = "天赋"
     SUPPORT = "支援"
     SUMMON = "召唤物"
-    TEAM = "队伍"
\ No newline at end of file
+    TEAM = "队伍"
+
+
+class LogEventType(Enum):
+    """
+    游戏日志事件类型枚举
+    """
+    TEXT = "文本"
+    REPLACE_CARDS = "替换手牌"
+    REROLL_DICE = "重投骰子"
+    ROLL_PHASE = "投骰阶段"
+    ACTION_PHASE = "行动阶段"
+    ROUND_START = "回合开始"
+    HAND_OVERFLOW = "手牌已满"
+    ROUND_LIMIT = "回合数上限"
+    GAME_OVER = "游戏结束"
+    USE_SKILL = "使用技能"
+    CHARGED_ATTACK = "重击"
+    DAMAGE = "造成伤害"
+    CHARACTER_DEFEATED = "角色被击倒"
+    STATUS_DEFEATED = "状态效果击倒"
+    DEFEAT_PREVENTED = "免于被击倒"
+    EQUIP = "装备"
+    EQUIP_TALENT = "装备天赋"
+    PLACE_SUPPORT = "放置支援牌"
+    SUPPORT_ZONE_FULL = "支援区已满"
+    PLAY_EVENT = "打出事件卡"
+    FOOD_LIMIT = "料理次数限制"
+    FULL_STOMACH = "饱腹"
+    HEAL = "治疗"
+    SHIELD = "护盾"
+    PLAY_CARD = "打出卡牌"
+    SWITCH_CHARACTER = "切换角色"
+    ELEMENTAL_TUNING = "元素调和"
+    END_TURN = "结束回合"
@@ -0,0 +1,145 @@
+"""
+结构化游戏日志
+
+日志事件只记录事件类型、行动玩家和参数，不在服务端拼接文本，文本由客户端按类型本地化渲染
+（服务端也可以用 render 按中文模板渲染）。
+日志保存在有上限的环形缓冲区中，每个事件有单调递增的序号，可以按序号分页获取。
+"""
+import os
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from models.enums import LogEventType
+
+# 每局保留的日志事件数，更早的事件被丢弃
+DEFAULT_MAX_EVENTS = int(os.environ.get('GAME_LOG_MAX_EVENTS', 500))
+
+# 中文渲染模板，参数名与事件参数一致
+LOG_TEMPLATES = {
+    LogEventType.TEXT: "{text}",
+    LogEventType.REPLACE_CARDS: "玩家 {actor} 替换了 {count} 张手牌",
+    LogEventType.REROLL_DICE: "玩家 {actor} 重投了骰子",
+    LogEventType.ROLL_PHASE: "投骰阶段 - 回合 {round}",
+    LogEventType.ACTION_PHASE: "进入行动阶段 - 回合 {round}",
+    LogEventType.ROUND_START: "回合 {round} 开始",
+    LogEventType.HAND_OVERFLOW: "玩家 {actor} 手牌已满，丢弃了 {card}",
+    LogEventType.ROUND_LIMIT: "达到回合数上限，游戏平局",
+    LogEventType.GAME_OVER: "游戏结束，获胜者: {winner}",
+    LogEventType.USE_SKILL: "玩家 {actor} 使用了技能 {skill}",
+    LogEventType.CHARGED_ATTACK: "触发重击效果！",
+    LogEventType.DAMAGE: "对角色 {character} 造成了 {amount} 点{damage_type}伤害",
+    LogEventType.CHARACTER_DEFEATED: "角色 {character} 被击倒！",
+    LogEventType.STATUS_DEFEATED: "角色 {character} 因状态效果被击倒！",
+    LogEventType.DEFEAT_PREVENTED: "角色 {character} 免于被击倒！",
+    LogEventType.EQUIP: "角色 {character} 装备了 {card}",
+    LogEventType.EQUIP_TALENT: "角色 {character} 装备了天赋 {card}",
+    LogEventType.PLACE_SUPPORT: "玩家 {actor} 放置了支援牌 {card}",
+    LogEventType.SUPPORT_ZONE_FULL: "支援区已满，无法放置新的支援牌，请选择一张支援牌进行弃置",
+    LogEventType.PLAY_EVENT: "玩家 {actor} 打出了事件卡 {card}",
+    LogEventType.FOOD_LIMIT: "本回合已使用过复苏效果的料理，无法再次使用",
+    LogEventType.FULL_STOMACH: "角色 {character} 已处于饱腹状态，料理无效",
+    LogEventType.HEAL: "角色 {character} 恢复了 {amount} 点生命值",
+    LogEventType.SHIELD: "角色 {character} 获得了 {amount} 点护盾",
+    LogEventType.PLAY_CARD: "玩家 {actor} 打出了卡牌 {card}",
+    LogEventType.SWITCH_CHARACTER: "玩家 {actor} 从角色 {from_character} 切换到角色 {to_character}",
+    LogEventType.ELEMENTAL_TUNING: "玩家 {actor} 使用元素调和，丢弃了 {card} 并将一个骰子转换为 {element}",
+    LogEventType.END_TURN: "玩家 {actor} 结束了回合",
+}
+
+
+class LogEvent(NamedTuple):
+    """
+    日志事件
+    """
+    seq: int
+    type: LogEventType
+    actor: Optional[str]
+    params: Dict[str, Any]
+
+    def render(self) -> str:
+        """按中文模板渲染为文本"""
+        try:
+            return LOG_TEMPLATES[self.type].format(actor=self.actor, **self.params)
+        except (KeyError, IndexError):
+            return f"{self.type.value} {self.params}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'seq': self.seq, 'type': self.type.name, 'actor': self.actor, 'params': self.params}
+
+
+class GameLog:
+    """
+    有上限的游戏日志
+
+    append 接受事件类型和参数；为了兼容原来的文本日志，也接受字符串（记录为 TEXT 事件）
+    """
+
+    __slots__ = ('events', 'seq')
+
+    def __init__(self, entries: Iterable[Union[str, LogEvent]] = (), max_events: Optional[int] = None):
+        self.events: deque = deque(maxlen=max_events or DEFAULT_MAX_EVENTS)
+        self.seq = 0  # 最后一个事件的序号
+        for entry in entries:
+            if isinstance(entry, LogEvent):
+                self.append(entry.type, entry.actor, **entry.params)
+            else:
+                self.append(entry)
+
+    def append(self, event_type: Union[LogEventType, str], actor: Optional[str] = None, **params) -> LogEvent:
+        if not isinstance(event_type, LogEventType):
+            params = {'text': str(event_type)}
+            event_type = LogEventType.TEXT
+        self.seq += 1
+        event = LogEvent(self.seq, event_type, actor, params)
+        self.events.append(event)
+        return event
+
+    def after(self, seq: int, limit: Optional[int] = None) -> List[LogEvent]:
+        """
+        返回序号大于 seq 的事件，最多 limit 个
+        """
+        start = max(seq - self.first_seq + 1, 0)
+        end = len(self.events) if limit is None else min(start + limit, len(self.events))
+        return list(islice(self.events, start, end))
+
+    @property
+    def first_seq(self) -> int:
+        """缓冲区中最早事件的序号"""
+        return self.events[0].seq if self.events else self.seq + 1
+
+    def copy(self) -> 'GameLog':
+        cloned = GameLog(max_events=self.events.maxlen)
+        cloned.events.extend(self.events)
+        cloned.seq = self.seq
+        return cloned
+
+    def render(self) -> List[str]:
+        return [event.render() for event in self.events]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [event.to_dict() for event in self.events]
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[LogEvent]:
+        return iter(self.events)
+
+    def __getitem__(self, index: int) -> LogEvent:
+        return self.events[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, GameLog):
+            return self.seq == other.seq and list(self.events) == list(other.events)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __contains__(self, item: object) -> bool:
+        if isinstance(item, str):
+            return any(event.render() == item for event in self.events)
+        return item in self.events
+
+    def __repr__(self) -> str:
+        return f"GameLog(seq={self.seq}, events={len(self.events)})"
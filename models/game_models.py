@@ -1,13 +1,18 @@
 """
 七圣召唤游戏核心数据模型
+
+运行时模型使用 __slots__，实例没有 __dict__，引擎用到的所有属性都需要在这里声明。
 """
+import random
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
+from models.dice import DicePool
+from models.game_log import GameLog
 from models.enums import ElementType, CardType, GamePhase, SkillType, CharacterStatus, DamageType, PlayerAction
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Card:
     """
     基础卡牌类
@@ -20,7 +25,7 @@ class Card:
     character_subtype: Optional[str] = None  # 如果是角色牌的装备牌，关联对应的角色名称
 
 
-@dataclass
+@dataclass(slots=True)
 class CharacterCard(Card):
     """
     角色卡牌类，继承自 Card
@@ -41,14 +46,16 @@ class CharacterCard(Card):
     character_statuses: List[Dict[str, Any]] = field(default_factory=list)  # 角色状态
     is_alive: bool = True  # 是否存活
     shield: int = 0  # 护盾值
+    max_shield: int = 2  # 护盾上限
     survive_at_hp: bool = False  # 免于被击倒机制
+    has_full_stomach: bool = False  # 是否处于饱腹状态（本回合不能再食用料理）
     
     def __post_init__(self):
         """初始化后设置card_type为角色卡"""
         self.card_type = CardType.CHARACTER
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerState:
     """
     玩家状态类
@@ -57,7 +64,7 @@ class PlayerState:
     characters: List[CharacterCard] = field(default_factory=list)  # 角色列表
     active_character_index: int = 0  # 当前出战角色索引
     hand_cards: List[Card] = field(default_factory=list)  # 手牌
-    dice: List[ElementType] = field(default_factory=list)  # 当前骰子
+    dice: DicePool = field(default_factory=DicePool)  # 当前骰子（兼容直接赋值为列表）
     deck: List[Card] = field(default_factory=list)  # 牌库
     supports: List[Dict[str, Any]] = field(default_factory=list)  # 支援牌
     summons: List[Dict[str, Any]] = field(default_factory=list)  # 召唤物
@@ -76,9 +83,11 @@ class PlayerState:
     # 特殊状态
     is_quick_action: bool = True  # 是否为快速行动
     plunge_attack_available: bool = False  # 下落攻击是否可用
+    used_legacy_card: bool = False  # 本局是否已使用秘传卡
+    used_recharge_food_this_round: bool = False  # 本回合是否已使用复苏料理
 
 
-@dataclass
+@dataclass(slots=True)
 class GameState:
     """
     游戏状态类
@@ -89,7 +98,7 @@ class GameState:
     phase: GamePhase = GamePhase.ROLL_PHASE  # 当前阶段
     round_actions: int = 0  # 当前回合行动次数
     max_round_actions: int = 1  # 最大回合行动次数
-    game_log: List[str] = field(default_factory=list)  # 游戏日志
+    game_log: GameLog = field(default_factory=GameLog)  # 游戏日志（结构化事件，有上限）
     is_game_over: bool = False  # 游戏是否结束
     winner: Optional[str] = None  # 获胜玩家ID
     # 新增属性
@@ -104,9 +113,17 @@ class GameState:
     can_replace_initial_cards: bool = True  # 是否可以替换初始手牌
     # 其他特殊机制
     dice_omni_count: int = 0  # 万能元素骰数量
+    # 随机数（投骰、抽取初始手牌），同一种子的对局可以完整复现
+    seed: Optional[int] = None  # 随机种子
+    rng: random.Random = field(default_factory=random.Random, repr=False, compare=False)  # 本局独立的随机数生成器
+
+    def __post_init__(self):
+        """兼容以文本列表传入的游戏日志"""
+        if not isinstance(self.game_log, GameLog):
+            self.game_log = GameLog(self.game_log)
 
 
-@dataclass
+@dataclass(slots=True)
 class Skill:
     """
     技能类
@@ -4,6 +4,16 @@
 
 import os
 import sys
+
+# 使用 eventlet/gevent 异步模式时，需要在导入其他模块之前替换标准库的阻塞调用
+ASYNC_MODE = os.environ.get("SOCKETIO_ASYNC_MODE")
+if ASYNC_MODE == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
 from app import create_app, db, socketio
 from models.db_models import User
 
@@ -0,0 +1,144 @@
+"""
+卡牌目录测试
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from api.deck_builder import card_catalog
+from api.deck_builder.card_catalog import (
+    CardCatalog,
+    _CatalogHolder,
+    card_matches_tag,
+    card_total_cost,
+    load_card_data,
+)
+from api.deck_builder.search_index import card_search_fields, split_search_terms
+
+
+class TestCardCatalog(unittest.TestCase):
+    """测试卡牌目录的倒排索引"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cards = load_card_data()
+        cls.catalog = CardCatalog(cls.cards)
+
+    def test_type_filter(self):
+        """测试按类型过滤"""
+        ids = self.catalog.filter_ids(card_type='角色牌')
+        self.assertTrue(ids)
+        self.assertTrue(all(self.cards[i]['type'] == '角色牌' for i in ids))
+
+        non_character_ids = self.catalog.filter_ids(card_type='非角色牌')
+        self.assertEqual(len(ids) + len(non_character_ids), len(self.cards))
+
+    def test_character_attribute_filter_keeps_action_cards(self):
+        """国家过滤只作用于角色牌"""
+        ids = self.catalog.filter_ids(country='蒙德')
+        for i in ids:
+            card = self.cards[i]
+            if card['type'] == '角色牌':
+                self.assertEqual(card['country'], '蒙德')
+        self.assertTrue(self.catalog.non_character_ids <= ids)
+
+    def test_cost_and_tag_filter_matches_scan(self):
+        """索引结果与逐张扫描结果一致"""
+        ids = self.catalog.filter_ids(card_type='非角色牌', cost='2', tags=['料理', '场地'])
+        expected = {
+            i for i, card in enumerate(self.cards)
+            if card['type'] != '角色牌'
+            and card_total_cost(card) == 2
+            and (card_matches_tag(card, '料理') or card_matches_tag(card, '场地'))
+        }
+        self.assertEqual(ids, expected)
+
+    def test_unknown_tag(self):
+        """未建立索引的标签按需扫描"""
+        ids = self.catalog.filter_ids(tags=['单手剑'])
+        self.assertTrue(ids)
+        self.assertEqual(ids, self.catalog.filter_ids(tags=['单手剑']))
+
+
+class TestCardSearchIndex(unittest.TestCase):
+    """测试全文搜索索引"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cards = load_card_data()
+        cls.index = CardCatalog(cls.cards).search_index
+
+    def _scan(self, terms):
+        return {
+            i for i, card in enumerate(self.cards)
+            if all(any(term in text for _, text in card_search_fields(card)) for term in terms)
+        }
+
+    def test_search_matches_scan(self):
+        """索引搜索结果与逐张子串扫描一致"""
+        for search in ['充能', '天赋 舍弃', '冰元素伤害', '手牌 夜魂值', '「', 'a', '不存在的关键字']:
+            terms = split_search_terms(search)
+            self.assertEqual(set(self.index.search(terms)), self._scan(terms), search)
+
+    def test_name_match_ranked_first(self):
+        """名称匹配的卡牌排在描述匹配之前"""
+        result = self.index.search(['迪卢克'])
+        self.assertTrue(result)
+        self.assertEqual(self.cards[result[0]]['name'], '迪卢克')
+
+    def test_search_within_candidates(self):
+        """只在给定候选集合中搜索"""
+        within = list(range(10))
+        result = self.index.search(['的'], within=within)
+        self.assertTrue(set(result) <= set(within))
+
+    def test_suggest_prefix(self):
+        """前缀补全"""
+        result = self.index.suggest('迪', limit=3)
+        self.assertEqual(len(result), 3)
+        self.assertTrue(all(self.cards[i]['name'].startswith('迪') for i in result))
+
+
+class TestCatalogReload(unittest.TestCase):
+    """测试数据文件修改后重新加载"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.events_file = os.path.join(self.temp_dir, 'events.json')
+        self._write_events([{'name': '测试事件', 'type': '测试事件', 'subtype': '事件牌', 'skills': []}])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write_events(self, events):
+        with open(self.events_file, 'w', encoding='utf-8') as f:
+            json.dump(events, f, ensure_ascii=False)
+
+    def test_reload_on_mtime_change(self):
+        """修改时间变化时重新构建目录"""
+        original_interval = card_catalog.RELOAD_CHECK_INTERVAL
+        card_catalog.RELOAD_CHECK_INTERVAL = 0
+        try:
+            holder = _CatalogHolder(self.temp_dir)
+            first = holder.get()
+            self.assertEqual(len(first.cards), 1)
+            self.assertIs(holder.get(), first)
+
+            self._write_events([
+                {'name': '测试事件', 'type': '测试事件', 'subtype': '事件牌', 'skills': []},
+                {'name': '新事件', 'type': '新事件', 'subtype': '事件牌', 'skills': []},
+            ])
+            stat = os.stat(self.events_file)
+            os.utime(self.events_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+            second = holder.get()
+            self.assertIsNot(second, first)
+            self.assertEqual(len(second.cards), 2)
+        finally:
+            card_catalog.RELOAD_CHECK_INTERVAL = original_interval
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+共享卡牌定义测试
+"""
+import json
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+
+from game_engine.card_library import CardLibrary
+from game_engine.card_registry import CardRegistry
+from models.enums import CardType, ElementType
+from models.game_models import Card, CharacterCard
+
+
+def make_db_card(card_id, card_type='事件牌', **fields):
+    data = {
+        'id': card_id, 'name': card_id, 'card_type': card_type, 'cost': json.dumps(['火', '同色']),
+        'description': '测试', 'character_subtype': None, 'element_type': None, 'health': 10,
+        'max_health': 10, 'energy': 0, 'max_energy': 3, 'weapon_type': '', 'skills': None,
+    }
+    data.update(fields)
+    return SimpleNamespace(**data)
+
+
+class TestCardRegistry(unittest.TestCase):
+    """测试卡牌定义登记"""
+
+    def test_definition_rebuilt_on_version_change(self):
+        registry = CardRegistry()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return Card(id='a', name='a', card_type=CardType.EVENT, cost=[])
+
+        first = registry.definition('a', 1, factory)
+        self.assertIs(registry.definition('a', 1, factory), first)
+        self.assertEqual(len(calls), 1)
+        self.assertIsNot(registry.definition('a', 2, factory), first)
+        registry.invalidate('a')
+        self.assertNotIn('a', registry)
+
+    def test_catalog_change_clears_definitions(self):
+        registry = CardRegistry()
+
+        def factory():
+            return Card(id='a', name='a', card_type=CardType.EVENT, cost=[])
+
+        registry.use_catalog((1, None))
+        first = registry.definition('a', 1, factory)
+        registry.definition('deleted', 1, factory)
+
+        registry.use_catalog((1, None))
+        self.assertIs(registry.definition('a', 1, factory), first)
+        registry.use_catalog((2, None))
+        self.assertEqual(len(registry), 0)
+        self.assertIsNot(registry.definition('a', 1, factory), first)
+
+    def test_character_instances_share_definition_data(self):
+        definition = CharacterCard(id='c', name='c', card_type=CardType.CHARACTER, cost=[],
+                                   skills=[{'id': 's', 'cost': []}])
+        first = CardRegistry.instance(definition)
+        second = CardRegistry.instance(definition)
+        self.assertIsNot(first, second)
+        self.assertIs(first.skills, definition.skills)
+        first.health = 3
+        first.character_statuses.append({'name': 'Frozen'})
+        self.assertEqual(second.health, 10)
+        self.assertEqual(definition.character_statuses, [])
+
+
+class TestSharedDeckCards(unittest.TestCase):
+    """测试对局卡组使用共享定义"""
+
+    def test_convert_db_cards(self):
+        import app  # noqa: F401  数据库模型在创建应用时初始化，之后才能导入API模块
+        from api.local_game import convert_db_cards_to_game_cards
+
+        rows = [
+            make_db_card('registry_character', '角色牌', skills=json.dumps([{'id': 's1', 'cost': ['同色']}])),
+            make_db_card('registry_event'),
+        ]
+        first = convert_db_cards_to_game_cards(rows)
+        second = convert_db_cards_to_game_cards(rows)
+
+        self.assertIs(first[1], second[1])
+        self.assertIsNot(first[0], second[0])
+        self.assertIs(first[0].skills, second[0].skills)
+        self.assertIs(first[0].name, second[0].name)
+
+        # 卡牌数据变化后重新构建定义
+        rows[1] = make_db_card('registry_event', description='新描述')
+        self.assertEqual(convert_db_cards_to_game_cards(rows)[1].description, '新描述')
+
+    def test_definitions_keyed_by_updated_at(self):
+        import app  # noqa: F401
+        from api.local_game import convert_db_cards_to_game_cards
+
+        row = make_db_card('registry_updated', updated_at=datetime(2024, 1, 1))
+        first = convert_db_cards_to_game_cards([row])[0]
+        self.assertEqual(first.cost, (ElementType.PYRO, ElementType.SAME))
+
+        # updated_at 未变化时直接使用缓存的定义，不再解析JSON
+        row.cost = 'not json'
+        self.assertIs(convert_db_cards_to_game_cards([row])[0], first)
+
+        row = make_db_card('registry_updated', cost=json.dumps(['万能']), updated_at=datetime(2024, 1, 2))
+        self.assertEqual(convert_db_cards_to_game_cards([row])[0].cost, (ElementType.OMNI,))
+
+    def test_card_library_decks(self):
+        library = CardLibrary()
+        name = sorted(library.characters)[0]
+        deck1 = library.build_deck([name], [])
+        deck2 = library.build_deck([name], [])
+        self.assertIsNot(deck1[0], deck2[0])
+        self.assertIsNot(deck1[0], library.characters[name])
+        self.assertIs(deck1[0].skills, deck2[0].skills)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+卡牌列表响应缓存测试
+"""
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from api.catalog_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """测试LRU响应缓存"""
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(maxsize=2)
+        cache.put('a', b'1')
+        cache.put('b', b'2')
+        self.assertEqual(cache.get('a'), b'1')
+        cache.put('c', b'3')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'1')
+        self.assertEqual(len(cache), 2)
+
+
+class TestCatalogResponses(unittest.TestCase):
+    """测试卡牌列表接口的缓存和条件请求"""
+
+    def setUp(self):
+        from flask_jwt_extended import create_access_token
+        from app import app
+        from api import cards, catalog_cache
+
+        self.client = app.test_client()
+        with app.app_context():
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity="catalog_user")}'}
+
+        self.version = (3, datetime(2024, 1, 1))
+        self.build = mock.Mock(return_value={'cards': [{'id': 'c1', 'name': '测试'}], 'total': 1})
+        patches = [
+            mock.patch.object(catalog_cache, '_load_catalog_version', side_effect=lambda: self.version),
+            mock.patch.object(catalog_cache, 'VERSION_CHECK_INTERVAL', 0),
+            mock.patch.object(cards, '_build_all_cards', self.build),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        catalog_cache.catalog_version.invalidate()
+        catalog_cache.response_cache.clear()
+
+    def test_repeat_request_served_from_cache(self):
+        first = self.client.get('/api/cards?page=1', headers=self.headers)
+        second = self.client.get('/api/cards?page=1', headers=self.headers)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json()['cards'][0]['name'], '测试')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(self.build.call_count, 1)
+
+        self.client.get('/api/cards?page=2', headers=self.headers)
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_conditional_get(self):
+        first = self.client.get('/api/cards', headers=self.headers)
+        etag = first.headers['ETag']
+        self.assertIn('Last-Modified', first.headers)
+
+        self.build.reset_mock()
+        not_modified = self.client.get('/api/cards', headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.data, b'')
+        self.build.assert_not_called()
+
+    def test_version_bump_invalidates(self):
+        etag = self.client.get('/api/cards', headers=self.headers).headers['ETag']
+        self.version = (4, datetime(2024, 1, 2))
+        response = self.client.get('/api/cards', headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_errors_not_cached(self):
+        self.build.side_effect = RuntimeError('db error')
+        response = self.client.get('/api/cards', headers=self.headers)
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('error', response.get_json())
+
+
+class TestKeysetPagination(unittest.TestCase):
+    """测试卡牌列表的键集分页（使用开发数据库中的卡牌，只读）"""
+
+    def setUp(self):
+        import app as app_module
+        import models.db_models as db_models
+        from app import app
+        from api import cards
+
+        if db_models.db is not app_module.db:
+            self.skipTest('数据库模型已被其他测试绑定到另一个 SQLAlchemy 实例')
+        self.app = app
+        self.cards = cards
+        self.context = app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+
+    def _get(self, build, query):
+        with self.app.test_request_context(f'/api/cards?{query}'):
+            return build()
+
+    def test_cursor_pages_cover_all_cards(self):
+        from models.db_models import CardData
+
+        ids = []
+        page = self._get(self.cards._build_character_cards, 'per_page=7&cursor=')
+        while True:
+            ids.extend(card['id'] for card in page['cards'])
+            if page['next_cursor'] is None:
+                break
+            page = self._get(self.cards._build_character_cards, f"per_page=7&cursor={page['next_cursor']}")
+
+        expected = [card.id for card in CardData.query.filter(CardData.card_type == '角色牌').order_by(CardData.id)]
+        self.assertEqual(ids, expected)
+        self.assertEqual(page['total'], len(expected))
+
+    def test_offset_pages_use_catalog_counts(self):
+        from models.db_models import CardData
+
+        page = self._get(self.cards._build_all_cards, 'type=事件牌&per_page=10&page=2')
+        total = CardData.query.filter(CardData.card_type == '事件牌').count()
+        self.assertEqual(page['total'], total)
+        self.assertEqual(page['pages'], -(-total // 10))
+        self.assertEqual(page['current_page'], 2)
+        self.assertEqual(len(page['cards']), min(10, max(total - 10, 0)))
+
+    def test_per_page_limits(self):
+        """页码分页的 per_page 没有上限，键集分页每页最多 MAX_PER_PAGE 张，小于1时按默认值"""
+        from models.db_models import CardData
+
+        total = CardData.query.count()
+        page = self._get(self.cards._build_all_cards, 'per_page=500')
+        self.assertEqual(len(page['cards']), min(500, total))
+        self.assertEqual(page['pages'], -(-total // 500))
+
+        page = self._get(self.cards._build_all_cards, 'per_page=500&cursor=')
+        self.assertEqual(page['per_page'], self.cards.MAX_PER_PAGE)
+        self.assertEqual(len(page['cards']), min(self.cards.MAX_PER_PAGE, total))
+
+        for per_page in (0, -5):
+            page = self._get(self.cards._build_all_cards, f'per_page={per_page}')
+            self.assertEqual(len(page['cards']), min(self.cards.DEFAULT_PER_PAGE, total))
+            self.assertEqual(page['pages'], -(-total // self.cards.DEFAULT_PER_PAGE))
+            page = self._get(self.cards._build_all_cards, f'per_page={per_page}&cursor=')
+            self.assertEqual(page['per_page'], self.cards.DEFAULT_PER_PAGE)
+
+
+if __name__ == '__main__':
+    unittest.main()
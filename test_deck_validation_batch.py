@@ -0,0 +1,129 @@
+"""
+卡组规则标记和批量验证测试
+"""
+import unittest
+from unittest import mock
+
+from game_engine.deck_validation import DeckValidationSystem, compile_card_rule
+from models.enums import CardType
+from utils.deck_validator import card_from_dict, validate_deck_api, validate_deck_batch_api, validate_deck_composition
+
+
+class TestCardRules(unittest.TestCase):
+    """测试卡牌构筑规则标记"""
+
+    def test_rule_flags(self):
+        self.assertTrue(compile_card_rule('秘传：测试', CardType.EVENT, None).is_legacy)
+
+        talent = compile_card_rule('天赋牌', CardType.TALENT, '迪卢克')
+        self.assertTrue(talent.is_talent)
+        self.assertEqual(talent.talent_for, '迪卢克')
+
+        resonance = compile_card_rule('元素共鸣：交织之火', CardType.EVENT, None)
+        self.assertTrue(resonance.is_resonance)
+        self.assertEqual(resonance.resonance_element, '火')
+
+        nation = compile_card_rule('国家：璃月', '事件牌', None)
+        self.assertEqual((nation.is_nation, nation.nation), (True, '璃月'))
+
+        plain = compile_card_rule('普通卡牌', CardType.EVENT, None)
+        self.assertFalse(plain.is_legacy or plain.is_talent or plain.is_resonance or plain.is_nation)
+
+    def test_rule_cached(self):
+        self.assertIs(compile_card_rule('元素共鸣：交织之水', CardType.EVENT, None),
+                      compile_card_rule('元素共鸣：交织之水', CardType.EVENT, None))
+
+
+class TestValidateDeckBatch(unittest.TestCase):
+    """测试批量验证"""
+
+    def setUp(self):
+        self.cards_by_id = {
+            'a': {'id': 'a', 'name': '卡牌A', 'card_type': '事件牌', 'cost': []},
+            'b': {'id': 'b', 'name': '元素共鸣：交织之火', 'card_type': '事件牌', 'cost': []},
+        }
+
+    def test_matches_single_validation(self):
+        decks = [['a', 'a', 'a'], ['a', 'b', 'missing'], []]
+        results = validate_deck_batch_api(self.cards_by_id, decks)
+        self.assertEqual(len(results), 3)
+        for card_ids, result in zip(decks, results):
+            expected = validate_deck_api([self.cards_by_id[i] for i in card_ids if i in self.cards_by_id])
+            self.assertEqual(result, expected)
+
+        self.assertIn('卡牌「卡牌A」超过2张限制，当前为3张', results[0]['errors'])
+        self.assertTrue(any('元素共鸣牌' in error for error in results[1]['errors']))
+
+
+class TestValidateDeckComposition(unittest.TestCase):
+    """测试按卡牌ID验证卡组构成"""
+
+    def setUp(self):
+        from api import catalog_cache
+
+        character = card_from_dict({'id': 'c', 'name': '角色甲', 'card_type': '角色牌'})
+        action = card_from_dict({'id': 'a', 'name': '卡牌A', 'card_type': '事件牌'})
+        self.cards = {'c': character, '角色甲': character, 'a': action, '卡牌A': action}
+        patch = mock.patch.object(catalog_cache.validation_cards, 'get', return_value=self.cards)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_counts_repeated_ids(self):
+        result = validate_deck_composition({'character_ids': ['c', 'missing'], 'card_ids': ['a', '卡牌A', 'a', 'c']})
+        expected = DeckValidationSystem().validate_deck([self.cards['c']] * 2 + [self.cards['a']] * 3)
+        self.assertEqual(result, expected)
+        self.assertIn('角色卡应为3张，当前为2张', result['errors'])
+        self.assertIn('卡牌「卡牌A」超过2张限制，当前为3张', result['errors'])
+
+    def test_empty_deck(self):
+        result = validate_deck_composition({'name': '空卡组'})
+        self.assertIn('卡组总数应为33张，当前为0张', result['errors'])
+
+
+class TestValidateDeckBatchEndpoint(unittest.TestCase):
+    """测试批量验证接口的参数检查"""
+
+    def setUp(self):
+        from flask_jwt_extended import create_access_token
+        from app import app
+
+        self.client = app.test_client()
+        with app.app_context():
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity="batch_user")}'}
+
+    def test_rejects_invalid_body(self):
+        response = self.client.post('/api/decks/validate-batch', json={'decks': 'x'}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/decks/validate-batch', json={'decks': [{'cards': 'x'}]},
+                                    headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_oversized_batch(self):
+        from api.cards import MAX_VALIDATE_BATCH_SIZE
+
+        response = self.client.post('/api/decks/validate-batch',
+                                    json={'decks': [[]] * (MAX_VALIDATE_BATCH_SIZE + 1)}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_single_deck_counts_repeated_ids(self):
+        """单个卡组验证和批量验证一样按出现次数计算重复的卡牌ID"""
+        from types import SimpleNamespace
+        from api import cards
+
+        row = SimpleNamespace(id='a', name='卡牌A', card_type='事件牌', cost=[], description='',
+                              character_subtype=None)
+        card_data = mock.MagicMock()
+        card_data.query.filter.return_value.all.return_value = [row]
+        with mock.patch.object(cards, 'CardData', card_data):
+            single = self.client.post('/api/decks/validate', json={'cards': ['a', 'a', 'a', 'missing']},
+                                      headers=self.headers).get_json()
+            batch = self.client.post('/api/decks/validate-batch', json={'decks': [['a', 'a', 'a', 'missing']]},
+                                     headers=self.headers).get_json()
+
+        self.assertIn('卡牌「卡牌A」超过2张限制，当前为3张', single['errors'])
+        self.assertEqual(single, {key: value for key, value in batch['results'][0].items() if key != 'id'})
+
+
+if __name__ == '__main__':
+    unittest.main()
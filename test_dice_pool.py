@@ -0,0 +1,85 @@
+"""
+骰池和费用求解测试
+"""
+import itertools
+import random
+import unittest
+
+from models.dice import DICE_SLOTS, DicePool, enumerate_payments
+from models.enums import ElementType
+
+E = ElementType
+
+
+def brute_force_payable(dice, cost, active_element):
+    """逐个排列尝试分配骰子，用于验证求解器"""
+    for order in itertools.permutations(range(len(dice)), len(cost)):
+        if all(_die_pays(dice[i], required, active_element) for i, required in zip(order, cost)):
+            return True
+    return False
+
+
+def _die_pays(die, required, active_element):
+    if die == E.OMNI:
+        return True
+    if required == E.OMNI:
+        return False
+    if required == E.CRYSTAL:
+        return True
+    if required == E.SAME:
+        return die == active_element
+    return die == required
+
+
+class TestDicePool(unittest.TestCase):
+    """测试骰池的列表兼容接口"""
+
+    def test_list_compatibility(self):
+        pool = DicePool([E.PYRO, E.OMNI, E.HYDRO])
+        self.assertEqual(len(pool), 3)
+        self.assertEqual(list(pool), [E.OMNI, E.HYDRO, E.PYRO])
+        self.assertIn(E.HYDRO, pool)
+        self.assertEqual(pool[0], E.OMNI)
+        pool[0] = E.CRYO
+        self.assertNotIn(E.OMNI, pool)
+        pool.remove(E.CRYO)
+        self.assertEqual(pool, [E.PYRO, E.HYDRO])
+        self.assertEqual(pool.pop(), E.PYRO)
+        with self.assertRaises(ValueError):
+            pool.remove(E.GEO)
+
+    def test_pay_is_atomic(self):
+        """无法支付时骰子不变"""
+        pool = DicePool([E.PYRO, E.HYDRO])
+        self.assertIsNone(pool.pay([E.PYRO, E.PYRO], E.PYRO))
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.pay([E.SAME, E.CRYSTAL], E.PYRO), [E.HYDRO, E.PYRO])
+        self.assertEqual(len(pool), 0)
+
+    def test_solver_prefers_non_active_dice_for_any_cost(self):
+        pool = DicePool([E.PYRO, E.PYRO, E.HYDRO, E.OMNI])
+        self.assertEqual(pool.pay([E.CRYSTAL], E.PYRO), [E.HYDRO])
+
+    def test_solver_matches_brute_force(self):
+        """求解结果与穷举分配一致"""
+        rng = random.Random(7)
+        cost_types = [E.OMNI, E.CRYSTAL, E.SAME, E.PYRO, E.HYDRO]
+        for _ in range(400):
+            dice = [rng.choice(DICE_SLOTS) for _ in range(rng.randint(0, 6))]
+            cost = [rng.choice(cost_types) for _ in range(rng.randint(0, 4))]
+            pool = DicePool(dice)
+            expected = brute_force_payable(dice, cost, E.PYRO)
+            self.assertEqual(pool.can_pay(cost, E.PYRO), expected, (dice, cost))
+            self.assertEqual(bool(enumerate_payments(pool.counts, cost, E.PYRO)), expected, (dice, cost))
+
+    def test_payment_options(self):
+        pool = DicePool([E.PYRO, E.HYDRO, E.OMNI])
+        options = pool.payment_options([E.PYRO, E.CRYSTAL], E.PYRO)
+        self.assertEqual(options[0], [E.HYDRO, E.PYRO])
+        self.assertEqual(sorted(map(tuple, options), key=str), sorted(map(tuple, [
+            [E.HYDRO, E.PYRO], [E.OMNI, E.PYRO], [E.OMNI, E.HYDRO],
+        ]), key=str))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -47,6 +47,53 @@ class TestElementReactionSystem(unittest.TestCase):
         # 测试非反应伤害
         final_damage, effect_info = self.reaction_system.calculate_reaction_damage(3, "None")
         self.assertEqual(final_damage, 3)
+    
+    def test_shared_frozen_tables(self):
+        """测试反应表只读且所有引擎共享同一个反应系统"""
+        from game_engine.element_reactions import REACTIONS, element_reaction_system
+        
+        with self.assertRaises(TypeError):
+            REACTIONS[(ElementType.GEO, ElementType.PYRO)] = "Crystallize"
+        for (existing, incoming), reaction in REACTIONS.items():
+            self.assertEqual(REACTIONS[(incoming, existing)], reaction)
+        self.assertIs(GameEngine().element_reaction_system, element_reaction_system)
+        self.assertIs(GameEngine().deck_validation_system, GameEngine().deck_validation_system)
+    
+    def test_reaction_table(self):
+        """测试按元素序号索引的反应表与反应映射一致"""
+        from game_engine.element_reactions import REACTION_TABLE, REACTIONS
+        
+        self.assertEqual(len(REACTION_TABLE), len(ElementType))
+        for existing in ElementType:
+            for incoming in ElementType:
+                reaction = REACTION_TABLE[existing.ordinal][incoming.ordinal]
+                self.assertEqual(reaction and reaction.name, REACTIONS.get((existing, incoming)))
+        
+        # 返回的效果字典是模板的副本
+        _, effect_info = self.reaction_system.calculate_reaction_damage(3, "Burning")
+        effect_info["duration"] = 99
+        self.assertEqual(self.reaction_system.calculate_reaction_damage(3, "Burning")[1]["duration"], 2)
+    
+    def test_resolve_batch(self):
+        """测试批量结算与逐次结算的结果一致"""
+        import random
+        
+        def characters():
+            return [CharacterCard(id=str(i), name=str(i), card_type=CardType.CHARACTER, cost=[]) for i in range(3)]
+        
+        rng = random.Random(3)
+        hits = [(rng.randrange(3), rng.choice(list(ElementType)), rng.randint(1, 4)) for _ in range(300)]
+        
+        batch_targets = characters()
+        results = self.reaction_system.resolve_batch((batch_targets[i], element, damage) for i, element, damage in hits)
+        
+        targets = characters()
+        for (i, element, damage), (reaction, final_damage) in zip(hits, results):
+            reaction_type, _ = self.reaction_system.handle_element_attachment(targets[i], element)
+            expected = self.reaction_system.calculate_reaction_damage(damage, reaction_type)[0] if reaction_type else damage
+            self.assertEqual(reaction and reaction.name, reaction_type)
+            self.assertEqual(final_damage, expected)
+        self.assertEqual([c.element_attached for c in batch_targets], [c.element_attached for c in targets])
 
 
 class TestDeckValidationSystem(unittest.TestCase):
@@ -0,0 +1,78 @@
+"""
+结构化游戏日志测试
+"""
+import pickle
+import unittest
+
+from game_engine.core import GameEngine
+from game_engine.snapshot import clone_game_state
+from models.enums import LogEventType, PlayerAction
+from models.game_log import GameLog
+from models.game_models import GameState
+from test_game_snapshot import create_test_deck
+
+
+class TestGameLog(unittest.TestCase):
+    """测试日志缓冲区"""
+
+    def test_events_and_render(self):
+        game_log = GameLog()
+        event = game_log.append(LogEventType.USE_SKILL, 'player1', skill='普通攻击')
+        self.assertEqual(event.seq, 1)
+        self.assertEqual(event.to_dict(), {'seq': 1, 'type': 'USE_SKILL', 'actor': 'player1',
+                                           'params': {'skill': '普通攻击'}})
+        self.assertEqual(event.render(), '玩家 player1 使用了技能 普通攻击')
+
+        game_log.append('自定义日志')
+        self.assertIn('自定义日志', game_log)
+        self.assertEqual(game_log[-1].type, LogEventType.TEXT)
+
+    def test_ring_buffer_and_pages(self):
+        game_log = GameLog(max_events=5)
+        for round_number in range(12):
+            game_log.append(LogEventType.ROUND_START, round=round_number)
+        self.assertEqual(len(game_log), 5)
+        self.assertEqual(game_log.seq, 12)
+        self.assertEqual(game_log.first_seq, 8)
+        self.assertEqual([event.seq for event in game_log.after(0, 2)], [8, 9])
+        self.assertEqual([event.seq for event in game_log.after(9)], [10, 11, 12])
+        self.assertEqual(game_log.after(12), [])
+
+    def test_copy_and_pickle(self):
+        game_log = GameLog(['开始'], max_events=3)
+        cloned = game_log.copy()
+        cloned.append(LogEventType.END_TURN, 'player1')
+        self.assertEqual(len(game_log), 1)
+        restored = pickle.loads(pickle.dumps(cloned))
+        self.assertEqual(restored, cloned)
+        self.assertEqual(restored.events.maxlen, 3)
+
+    def test_game_state_accepts_text_list(self):
+        game_state = GameState(game_log=['游戏开始'])
+        self.assertIsInstance(game_state.game_log, GameLog)
+        self.assertEqual(game_state.game_log.render(), ['游戏开始'])
+
+
+class TestEngineLog(unittest.TestCase):
+    """测试引擎记录结构化日志"""
+
+    def test_engine_events(self):
+        engine = GameEngine()
+        game_id = engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=2)
+        engine.process_action(game_id, "player1", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        game_state = engine.get_game_state(game_id)
+        event = game_state.game_log[-1]
+        self.assertEqual(event.type, LogEventType.REPLACE_CARDS)
+        self.assertEqual(event.actor, "player1")
+        self.assertEqual(event.params, {'count': 0})
+
+        forked = clone_game_state(game_state)
+        forked.game_log.append(LogEventType.END_TURN, "player2")
+        self.assertEqual(game_state.game_log.seq + 1, forked.game_log.seq)
+
+        record = engine.get_game_record(game_id)
+        self.assertEqual(record['game_log'][-1]['type'], 'REPLACE_CARDS')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+对局随机种子测试
+"""
+import random
+import unittest
+
+from game_engine.core import GameEngine
+from models.enums import PlayerAction
+from test_game_snapshot import create_test_deck
+
+
+class TestGameSeed(unittest.TestCase):
+    """测试同一种子的对局可以复现"""
+
+    def setUp(self):
+        self.engine = GameEngine()
+
+    def _play_to_action_phase(self, seed):
+        game_id = self.engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=seed)
+        self.engine.process_action(game_id, "player1", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        self.engine.process_action(game_id, "player2", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        self.engine.process_action(game_id, "player2", PlayerAction.PASS, {})
+        return self.engine.get_game_state(game_id)
+
+    def test_same_seed_same_game(self):
+        """相同种子得到相同的初始手牌和骰子，且不受全局随机数影响"""
+        first = self._play_to_action_phase(42)
+        random.random()
+        second = self._play_to_action_phase(42)
+
+        self.assertEqual(first.seed, 42)
+        for first_player, second_player in zip(first.players, second.players):
+            self.assertEqual([card.id for card in first_player.hand_cards],
+                             [card.id for card in second_player.hand_cards])
+            self.assertEqual(first_player.dice, second_player.dice)
+
+    def test_seed_generated_when_missing(self):
+        """未指定种子时生成并记录种子"""
+        game_id = self.engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck())
+        self.assertIsNotNone(self.engine.get_game_state(game_id).seed)
+        self.assertEqual(self.engine.get_game_record(game_id)['seed'], self.engine.get_game_state(game_id).seed)
+
+
+if __name__ == '__main__':
+    unittest.main()
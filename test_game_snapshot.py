@@ -0,0 +1,136 @@
+"""
+游戏状态快照测试
+"""
+import unittest
+from typing import List
+
+from game_engine.core import GameEngine
+from models.game_models import Card, CharacterCard
+from models.enums import ElementType, CardType, PlayerAction
+
+
+def create_test_deck() -> List[Card]:
+    """创建测试卡组（3角色+30行动牌）"""
+    deck = []
+    for i in range(3):
+        deck.append(CharacterCard(
+            id=f"char_{i}",
+            name=f"角色_{i}",
+            card_type=CardType.CHARACTER,
+            cost=[],
+            element_type=ElementType.PYRO,
+            skills=[{"id": f"skill_{i}", "name": f"技能_{i}", "cost": [ElementType.SAME], "damage": 1}]
+        ))
+    for i in range(30):
+        deck.append(Card(
+            id=f"event_{i}",
+            name=f"事件_{i}",
+            card_type=CardType.EVENT,
+            cost=[ElementType.OMNI]
+        ))
+    return deck
+
+
+class TestGameSnapshot(unittest.TestCase):
+    """测试快照、恢复和分支"""
+
+    def setUp(self):
+        self.engine = GameEngine()
+        self.game_id = self.engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck())
+
+    def test_snapshot_is_independent(self):
+        """修改游戏后快照保持不变"""
+        snapshot = self.engine.snapshot(self.game_id)
+        game_state = self.engine.get_game_state(self.game_id)
+
+        character = game_state.players[1].characters[0]
+        character.health -= 3
+        character.character_statuses.append({'name': 'Burn', 'duration': 2})
+        game_state.players[0].hand_cards.pop()
+        game_state.game_log.append("测试日志")
+
+        snapshot_character = snapshot.players[1].characters[0]
+        self.assertEqual(snapshot_character.health, 10)
+        self.assertEqual(snapshot_character.character_statuses, [])
+        self.assertEqual(len(snapshot.players[0].hand_cards), 5)
+        self.assertNotIn("测试日志", snapshot.game_log)
+        # 不可变的技能定义在分支之间共享
+        self.assertIs(snapshot_character.skills, character.skills)
+
+    def test_status_dicts_are_copied(self):
+        """状态字典原地修改不影响快照"""
+        game_state = self.engine.get_game_state(self.game_id)
+        game_state.players[0].characters[0].character_statuses.append({'name': 'Burn', 'duration': 2})
+        snapshot = self.engine.snapshot(self.game_id)
+
+        game_state.players[0].characters[0].character_statuses[0]['duration'] -= 1
+        self.assertEqual(snapshot.players[0].characters[0].character_statuses[0]['duration'], 2)
+
+    def test_restore_for_undo(self):
+        """恢复快照实现撤销，快照可以重复使用"""
+        snapshot = self.engine.snapshot(self.game_id)
+        self.engine.process_action(self.game_id, "player1", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        self.assertNotEqual(self.engine.get_game_state(self.game_id).current_player_index, 0)
+
+        restored = self.engine.restore(self.game_id, snapshot)
+        self.assertEqual(restored.current_player_index, 0)
+        self.assertIsNot(restored, snapshot)
+
+        restored.round_number = 5
+        self.assertEqual(snapshot.round_number, 1)
+
+    def test_fork(self):
+        """分支游戏与原游戏互不影响"""
+        fork_id = self.engine.fork(self.game_id)
+        self.assertIsNotNone(fork_id)
+        self.assertNotEqual(fork_id, self.game_id)
+
+        self.engine.process_action(fork_id, "player1", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        self.assertTrue(self.engine.get_game_state(fork_id).players[0].has_card_replace_option_used)
+        self.assertFalse(self.engine.get_game_state(self.game_id).players[0].has_card_replace_option_used)
+
+    def test_fork_copies_rng(self):
+        """分支复制随机数状态，两边之后投出相同的骰子且互不影响"""
+        fork_id = self.engine.fork(self.game_id)
+        for game_id in (self.game_id, fork_id):
+            self.engine.process_action(game_id, "player1", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+            self.engine.process_action(game_id, "player2", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+            self.engine.process_action(game_id, "player2", PlayerAction.PASS, {})
+
+        self.assertEqual(self.engine.get_game_state(self.game_id).players[0].dice,
+                         self.engine.get_game_state(fork_id).players[0].dice)
+
+    def test_missing_game(self):
+        """不存在的游戏返回None"""
+        self.assertIsNone(self.engine.snapshot("missing"))
+        self.assertIsNone(self.engine.fork("missing"))
+
+
+class TestSlottedModels(unittest.TestCase):
+    """测试运行时模型使用 __slots__"""
+
+    def test_no_instance_dict(self):
+        engine = GameEngine()
+        game_id = engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=1)
+        game_state = engine.get_game_state(game_id)
+        for obj in (game_state, game_state.players[0], game_state.players[0].characters[0],
+                    game_state.players[0].hand_cards[0]):
+            self.assertFalse(hasattr(obj, '__dict__'), type(obj).__name__)
+        with self.assertRaises(AttributeError):
+            game_state.players[0].undeclared_flag = True
+
+    def test_snapshot_keeps_declared_flags(self):
+        engine = GameEngine()
+        game_id = engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=1)
+        game_state = engine.get_game_state(game_id)
+        game_state.players[0].used_legacy_card = True
+        game_state.players[0].characters[0].has_full_stomach = True
+        forked = engine.get_game_state(engine.fork(game_id))
+        self.assertTrue(forked.players[0].used_legacy_card)
+        self.assertTrue(forked.players[0].characters[0].has_full_stomach)
+        forked.players[0].characters[0].has_full_stomach = False
+        self.assertTrue(game_state.players[0].characters[0].has_full_stomach)
+
+
+if __name__ == '__main__':
+    unittest.main()
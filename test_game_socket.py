@@ -0,0 +1,140 @@
+"""
+对局实时通道测试
+"""
+import random
+import threading
+import time
+import unittest
+
+from game_engine.mcts import MCTSConfig, MCTSPlayer
+from test_game_snapshot import create_test_deck
+
+
+class TestGameSocket(unittest.TestCase):
+    """测试Socket.IO对局事件"""
+
+    def setUp(self):
+        from flask_jwt_extended import create_access_token
+        from app import app, socketio
+        from api import local_game
+
+        self.app = app
+        self.socketio = socketio
+        self.local_game = local_game
+        with app.app_context():
+            self.token = create_access_token(identity='socket_user')
+            self.other_token = create_access_token(identity='other_user')
+
+        self.game_id = local_game.game_engine.create_game_state(
+            'socket_user', local_game.AI_PLAYER_ID, create_test_deck(), create_test_deck(), seed=4
+        )
+        local_game.local_game_sessions[self.game_id] = {
+            'player_id': 'socket_user',
+            'opponent_type': 'ai',
+            'ai_player': MCTSPlayer(MCTSConfig(iterations=10, time_limit=0.5)),
+            'ai_rng': random.Random(4)
+        }
+        with local_game.game_engine.game_states.locked(self.game_id):
+            local_game.record_state_version(self.game_id, local_game.game_engine.get_game_state(self.game_id))
+
+    def tearDown(self):
+        self.local_game.local_game_sessions.pop(self.game_id, None)
+        self.local_game.game_engine.game_states.pop(self.game_id, None)
+
+    def _client(self, token):
+        return self.socketio.test_client(self.app, auth={'token': token})
+
+    @staticmethod
+    def _events(client, name):
+        return [event['args'][0] for event in client.get_received() if event['name'] == name]
+
+    def _wait_for_events(self, client, name, timeout=10):
+        """等待后台任务广播的事件"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            events = self._events(client, name)
+            if events:
+                return events
+            time.sleep(0.01)
+        self.fail(f'{timeout}秒内没有收到 {name}')
+
+    def test_rejects_invalid_token(self):
+        client = self._client('invalid')
+        self.assertFalse(client.is_connected())
+
+    def test_join_and_action_broadcast(self):
+        client = self._client(self.token)
+        watcher = self._client(self.token)
+        client.emit('joinGame', self.game_id)
+        watcher.emit('joinGame', {'gameId': self.game_id, 'knownVersion': 1})
+
+        joined = self._events(client, 'gameUpdate')
+        self.assertEqual(joined[0]['version'], 1)
+        self.assertEqual(joined[0]['changes'][0]['path'], '')
+        self.assertEqual(self._events(watcher, 'gameUpdate')[0]['changes'], [])
+
+        client.emit('gameAction', {'action_type': 'REPLACE_CARDS', 'payload': {'card_ids': []}})
+        for receiver in (client, watcher):
+            # 玩家的行动立即广播，AI的行动在后台完成后再广播一次
+            updates = self._events(receiver, 'gameUpdate')
+            self.assertEqual(updates[0]['version'], 2)
+            self.assertTrue(updates[0]['changes'])
+            self.assertEqual(updates[0]['ai_actions'], [])
+            self.assertEqual(updates[0]['log'][0]['type'], 'REPLACE_CARDS')
+            if len(updates) == 1:
+                updates += self._wait_for_events(receiver, 'gameUpdate')
+            self.assertEqual(len(updates), 2)
+            self.assertEqual(updates[1]['version'], 3)
+            self.assertEqual(updates[1]['ai_actions'][0]['action_type'], 'REPLACE_CARDS')
+            self.assertEqual(updates[1]['log'][0]['type'], 'REPLACE_CARDS')
+
+        client.emit('syncGame', {'since': 1})
+        self.assertEqual(self._events(client, 'gameUpdate')[0]['version'], 3)
+
+    def test_other_clients_served_during_ai_turn(self):
+        """AI行动期间其他连接的事件照常处理"""
+        started = threading.Event()
+        release = threading.Event()
+        finished = threading.Event()
+
+        class SlowAI:
+            def choose_action(self, engine, game_state, actions, rng):
+                started.set()
+                release.wait(5)
+                finished.set()
+                return actions[0]
+
+        session_info = self.local_game.local_game_sessions[self.game_id]
+        session_info['ai_player'] = SlowAI()
+        self.local_game.local_game_sessions[self.game_id] = session_info
+
+        client = self._client(self.token)
+        other = self._client(self.token)
+        client.emit('joinGame', self.game_id)
+        client.get_received()
+        try:
+            client.emit('gameAction', {'action_type': 'REPLACE_CARDS', 'payload': {'card_ids': []}})
+            self.assertEqual(self._events(client, 'gameUpdate')[0]['version'], 2)
+            self.assertTrue(started.wait(10))
+
+            other.emit('syncGame', {'gameId': self.game_id, 'since': 1})
+            self.assertEqual(self._events(other, 'gameUpdate')[0]['version'], 2)
+            self.assertFalse(finished.is_set())
+        finally:
+            release.set()
+        self.assertEqual(self._wait_for_events(client, 'gameUpdate')[0]['version'], 3)
+
+    def test_errors(self):
+        client = self._client(self.other_token)
+        client.emit('joinGame', self.game_id)
+        self.assertEqual(self._events(client, 'gameError'), ['无权访问此游戏会话'])
+
+        client = self._client(self.token)
+        client.emit('joinGame', self.game_id)
+        client.get_received()
+        client.emit('gameAction', {'type': 'Unknown'})
+        self.assertEqual(self._events(client, 'gameError'), ['无效的行动类型: Unknown'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+增量卡组验证测试
+"""
+import random
+import unittest
+from unittest import mock
+
+from game_engine.deck_validation import DeckValidationSystem, IncrementalDeckValidator
+from models.enums import CardType, ElementType
+from models.game_models import Card, CharacterCard
+
+
+def _character(name, element=ElementType.NONE):
+    return CharacterCard(id=name, name=name, card_type=CardType.CHARACTER, cost=[], description='',
+                         element_type=element)
+
+
+def _card(name, card_type=CardType.EVENT, subtype=None):
+    return Card(id=name, name=name, card_type=card_type, cost=[], description='', character_subtype=subtype)
+
+
+CHARACTERS = [_character('火角色甲'), _character('火角色乙'), _character('蒙德水角色'), _character('蒙德雷角色'),
+              _character('迪卢克')]
+ACTIONS = [_card('卡牌A'), _card('卡牌B'), _card('秘传：测试'), _card('元素共鸣：交织之火'),
+           _card('元素共鸣：交织之水'), _card('国家：蒙德'), _card('天赋牌', CardType.TALENT, '迪卢克')]
+
+
+def _sorted(result):
+    return dict(result, errors=sorted(result['errors']))
+
+
+class TestIncrementalDeckValidator(unittest.TestCase):
+    """测试增量验证与完整验证的结果一致"""
+
+    def test_matches_full_validation(self):
+        rng = random.Random(7)
+        system = DeckValidationSystem()
+        pool = CHARACTERS + ACTIONS * 3
+        for _ in range(200):
+            deck = [rng.choice(pool) for _ in range(rng.randint(0, 40))]
+            validator = IncrementalDeckValidator(deck)
+            for _ in range(rng.randint(0, 10)):
+                if deck and rng.random() < 0.5:
+                    validator.remove(deck.pop(rng.randrange(len(deck))))
+                else:
+                    card = rng.choice(pool)
+                    deck.append(card)
+                    validator.add(card)
+            self.assertEqual(_sorted(validator.result()), _sorted(system.validate_deck(deck)))
+
+    def test_valid_deck(self):
+        deck = CHARACTERS[:3] + [_card(f'卡牌{i // 2}') for i in range(30)]
+        self.assertEqual(IncrementalDeckValidator(deck).result(),
+                         {'is_valid': True, 'errors': [], 'warnings': []})
+
+    def test_remove_missing_card(self):
+        validator = IncrementalDeckValidator([ACTIONS[0]])
+        with self.assertRaises(ValueError):
+            validator.remove(ACTIONS[1])
+        with self.assertRaises(ValueError):
+            validator.remove(CHARACTERS[0])
+        self.assertEqual((validator.total, validator.action_count), (1, 1))
+
+
+class TestValidateDeckDeltaEndpoint(unittest.TestCase):
+    """测试增量验证接口"""
+
+    def setUp(self):
+        from app import app
+        from api.deck_builder import api_routes
+
+        self.client = app.test_client()
+        cards = {card.name: card for card in CHARACTERS + ACTIONS}
+        patch = mock.patch.object(api_routes.validation_cards, 'get', return_value=cards)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _post(self, **body):
+        return self.client.post('/api/deck/validate-delta', json=body)
+
+    def test_session_updates(self):
+        response = self._post(characters=['火角色甲'], cards=['卡牌A', '卡牌A', '未知卡牌'])
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['counts'], {'total': 3, 'characters': 1, 'actions': 2})
+        self.assertEqual(data['unknown'], ['未知卡牌'])
+        session = data['session']
+
+        data = self._post(session=session, add=['卡牌A', '元素共鸣：交织之火']).get_json()
+        self.assertEqual(data['session'], session)
+        self.assertIn('卡牌「卡牌A」超过2张限制，当前为3张', data['errors'])
+        self.assertIn('元素共鸣牌「元素共鸣：交织之火」需要至少2个火角色，当前只有1个', data['errors'])
+
+        data = self._post(session=session, add=['火角色乙'], remove=['卡牌A']).get_json()
+        self.assertFalse(any('卡牌A' in error or '元素共鸣' in error for error in data['errors']))
+        self.assertEqual(data['counts'], {'total': 5, 'characters': 2, 'actions': 3})
+
+    def test_failed_remove_keeps_state(self):
+        session = self._post(cards=['卡牌A']).get_json()['session']
+        response = self._post(session=session, remove=['卡牌A', '卡牌B'])
+        self.assertEqual(response.status_code, 400)
+        data = self._post(session=session).get_json()
+        self.assertEqual(data['counts']['actions'], 1)
+
+    def test_unknown_session(self):
+        response = self._post(session='missing', add=['卡牌A'])
+        self.assertEqual(response.status_code, 404)
+
+        response = self._post(session='missing', cards=['卡牌A'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.get_json()['session'], 'missing')
+
+    def test_sessions_evicted_least_recently_used(self):
+        from api.deck_builder import api_routes
+        from game_engine.session_store import MemorySessionStore
+
+        with mock.patch.object(api_routes, 'deck_edit_sessions', MemorySessionStore(max_sessions=2)):
+            first = self._post(cards=['卡牌A']).get_json()['session']
+            second = self._post(cards=['卡牌B']).get_json()['session']
+            self.assertEqual(self._post(session=first, add=['卡牌A']).status_code, 200)
+            self._post(cards=['卡牌A'])
+            self.assertEqual(self._post(session=second, add=['卡牌A']).status_code, 404)
+            self.assertEqual(self._post(session=first).get_json()['counts']['actions'], 2)
+
+    def test_rejects_invalid_body(self):
+        self.assertEqual(self._post(add='卡牌A').status_code, 400)
+        self.assertEqual(self.client.post('/api/deck/validate-delta', data='x').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
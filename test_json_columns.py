@@ -0,0 +1,28 @@
+"""
+JSON列读取测试
+"""
+import json
+import unittest
+
+from models.db_models import load_json_column
+
+
+class TestLoadJsonColumn(unittest.TestCase):
+    """测试原生JSON值和迁移前的重复编码JSON字符串都能读取"""
+
+    def test_native_value(self):
+        cost = ['火', '同色']
+        self.assertIs(load_json_column(cost), cost)
+
+    def test_double_encoded_string(self):
+        self.assertEqual(load_json_column(json.dumps(['火'])), ['火'])
+        self.assertEqual(load_json_column(json.dumps(json.dumps([{'id': 's'}]))), [{'id': 's'}])
+
+    def test_empty_values(self):
+        self.assertEqual(load_json_column(None), [])
+        self.assertEqual(load_json_column(''), [])
+        self.assertEqual(load_json_column(None, {}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+合法操作生成测试
+"""
+import unittest
+
+from game_engine.core import GameEngine
+from models.enums import ElementType, GamePhase, PlayerAction
+from test_game_snapshot import create_test_deck
+
+
+class TestLegalActions(unittest.TestCase):
+    """测试 legal_actions 列出的操作都能被引擎执行"""
+
+    def setUp(self):
+        self.engine = GameEngine()
+        self.game_id = self.engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=1)
+
+    def _enter_action_phase(self):
+        self.engine.process_action(self.game_id, "player1", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        self.engine.process_action(self.game_id, "player2", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        self.engine.process_action(self.game_id, "player2", PlayerAction.PASS, {})
+        game_state = self.engine.get_game_state(self.game_id)
+        self.assertEqual(game_state.phase, GamePhase.ACTION_PHASE)
+        return game_state
+
+    def test_setup_phases(self):
+        """替换手牌阶段只有替换操作，非当前玩家没有可执行操作"""
+        actions = self.engine.legal_actions(self.game_id, "player1")
+        self.assertEqual([a['action'] for a in actions], [PlayerAction.REPLACE_CARDS])
+        self.assertEqual(self.engine.legal_actions(self.game_id, "player2"), [])
+        self.assertEqual(self.engine.legal_actions("missing", "player1"), [])
+
+    def test_actions_are_playable(self):
+        """每个合法操作执行后都会消耗对应的骰子或改变状态"""
+        game_state = self._enter_action_phase()
+        player_id = game_state.players[game_state.current_player_index].player_id
+        game_state.players[game_state.current_player_index].dice = [
+            ElementType.PYRO, ElementType.HYDRO, ElementType.OMNI
+        ]
+        actions = self.engine.legal_actions(self.game_id, player_id)
+        action_types = {a['action'] for a in actions}
+        self.assertTrue({PlayerAction.PASS, PlayerAction.USE_SKILL, PlayerAction.PLAY_CARD,
+                         PlayerAction.SWITCH_CHARACTER, PlayerAction.ELEMENTAL_TUNING} <= action_types)
+
+        for action in actions:
+            fork_id = self.engine.fork(self.game_id)
+            fork_player = self.engine.get_game_state(fork_id).players[game_state.current_player_index]
+            dice_before = len(fork_player.dice)
+            log_before = len(self.engine.get_game_state(fork_id).game_log)
+            result = self.engine.process_action(fork_id, player_id, action['action'], action['payload'])
+            self.assertIsNotNone(result)
+            self.assertEqual(len(fork_player.dice), dice_before - len(action['dice']), action)
+            self.assertGreater(len(result.game_log), log_before, action)
+
+    def test_unaffordable_actions_excluded(self):
+        """没有骰子时只能结束回合或进行无需骰子的操作"""
+        game_state = self._enter_action_phase()
+        player = game_state.players[game_state.current_player_index]
+        player.dice = []
+        actions = self.engine.legal_actions(self.game_id, player.player_id)
+        self.assertEqual([a['action'] for a in actions], [PlayerAction.PASS])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+MCTS AI测试
+"""
+import random
+import time
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+from game_engine.core import GameEngine
+from game_engine import mcts
+from game_engine.mcts import MCTSConfig, MCTSPlayer, MCTSSearch, evaluate
+from models.enums import PlayerAction
+from test_game_snapshot import create_test_deck
+
+
+class TestMCTS(unittest.TestCase):
+    """测试MCTS搜索和AI行动"""
+
+    def setUp(self):
+        self.engine = GameEngine()
+        self.game_id = self.engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=5)
+        self.engine.process_action(self.game_id, "player1", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        self.engine.process_action(self.game_id, "player2", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        self.engine.process_action(self.game_id, "player2", PlayerAction.PASS, {})
+        self.game_state = self.engine.get_game_state(self.game_id)
+
+    def test_choose_legal_action(self):
+        """选择的操作来自合法操作列表，搜索不修改原对局"""
+        player = self.game_state.players[self.game_state.current_player_index]
+        actions = self.engine.legal_actions(self.game_id, player.player_id)
+        log_length = len(self.game_state.game_log)
+
+        ai = MCTSPlayer(MCTSConfig(iterations=30, time_limit=5))
+        action = ai.choose_action(self.engine, self.game_state, actions, random.Random(1))
+
+        self.assertIn(action, actions)
+        self.assertEqual(len(self.game_state.game_log), log_length)
+
+    def test_time_limit(self):
+        """思考时间受时间上限约束"""
+        search = MCTSSearch(MCTSConfig(iterations=100000, time_limit=0.2), random.Random(1))
+        start = time.monotonic()
+        stats = search.search(self.game_state)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertTrue(stats)
+
+    def test_parallel_fallback_uses_remaining_budget(self):
+        """进程超时后的回退搜索只使用剩余的时间预算"""
+        player = self.game_state.players[self.game_state.current_player_index]
+        actions = self.engine.legal_actions(self.game_id, player.player_id)
+        executor = mock.Mock()
+        executor.submit.side_effect = lambda *args: Future()
+
+        ai = MCTSPlayer(MCTSConfig(iterations=100000, time_limit=0.2, workers=2))
+        with mock.patch.object(mcts, '_get_executor', return_value=executor), \
+                mock.patch.object(mcts, 'MCTSSearch', wraps=MCTSSearch) as search:
+            action = ai.choose_action(self.engine, self.game_state, actions, random.Random(1))
+        fallback_config = search.call_args[0][0]
+        self.assertEqual(fallback_config.workers, 0)
+        self.assertLess(fallback_config.time_limit, 0.1)
+        self.assertEqual(action, actions[0])
+
+    def test_evaluate_finished_game(self):
+        self.game_state.is_game_over = True
+        self.game_state.winner = "player1"
+        self.assertEqual(evaluate(self.game_state, 0), 1.0)
+        self.assertEqual(evaluate(self.game_state, 1), 0.0)
+
+
+class TestLocalGameAI(unittest.TestCase):
+    """测试本地对局中AI自动行动"""
+
+    def test_ai_moves_until_player_turn(self):
+        import app  # noqa: F401  数据库模型在创建应用时初始化，之后才能导入API模块
+        from api import local_game
+
+        game_id = local_game.game_engine.create_game_state(
+            "user", local_game.AI_PLAYER_ID, create_test_deck(), create_test_deck(), seed=3
+        )
+        local_game.local_game_sessions[game_id] = {
+            'player_id': "user",
+            'opponent_type': 'ai',
+            'ai_player': MCTSPlayer(MCTSConfig(iterations=20, time_limit=1)),
+            'ai_rng': random.Random(3)
+        }
+        try:
+            local_game.game_engine.process_action(game_id, "user", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+            ai_actions = local_game.run_ai_turns(game_id)
+
+            self.assertTrue(ai_actions)
+            self.assertEqual(ai_actions[0]['action_type'], 'REPLACE_CARDS')
+            game_state = local_game.game_engine.get_game_state(game_id)
+            self.assertEqual(game_state.players[game_state.current_player_index].player_id, "user")
+        finally:
+            local_game.local_game_sessions.pop(game_id, None)
+            local_game.game_engine.game_states.pop(game_id, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
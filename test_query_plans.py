@@ -0,0 +1,38 @@
+"""
+热点查询执行计划测试
+"""
+import unittest
+
+from sqlalchemy import create_engine
+
+import app  # noqa: F401  数据库模型在创建应用时初始化
+from dev_tools.check_query_plans import check_query_plans, full_scans
+
+
+class TestQueryPlans(unittest.TestCase):
+    """测试模型中声明的索引覆盖所有热点查询"""
+
+    def setUp(self):
+        from models.db_models import db
+
+        self.engine = create_engine('sqlite://')
+        db.metadata.create_all(self.engine)
+        self.addCleanup(self.engine.dispose)
+
+    def test_hot_queries_use_indexes(self):
+        with self.engine.connect() as connection:
+            self.assertEqual(check_query_plans(connection), {})
+
+    def test_missing_index_detected(self):
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql('DROP INDEX ix_decks_user_id')
+            self.assertIn('user_decks', check_query_plans(connection))
+
+    def test_full_scan_pattern(self):
+        self.assertEqual(full_scans(['SCAN card_data']), ['SCAN card_data'])
+        self.assertEqual(full_scans(['SCAN card_data USING COVERING INDEX ix_card_data_name',
+                                     'SEARCH decks USING INDEX ix_decks_user_id (user_id=?)']), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+"""
+会话存储测试
+"""
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from game_engine.core import GameEngine
+from game_engine.session_store import MemorySessionStore, SessionLockLost, SQLiteSessionStore
+from models.enums import PlayerAction
+from test_game_snapshot import create_test_deck
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemorySessionStore(unittest.TestCase):
+    """测试淘汰和写入磁盘"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.evicted = []
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _on_evict(self, key, value):
+        self.evicted.append(key)
+
+    def test_ttl_eviction(self):
+        store = MemorySessionStore(ttl=10, on_evict=self._on_evict, clock=self.clock)
+        store['a'] = 1
+        store['b'] = 2
+        self.clock.now = 8
+        self.assertEqual(store['a'], 1)
+        self.clock.now = 15
+        store.sweep()
+        self.assertIn('a', store)
+        self.assertNotIn('b', store)
+        self.assertEqual(self.evicted, ['b'])
+
+    def test_lru_eviction(self):
+        store = MemorySessionStore(max_sessions=2, on_evict=self._on_evict, clock=self.clock)
+        store['a'] = 1
+        store['b'] = 2
+        store['a']
+        store['c'] = 3
+        self.assertEqual(sorted(store), ['a', 'c'])
+        self.assertEqual(self.evicted, ['b'])
+
+    def test_memory_budget(self):
+        store = MemorySessionStore(max_bytes=3500, on_evict=self._on_evict, clock=self.clock)
+        for key in 'abcd':
+            store[key] = 'x' * 1000
+        self.assertLessEqual(store.stats()['bytes'], 3500)
+        self.assertEqual(self.evicted, ['a'])
+
+    def test_spill_and_reload(self):
+        store = MemorySessionStore(ttl=10, spill_dir=self.temp_dir, on_evict=self._on_evict, clock=self.clock)
+        store['a'] = {'round': 3}
+        self.clock.now = 20
+        store.sweep()
+        self.assertEqual(store.stats()['sessions'], 0)
+        self.assertEqual(store.stats()['spilled'], 1)
+        self.assertEqual(self.evicted, [])
+
+        self.assertEqual(store['a'], {'round': 3})
+        self.assertEqual(store.stats()['spilled'], 0)
+
+    def test_disk_ttl(self):
+        store = MemorySessionStore(ttl=10, spill_dir=self.temp_dir, disk_ttl=100,
+                                   on_evict=self._on_evict, clock=self.clock)
+        store['a'] = 1
+        self.clock.now = 20
+        store.sweep()
+        self.clock.now = 200
+        store.sweep()
+        self.assertNotIn('a', store)
+        self.assertEqual(self.evicted, ['a'])
+
+    def test_engine_with_spilled_game(self):
+        """引擎在对局写入磁盘后仍可继续处理操作"""
+        store = MemorySessionStore(max_sessions=1, spill_dir=self.temp_dir, clock=self.clock)
+        engine = GameEngine(store)
+        game_id = engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=1)
+        other_id = engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=2)
+
+        self.assertEqual(store.stats()['spilled'], 1)
+        result = engine.process_action(game_id, "player1", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+        self.assertIsNotNone(result)
+        self.assertEqual(result.seed, 1)
+        self.assertIn(other_id, store)
+
+
+def _increment_counter(path, times):
+    store = SQLiteSessionStore(path)
+    for _ in range(times):
+        with store.locked('counter'):
+            store['counter'] = store['counter'] + 1
+
+
+class TestSQLiteSessionStore(unittest.TestCase):
+    """测试多进程共享的SQLite存储"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'sessions.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_dict_interface(self):
+        store = SQLiteSessionStore(self.path)
+        store['a'] = {'round': 1}
+        self.assertIn('a', store)
+        self.assertEqual(store['a'], {'round': 1})
+        self.assertEqual(list(store), ['a'])
+        self.assertEqual(SQLiteSessionStore(self.path, namespace='other').get('a'), None)
+        del store['a']
+        self.assertEqual(len(store), 0)
+
+    def test_locked_writes_back_in_place_changes(self):
+        """锁内对同一对象的原地修改在退出时写回"""
+        store = SQLiteSessionStore(self.path)
+        store['a'] = {'round': 1}
+        with store.locked('a'):
+            store['a']['round'] = 2
+            self.assertEqual(store['a']['round'], 2)
+        self.assertEqual(SQLiteSessionStore(self.path)['a'], {'round': 2})
+
+    def test_lock_is_exclusive_across_stores(self):
+        first = SQLiteSessionStore(self.path)
+        second = SQLiteSessionStore(self.path)
+        second.LOCK_TIMEOUT = 0.05
+        first['a'] = 1
+        with first.locked('a'):
+            with self.assertRaises(TimeoutError):
+                with second.locked('a'):
+                    pass
+        with second.locked('a'):
+            pass
+
+    def test_lease_renewed_while_held(self):
+        """持有锁的时间超过租约时长时租约被续期，其他进程仍然无法取得锁"""
+        first = SQLiteSessionStore(self.path)
+        first.LOCK_LEASE = 0.2
+        first.LOCK_RENEW_INTERVAL = 0.05
+        second = SQLiteSessionStore(self.path)
+        second.LOCK_TIMEOUT = 0.05
+        first['a'] = 1
+        with first.locked('a'):
+            time.sleep(0.5)
+            with self.assertRaises(TimeoutError):
+                with second.locked('a'):
+                    pass
+            first['a'] = 2
+        self.assertEqual(second['a'], 2)
+
+    def test_lost_lease_does_not_overwrite(self):
+        """租约被其他进程取得后，写回时抛出 SessionLockLost，不覆盖其他进程写入的状态"""
+        first = SQLiteSessionStore(self.path)
+        second = SQLiteSessionStore(self.path)
+        first['a'] = {'round': 1}
+        with self.assertRaises(SessionLockLost):
+            with first.locked('a'):
+                first['a']['round'] = 2
+                # 模拟租约过期后被其他进程抢占
+                connection = sqlite3.connect(self.path)
+                connection.execute("UPDATE session_locks SET expires_at = 0")
+                connection.commit()
+                connection.close()
+                with second.locked('a'):
+                    second['a'] = {'round': 3}
+        self.assertEqual(second['a'], {'round': 3})
+
+    def test_ttl_sweep(self):
+        evicted = []
+        store = SQLiteSessionStore(self.path, ttl=-1, on_evict=lambda key, value: evicted.append(key))
+        store['a'] = 1
+        store.sweep()
+        self.assertNotIn('a', store)
+        self.assertEqual(evicted, ['a'])
+
+    def test_max_sessions(self):
+        """超出数量上限时删除最久未更新的会话"""
+        evicted = []
+        store = SQLiteSessionStore(self.path, max_sessions=2, on_evict=lambda key, value: evicted.append(key))
+        store['a'] = 1
+        store['b'] = 2
+        store['a'] = 3
+        store['c'] = 4
+        self.assertEqual(sorted(store), ['a', 'c'])
+        self.assertEqual(evicted, ['b'])
+
+    def test_locked_across_processes(self):
+        """多个进程在锁内修改同一会话，修改不会丢失"""
+        store = SQLiteSessionStore(self.path)
+        store['counter'] = 0
+        processes = [multiprocessing.Process(target=_increment_counter, args=(self.path, 20)) for _ in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(store['counter'], 60)
+
+    def test_engine_game_round_trip(self):
+        """引擎在锁内处理操作后，其他进程可以读到最新状态"""
+        engine = GameEngine(SQLiteSessionStore(self.path))
+        game_id = engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=1)
+        with engine.game_states.locked(game_id):
+            engine.process_action(game_id, "player1", PlayerAction.REPLACE_CARDS, {'card_ids': []})
+
+        other = GameEngine(SQLiteSessionStore(self.path))
+        game_state = other.get_game_state(game_id)
+        self.assertTrue(game_state.players[0].has_card_replace_option_used)
+        self.assertEqual(game_state.current_player_index, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
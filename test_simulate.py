@@ -0,0 +1,83 @@
+"""
+批量对局模拟器测试
+"""
+import random
+import unittest
+
+from game_engine.card_library import CardLibrary
+from game_engine.deck_validation import DeckValidationSystem
+from game_engine.simulate import configure_logging, load_deck_from_db, simulate
+from models.game_models import CharacterCard
+
+
+class TestSimulate(unittest.TestCase):
+    """测试卡组构建和批量模拟"""
+
+    @classmethod
+    def setUpClass(cls):
+        configure_logging(False)
+        cls.library = CardLibrary()
+        cls.deck1 = cls.library.random_deck(random.Random(1))
+        cls.deck2 = cls.library.random_deck(random.Random(2))
+
+    def test_random_deck_is_valid(self):
+        """随机卡组通过卡组验证"""
+        for seed in range(20):
+            deck = self.library.random_deck(random.Random(seed))
+            self.assertTrue(DeckValidationSystem().validate_deck(deck)['is_valid'], seed)
+
+    def test_character_skills_parsed(self):
+        """角色技能费用和伤害从JSON中解析"""
+        character = self.library.characters['迪卢克']
+        normal_attack = next(s for s in character.skills if s['skill_type'] == 'NORMAL_ATTACK')
+        self.assertEqual(len(normal_attack['cost']), 3)
+        self.assertEqual(normal_attack['damage'], 2)
+
+    def test_simulation_is_reproducible(self):
+        """相同种子的模拟结果一致"""
+        first = simulate(self.deck1, self.deck2, 6, 'random', 'greedy', seed=3, workers=1)
+        second = simulate(self.deck1, self.deck2, 6, 'random', 'greedy', seed=3, workers=1)
+        self.assertEqual(first.to_dict(), second.to_dict())
+        self.assertEqual(first.deck1_wins + first.deck2_wins + first.draws + first.aborted, 6)
+
+
+
+class TestLoadDeckFromDb(unittest.TestCase):
+    """测试从 decks 表加载卡组（使用内存数据库）"""
+
+    def setUp(self):
+        from flask import Flask
+        import app  # noqa: F401  初始化数据库模型
+        import models.db_models as db_models
+
+        self.db_models = db_models
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db_models.db.init_app(self.app)
+        with self.app.app_context():
+            db_models.db.create_all()
+
+    def test_load_seeded_deck(self):
+        db, CardData, Deck = self.db_models.db, self.db_models.CardData, self.db_models.Deck
+        with self.app.app_context():
+            character = CardData(name='测试角色', card_type='角色牌', element_type='火', cost=[], skills=[],
+                                 health=10, max_health=10)
+            event = CardData(name='测试事件', card_type='事件牌', cost=[], skills=[])
+            db.session.add_all([character, event])
+            db.session.flush()
+            deck = Deck(name='测试卡组', user_id='user-1', cards=[character.id, event.id, event.id])
+            db.session.add(deck)
+            db.session.commit()
+            deck_id = deck.id
+
+        self.assertIsInstance(deck_id, str)
+        cards = load_deck_from_db(deck_id, app=self.app)
+        self.assertEqual([card.name for card in cards], ['测试角色', '测试事件', '测试事件'])
+        self.assertIsInstance(cards[0], CharacterCard)
+
+        with self.assertRaises(ValueError):
+            load_deck_from_db('missing', app=self.app)
+
+
+if __name__ == '__main__':
+    unittest.main()
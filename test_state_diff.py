@@ -0,0 +1,129 @@
+"""
+状态增量测试
+"""
+import copy
+import json
+import random
+import unittest
+
+from game_engine.core import GameEngine
+from game_engine.simulate import RandomPolicy
+from game_engine.state_diff import StateHistory, apply_changes, diff_values
+from test_game_snapshot import create_test_deck
+
+
+class TestDiffValues(unittest.TestCase):
+    """测试变更操作的生成和应用"""
+
+    def test_round_trip(self):
+        old = {'a': 1, 'b': [1, 2, 3], 'c': {'x/y': 'v'}, 'd': None}
+        new = {'a': 2, 'b': [1, 5], 'c': {'x/y': 'w', 'z': [1]}, 'e': True}
+        ops = diff_values(old, new)
+        self.assertEqual(apply_changes(copy.deepcopy(old), ops), new)
+        self.assertIn({'op': 'replace', 'path': '/c/x~1y', 'value': 'w'}, ops)
+
+    def test_unchanged_has_no_ops(self):
+        state = {'players': [{'health': 10}], 'round': 1}
+        self.assertEqual(diff_values(state, copy.deepcopy(state)), [])
+
+
+class TestStateHistory(unittest.TestCase):
+    """测试版本历史"""
+
+    def test_versions(self):
+        history = StateHistory()
+        history.record({'hp': 10, 'log_seq': 1})
+        self.assertEqual(history.version, 1)
+        ops = history.record({'hp': 8, 'log_seq': 2})
+        self.assertEqual(history.version, 2)
+        self.assertEqual(ops, [
+            {'op': 'replace', 'path': '/hp', 'value': 8},
+            {'op': 'replace', 'path': '/log_seq', 'value': 2},
+        ])
+        self.assertEqual(history.record({'hp': 8, 'log_seq': 2}), [])
+        self.assertEqual(history.version, 2)
+        self.assertEqual(history.since(2), [])
+        self.assertEqual(apply_changes(None, history.since(0)), {'hp': 8, 'log_seq': 2})
+
+    def test_old_versions_expire(self):
+        history = StateHistory(max_versions=3)
+        for hp in range(10):
+            history.record({'hp': hp})
+        self.assertEqual(history.version, 10)
+        self.assertEqual(history.oldest_version(), 7)
+        self.assertIsNotNone(history.since(7))
+        self.assertIsNone(history.since(6))
+        self.assertIsNone(history.since(11))
+
+    def test_unchanged_subtrees_skipped(self):
+        old = {'players': [{'skills': [{'id': 'a'}], 'hp': 10}], 'round': 1}
+        new = {'players': [{'skills': [{'id': 'a'}], 'hp': 8}], 'round': 1}
+        self.assertEqual(diff_values(old, new), [{'op': 'replace', 'path': '/players/0/hp', 'value': 8}])
+
+    def test_current_state(self):
+        history = StateHistory()
+        self.assertIsNone(history.current)
+        state = {'hp': 10}
+        history.record(state)
+        self.assertIs(history.current, state)
+
+
+class TestLocalGameDiff(unittest.TestCase):
+    """在真实对局中验证增量与完整状态一致"""
+
+    def test_changes_rebuild_full_state(self):
+        import app  # noqa: F401  数据库模型在创建应用时初始化，之后才能导入API模块
+        from api.local_game import serialize_game_state
+
+        engine = GameEngine()
+        game_id = engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=11)
+        policy = RandomPolicy()
+        rng = random.Random(11)
+        history = StateHistory()
+        history.record(serialize_game_state(engine.get_game_state(game_id)))
+        client_state = apply_changes(None, history.since(0))
+        client_version = history.version
+
+        full_size = diff_size = 0
+        for _ in range(80):
+            game_state = engine.get_game_state(game_id)
+            if game_state.is_game_over:
+                break
+            player = game_state.players[game_state.current_player_index]
+            actions = engine.legal_actions(game_id, player.player_id)
+            action = policy.choose_action(engine, game_state, actions, rng)
+            engine.process_action(game_id, player.player_id, action['action'], action['payload'])
+            game_state = engine.get_game_state(game_id)
+
+            history.record(serialize_game_state(game_state))
+            changes = history.since(client_version)
+            client_state = apply_changes(client_state, changes)
+            client_version = history.version
+
+            full = json.dumps(serialize_game_state(game_state), default=str)
+            self.assertEqual(json.dumps(client_state, default=str, sort_keys=True),
+                             json.dumps(json.loads(full), sort_keys=True))
+            full_size += len(full)
+            diff_size += len(json.dumps(changes, default=str))
+
+        self.assertLess(diff_size * 5, full_size)
+
+    def test_serialized_state_not_shared_with_engine(self):
+        """序列化结果不引用引擎中的可变对象，记录后修改对局不影响保存的状态"""
+        import app  # noqa: F401
+        from api.local_game import serialize_game_state
+
+        engine = GameEngine()
+        game_id = engine.create_game_state("player1", "player2", create_test_deck(), create_test_deck(), seed=3)
+        game_state = engine.get_game_state(game_id)
+        history = StateHistory()
+        history.record(serialize_game_state(game_state))
+
+        game_state.players[0].supports.append({'name': '测试支援'})
+        self.assertEqual(history.current['players'][0]['supports'], [])
+        ops = history.record(serialize_game_state(game_state))
+        self.assertIn({'op': 'add', 'path': '/players/0/supports/-', 'value': {'name': '测试支援'}}, ops)
+
+
+if __name__ == '__main__':
+    unittest.main()
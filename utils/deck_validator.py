@@ -2,9 +2,31 @@
 卡组验证工具
 用于API接口中验证卡组
 """
+from collections import Counter
 from typing import List, Dict, Any
-from game_engine.deck_validation import DeckValidationSystem
-from models.game_models import Card
+from game_engine.deck_validation import deck_validation_system
+from models.enums import CardType
+from models.game_models import Card, CharacterCard
+
+# 卡牌类型名称（与数据库中的 card_type 一致）到卡牌类型的映射
+CARD_TYPE_BY_NAME = {card_type.value: card_type for card_type in CardType}
+
+
+def card_from_dict(card_data: Dict[str, Any]) -> Card:
+    """
+    将字典格式的卡牌转换为Card对象，角色牌转换为CharacterCard
+    """
+    card_type = card_data.get('card_type', '')
+    card_type = CARD_TYPE_BY_NAME.get(card_type, card_type)
+    card_class = CharacterCard if card_type == CardType.CHARACTER else Card
+    return card_class(
+        id=card_data.get('id', ''),
+        name=card_data.get('name', ''),
+        card_type=card_type,
+        cost=card_data.get('cost', []),
+        description=card_data.get('description', ''),
+        character_subtype=card_data.get('character_subtype')
+    )
 
 
 def validate_deck_api(deck: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -18,22 +40,29 @@ def validate_deck_api(deck: List[Dict[str, Any]]) -> Dict[str, Any]:
         验证结果
     """
     # 将字典格式的卡牌转换为Card对象
-    card_objects = []
-    for card_data in deck:
-        # 创建卡牌对象
-        card_obj = Card(
-            id=card_data.get('id', ''),
-            name=card_data.get('name', ''),
-            card_type=card_data.get('card_type', ''),
-            cost=card_data.get('cost', []),
-            description=card_data.get('description', ''),
-            character_subtype=card_data.get('character_subtype')
-        )
-        card_objects.append(card_obj)
+    card_objects = [card_from_dict(card_data) for card_data in deck]
+
+    return deck_validation_system.validate_deck(card_objects)
+
+
+def validate_deck_batch_api(cards_by_id: Dict[str, Dict[str, Any]], decks: List[List[str]]) -> List[Dict[str, Any]]:
+    """
+    批量验证卡组
+    
+    Args:
+        cards_by_id: 卡牌ID到卡牌数据（字典格式，同 validate_deck_api）的映射
+        decks: 每个卡组的卡牌ID列表，同一张卡可以出现多次，未知的卡牌ID会被忽略
+        
+    Returns:
+        与 decks 顺序一致的验证结果列表
+    """
+    # 每张卡牌只转换一次，所有卡组共享同一个卡牌对象，卡牌规则标记也只编译一次
+    card_objects = {card_id: card_from_dict(card_data) for card_id, card_data in cards_by_id.items()}
     
-    # 创建验证系统实例并验证
-    validator = DeckValidationSystem()
-    return validator.validate_deck(card_objects)
+    return [
+        deck_validation_system.validate_deck([card_objects[card_id] for card_id in card_ids if card_id in card_objects])
+        for card_ids in decks
+    ]
 
 
 def get_deck_stats_api(deck: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -47,22 +76,9 @@ def get_deck_stats_api(deck: List[Dict[str, Any]]) -> Dict[str, Any]:
         卡组统计信息
     """
     # 将字典格式的卡牌转换为Card对象
-    card_objects = []
-    for card_data in deck:
-        # 创建卡牌对象
-        card_obj = Card(
-            id=card_data.get('id', ''),
-            name=card_data.get('name', ''),
-            card_type=card_data.get('card_type', ''),
-            cost=card_data.get('cost', []),
-            description=card_data.get('description', ''),
-            character_subtype=card_data.get('character_subtype')
-        )
-        card_objects.append(card_obj)
-    
-    # 创建验证系统实例并获取统计信息
-    validator = DeckValidationSystem()
-    return validator.get_deck_stats(card_objects)
+    card_objects = [card_from_dict(card_data) for card_data in deck]
+
+    return deck_validation_system.get_deck_stats(card_objects)
 
 
 def validate_deck_composition(deck_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -81,65 +97,24 @@ def validate_deck_composition(deck_data: Dict[str, Any]) -> Dict[str, Any]:
     try:
         # 先检查是否可以导入数据库模型
         try:
-            from models.db_models import CardData
-            # 检查CardData是否可用
-            # 如果导入成功，使用数据库验证
-            from models.db_models import db
-            
-            # 从数据库中获取角色卡信息
-            character_cards = []
-            if deck_data.get('character_ids'):
-                character_cards = CardData.query.filter(
-                    CardData.id.in_(deck_data['character_ids'])
-                ).all()
-            
-            # 从数据库中获取其他卡牌信息
-            action_cards = []
-            if deck_data.get('card_ids'):
-                action_cards = CardData.query.filter(
-                    CardData.id.in_(deck_data['card_ids'])
-                ).all()
-
-            # 将数据库对象转换为Card对象
-            all_cards = []
-            
-            # 添加角色卡
-            for card in character_cards:
-                card_obj = Card(
-                    id=str(card.id),
-                    name=card.name,
-                    card_type=card.card_type,
-                    cost=card.cost if card.cost else [],
-                    description=card.description or "",
-                    character_subtype=getattr(card, 'character_subtype', None)
-                )
-                # 添加多张相同的角色卡（如果用户选择了多张）
-                count = deck_data['character_ids'].count(card.id)
-                for _ in range(count):
-                    all_cards.append(card_obj)
-            
-            # 添加行动卡
-            for card in action_cards:
-                card_obj = Card(
-                    id=str(card.id),
-                    name=card.name,
-                    card_type=card.card_type,
-                    cost=card.cost if card.cost else [],
-                    description=card.description or "",
-                    character_subtype=getattr(card, 'character_subtype', None)
-                )
-                # 添加多张相同的行动卡（如果用户选择了多张）
-                count = deck_data['card_ids'].count(card.id)
-                for _ in range(count):
-                    all_cards.append(card_obj)
-
-            # 创建验证系统实例并验证
-            validator = DeckValidationSystem()
-            return validator.validate_deck(all_cards)
-        
+            # 卡牌对象按卡牌目录版本缓存在内存中（按卡牌ID和卡牌名称索引），不需要每次查询数据库
+            from api.catalog_cache import validation_cards
         except ImportError:
             # 如果无法导入数据库模型，使用简化验证
             return _validate_deck_by_id_counts(deck_data)
+
+        cards = validation_cards.get()
+
+        # 角色牌和其他卡牌一起计数，同一张卡牌选择了多张时重复添加，未知的卡牌ID被忽略
+        counts = Counter(deck_data.get('character_ids') or [])
+        counts.update(deck_data.get('card_ids') or [])
+        all_cards = []
+        for card_id, count in counts.items():
+            card = cards.get(card_id)
+            if card is not None:
+                all_cards.extend([card] * count)
+
+        return deck_validation_system.validate_deck(all_cards)
     
     except Exception as e:
         return {